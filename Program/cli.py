@@ -0,0 +1,258 @@
+"""账号管理命令行：无需GUI即可批量导入、筛选、设置冷却、备注、删除和导出
+
+示例：
+    python cli.py import accounts.txt
+    python cli.py list --available-within 2h --format txt
+    python cli.py cooldown --days 7 account1 account2
+    python cli.py --pool 备用 import accounts.txt
+    python cli.py find account1
+    python cli.py --compression gzip:6 compress
+"""
+import argparse
+import datetime
+import json
+import sys
+import os
+import time
+
+import compression
+import exporter
+from language import LANGUAGES
+from loginlog import COLUMNS as LOGIN_COLUMNS
+from store import parse_duration
+from utils import get_system_language
+from workspace import DEFAULT_SHARD, WORKSPACE_DIR, Workspace
+
+
+def _add_filter_arguments(parser):
+    parser.add_argument("--available", action="store_true", help="only accounts available now")
+    parser.add_argument("--available-within", metavar="DURATION",
+                        help="only accounts available within DURATION, e.g. 2h, 3d, 1d12h")
+    parser.add_argument("--remarked", action="store_true", help="only accounts with remarks")
+    parser.add_argument("--search", default="",
+                        help="search query, e.g. 'status:available cooldown<2d others:~prime'")
+    parser.add_argument("--sort", choices=("account", "status", "available_time", "remarks", "others") + LOGIN_COLUMNS,
+                        help="sort column (login statistics come from login_history.bin)")
+    parser.add_argument("--desc", action="store_true", help="sort descending")
+
+
+def _select(store, args):
+    if args.sort:
+        store.sort(args.sort, args.desc)
+    accounts = store.filter(args.available, args.remarked, args.search)
+    if args.available_within:
+        deadline = datetime.datetime.now() + parse_duration(args.available_within)
+        accounts = store.available_before(deadline, accounts)
+    return accounts
+
+
+def _write_output(lines, output):
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+    else:
+        for line in lines:
+            print(line)
+
+
+def _find_accounts(store, names):
+    accounts, missing = [], []
+    for name in names:
+        acc = store.get(name)
+        if acc is None:
+            missing.append(name)
+        else:
+            accounts.append(acc)
+    for name in missing:
+        print(f"account not found: {name}", file=sys.stderr)
+    return accounts
+
+
+def cmd_import(store, args):
+    count = 0
+    for path in args.files:
+        count += store.import_txt(path)
+    if count:
+        store.save()
+    print(f"imported {count} new accounts")
+    return 0
+
+
+def cmd_list(store, args):
+    accounts = _select(store, args)
+    fields = tuple(args.fields.split(",")) if args.fields else None
+    if args.format in ("csv", "jsonl") or (args.format == "txt" and fields):
+        # 流式写出，不在内存中拼出完整内容
+        if args.output:
+            exporter.write_file(args.output, accounts, args.format, fields)
+        else:
+            for chunk in exporter.iter_chunks(accounts, args.format, fields):
+                sys.stdout.write(chunk)
+            if args.format == "txt":
+                sys.stdout.write("\n")
+        return 0
+    if args.format == "txt":
+        lines = store.export_lines(accounts)
+    elif args.format == "json":
+        entries = []
+        for acc in accounts:
+            entry = store.to_json_entry(acc)
+            entry['remarks'] = acc.get('remarks', '')
+            entry['status'] = acc['status']
+            entries.append(entry)
+        lines = [json.dumps(entries, ensure_ascii=False, indent=4)]
+    else:
+        lines = (
+            "\t".join((acc['account'], acc['status'], acc['available_time'],
+                       acc.get('remarks', ''), store.format_cooldown(acc)))
+            for acc in accounts
+        )
+    _write_output(lines, args.output)
+    return 0
+
+
+def cmd_cooldown(store, args):
+    accounts = _find_accounts(store, args.accounts)
+    for acc in accounts:
+        if args.reset:
+            store.apply_cooldown(acc, "reset")
+        else:
+            store.apply_cooldown(acc, "delta", hours=args.hours, days=args.days)
+    if accounts:
+        store.save()
+    print(f"updated {len(accounts)} accounts")
+    return 0 if len(accounts) == len(args.accounts) else 1
+
+
+def cmd_remark(store, args):
+    accounts = _find_accounts(store, args.accounts)
+    for acc in accounts:
+        store.set_remarks(acc, args.text)
+    if accounts:
+        store.save()
+    print(f"updated {len(accounts)} accounts")
+    return 0 if len(accounts) == len(args.accounts) else 1
+
+
+def cmd_delete(store, args):
+    count = store.delete_accounts(args.accounts)
+    if count:
+        store.save()
+    print(f"deleted {count} accounts")
+    return 0
+
+
+def cmd_compress(store, args):
+    """按 --compression 指定的格式（未指定时沿用原格式）重新保存数据文件"""
+    before = os.path.getsize(store.data_file) if os.path.exists(store.data_file) else 0
+    store.save()
+    method, level = compression.configured() or (compression.detect(store.data_file), None)
+    print(f"{store.data_file}: {before} -> {os.path.getsize(store.data_file)} bytes ({method}"
+          + (f", level {level})" if level is not None else ")"))
+    return 0
+
+
+def cmd_find(workspace, args):
+    status = 0
+    for name in args.accounts:
+        found = workspace.find(name)
+        if found is None:
+            print(f"account not found: {name}", file=sys.stderr)
+            status = 1
+        else:
+            print(f"{name}\t{found[0]}")
+    return status
+
+
+def cmd_serve(args):
+    import sync
+    token = args.token or os.environ.get(sync.TOKEN_ENV)
+    if not token:
+        print(f"error: sync server needs a shared token, set {sync.TOKEN_ENV} or pass --token", file=sys.stderr)
+        return 1
+    server = sync.SyncServer(token, args.host, args.port, args.state).start()
+    print(f"sync server listening on {server.url}, state in {args.state}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Steam account manager command line")
+    parser.add_argument("--data", default="accounts_data.json", help="path of accounts_data.json")
+    parser.add_argument("--lang", choices=tuple(LANGUAGES), help="language of status and remark texts")
+    parser.add_argument("--workspaces", default=WORKSPACE_DIR, help="directory of account pools")
+    parser.add_argument("--pool", default=DEFAULT_SHARD, help="account pool to operate on (default: --data)")
+    parser.add_argument("--compression", metavar="METHOD[:LEVEL]",
+                        help="save data files as none, gzip, zlib or lzma (level 0-9); default keeps each file's format")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("import", help="import account----password----others lines")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser("list", help="list or export accounts")
+    _add_filter_arguments(p)
+    p.add_argument("--format", choices=("table", "txt", "json", "csv", "jsonl"), default="table")
+    p.add_argument("--fields", help="comma separated fields for txt/csv/jsonl, e.g. account,password,remarks")
+    p.add_argument("-o", "--output", help="write to file instead of stdout")
+    p.set_defaults(func=cmd_list)
+
+    p = subparsers.add_parser("cooldown", help="set cooldown of accounts")
+    p.add_argument("accounts", nargs="+")
+    p.add_argument("--days", type=int, default=0)
+    p.add_argument("--hours", type=int, default=0)
+    p.add_argument("--reset", action="store_true", help="make available immediately")
+    p.set_defaults(func=cmd_cooldown)
+
+    p = subparsers.add_parser("remark", help="set remarks of accounts")
+    p.add_argument("text")
+    p.add_argument("accounts", nargs="+")
+    p.set_defaults(func=cmd_remark)
+
+    p = subparsers.add_parser("delete", help="delete accounts")
+    p.add_argument("accounts", nargs="+")
+    p.set_defaults(func=cmd_delete)
+
+    p = subparsers.add_parser("compress", help="rewrite the data file with --compression (or its current format)")
+    p.set_defaults(func=cmd_compress)
+
+    p = subparsers.add_parser("find", help="show which pool accounts belong to")
+    p.add_argument("accounts", nargs="+")
+    p.set_defaults(func=cmd_find, needs_workspace=True)
+
+    p = subparsers.add_parser("serve", help="host a sync server for several machines")
+    p.add_argument("--host", default="127.0.0.1", help="address to listen on, e.g. 0.0.0.0 for other machines")
+    p.add_argument("--token", help="shared secret clients must send (default: SAM_SYNC_TOKEN)")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--state", default="sync_state.json.gz", help="compressed server state file")
+    p.set_defaults(func=cmd_serve, standalone=True)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    lang = LANGUAGES[args.lang or get_system_language()]
+    workspace = Workspace(args.workspaces, args.data, lang)
+    try:
+        if args.compression:
+            compression.configure(args.compression)
+        if getattr(args, "standalone", False):
+            return args.func(args)
+        if getattr(args, "needs_workspace", False):
+            return args.func(workspace, args)
+        store = workspace.store(args.pool)
+        store.load()
+        return args.func(store, args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""数据文件的透明压缩与流式读写
+
+读取时根据文件开头的魔数识别 gzip、xz（lzma）、zlib 或未压缩的 JSON，文件名不变；
+保存时默认沿用文件原来的格式，设置环境变量 SAM_COMPRESSION=方法[:级别]（如 gzip:6、lzma:9、zlib、none）
+或命令行 --compression 后改为指定格式。读写都按块进行：解压后的 JSON 文本不会整个放在内存中，
+读取时逐条解析 accounts 数组中的记录。
+"""
+import io
+import json
+import os
+import re
+import zlib
+
+ENV_VAR = "SAM_COMPRESSION"
+NONE, GZIP, ZLIB, LZMA = "none", "gzip", "zlib", "lzma"
+METHODS = (NONE, GZIP, ZLIB, LZMA)
+DEFAULT_LEVELS = {GZIP: 6, ZLIB: 6, LZMA: 6}
+CHUNK_SIZE = 64 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def detect_bytes(head):
+    """根据文件开头的字节判断压缩方法"""
+    if head.startswith(_GZIP_MAGIC):
+        return GZIP
+    if head.startswith(_XZ_MAGIC):
+        return LZMA
+    # zlib 头：CMF 为 0x78（deflate，32K 窗口），且 CMF*256+FLG 是 31 的倍数；JSON 不会以 "x" 开头
+    if len(head) >= 2 and head[0] == 0x78 and (head[0] * 256 + head[1]) % 31 == 0:
+        return ZLIB
+    return NONE
+
+
+def detect(path):
+    with open(path, 'rb') as f:
+        return detect_bytes(f.read(len(_XZ_MAGIC)))
+
+
+def parse_setting(text):
+    """解析 "方法[:级别]"，返回 (方法, 级别)；级别省略时使用默认值，none 的级别为 None"""
+    method, _, level = text.strip().lower().partition(":")
+    if method in ("", "plain", "json"):
+        method = NONE
+    if method not in METHODS:
+        raise ValueError(f"unknown compression method {method!r}, expected one of {', '.join(METHODS)}")
+    if method == NONE:
+        return NONE, None
+    if not level:
+        return method, DEFAULT_LEVELS[method]
+    if not level.isdigit() or not 0 <= int(level) <= 9:
+        raise ValueError(f"compression level must be 0-9, got {level!r}")
+    return method, int(level)
+
+
+_setting = None  # (方法, 级别)；None 表示保存时沿用文件原来的格式
+
+
+def configure(text):
+    """设置保存时使用的压缩方法；传入 None 恢复为沿用原格式"""
+    global _setting
+    _setting = None if text is None else parse_setting(text)
+
+
+def configured():
+    return _setting
+
+
+class _ZlibReader(io.RawIOBase):
+    """按块解压 zlib 流"""
+
+    def __init__(self, fileobj):
+        self._file = fileobj
+        self._decompressor = zlib.decompressobj()
+        self._pending = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending:
+            if self._decompressor.eof:
+                return 0
+            chunk = self._file.read(CHUNK_SIZE)
+            if not chunk:
+                raise EOFError("compressed file ended before the end-of-stream marker was reached")
+            self._pending = self._decompressor.decompress(chunk)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+
+class _ZlibWriter(io.RawIOBase):
+    """按块压缩为 zlib 流"""
+
+    def __init__(self, fileobj, level):
+        self._file = fileobj
+        self._compressor = zlib.compressobj(level)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._file.write(self._compressor.compress(data))
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._file.write(self._compressor.flush())
+            self._file.close()
+        super().close()
+
+
+def open_text(path, mode='r', method=None, level=None):
+    """以文本方式打开数据文件；读取时 method 为 None 则自动识别，写入时默认不压缩
+
+    gzip 和 lzma 在第一次用到时才导入，不影响启动速度。
+    """
+    if mode == 'r':
+        method = method or detect(path)
+    else:
+        method = method or NONE
+        if level is None and method != NONE:
+            level = DEFAULT_LEVELS[method]
+    if method == GZIP:
+        import gzip
+        return gzip.open(path, mode + 't', encoding='utf-8', **({} if mode == 'r' else {'compresslevel': level}))
+    if method == LZMA:
+        import lzma
+        return lzma.open(path, mode + 't', encoding='utf-8', **({} if mode == 'r' else {'preset': level}))
+    if method == ZLIB:
+        if mode == 'r':
+            raw = _ZlibReader(open(path, 'rb'))
+            return io.TextIOWrapper(io.BufferedReader(raw, CHUNK_SIZE), encoding='utf-8')
+        raw = _ZlibWriter(open(path, 'wb'), level)
+        return io.TextIOWrapper(io.BufferedWriter(raw, CHUNK_SIZE), encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class _JSONStream:
+    """在按块读入的文本上逐个解析 JSON 值"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._bad_cut = -1
+
+    def _fill(self):
+        """读入下一块，丢弃已解析的部分；文件已读完时返回 False"""
+        chunk = self._stream.read(CHUNK_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._bad_cut -= self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符；文件结束时返回空串"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def skip(self, char):
+        """下一个字符是 char 时跳过它并返回 True"""
+        if self.peek() == char:
+            self._pos += 1
+            return True
+        return False
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # 值被块边界截断时读入更多内容再试
+                if self._eof or not self._fill():
+                    raise
+                continue
+            # 数字、true 等以块末尾结束时可能还没读完整
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self):
+        """逐批产生数组中的元素（每批是一个列表）
+
+        缓冲区中到最后一个 "}," 为止的内容作为一个数组一次交给 C 实现的解析器，比逐个解析快得多；
+        截断处如果在字符串或嵌套的对象中间，这段内容不是合法的数组，解析失败后退回逐个解析。
+        """
+        self.expect("[")
+        if self.skip("]"):
+            return
+        while True:
+            cut = self._buffer.rfind("},", self._pos)
+            if cut > max(self._pos, self._bad_cut):
+                try:
+                    batch = _decoder.decode("[" + self._buffer[self._pos:cut + 1] + "]")
+                except json.JSONDecodeError:
+                    self._bad_cut = cut
+                else:
+                    self._pos = cut + 2
+                    yield batch
+                    continue
+            yield [self.value()]
+            if not self.skip(","):
+                self.expect("]")
+                return
+
+
+def load_document(stream):
+    """流式解析数据文件，返回 (版本号, 记录列表)；兼容旧的纯列表格式（视为版本 0）"""
+    reader = _JSONStream(stream)
+    first = reader.peek()
+    if first == "[":
+        return 0, [entry for batch in reader.array() for entry in batch]
+    if first != "{":
+        data = reader.value()
+        return 0, data
+    version, entries = 0, []
+    reader.expect("{")
+    if reader.skip("}"):
+        return version, entries
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == 'accounts' and reader.peek() == "[":
+            entries = [entry for batch in reader.array() for entry in batch]
+        else:
+            value = reader.value()
+            if key == 'version':
+                version = value
+        if not reader.skip(","):
+            reader.expect("}")
+            return version, entries
+
+
+def read_document(path):
+    """读取（可能压缩的）数据文件，返回 (版本号, 记录列表)；压缩数据损坏时抛出 ValueError"""
+    method = detect(path)
+    errors = (zlib.error, EOFError)
+    if method == LZMA:
+        import lzma
+        errors += (lzma.LZMAError,)
+    try:
+        with open_text(path, 'r', method) as f:
+            return load_document(f)
+    except errors as e:
+        raise ValueError(f"corrupt compressed data file {path}: {e}") from e
+
+
+if os.environ.get(ENV_VAR):
+    try:
+        configure(os.environ[ENV_VAR])
+    except ValueError as e:
+        print(f"{ENV_VAR} ignored: {e}")
@@ -3,6 +3,7 @@ from tkinter import simpledialog, messagebox, ttk
 import datetime
 
 from language import LANGUAGES
+from store import format_time, is_time_text, parse_account_line, parse_duration
 from utils import get_system_language
 
 # 初始化语言设置
@@ -182,15 +183,10 @@ class AddAccountDialog(simpledialog.Dialog):
         if not content: return
         
         for line in content.split("\n"):
-            line = line.strip()
-            if "----" in line:
-                # 分割成三部分：账号、密码、其它（最多分割两次）
-                parts = line.split("----", 2)
-                account = parts[0].strip()
-                password = parts[1].strip() if len(parts) > 1 else ""
-                others = parts[2].strip() if len(parts) > 2 else ""  # 处理第二个----后的内容
-                if account and password:
-                    self.new_accounts_data.append((account, password, others))
+            # 分割成三部分：账号、密码、其它（最多分割两次）
+            parsed = parse_account_line(line)
+            if parsed:
+                self.new_accounts_data.append(parsed)
 
 class CustomRemarkDialog(simpledialog.Dialog):
     """用于输入自定义备注的对话框"""
@@ -234,25 +230,58 @@ class CustomRemarkDialog(simpledialog.Dialog):
         
         box.pack(padx=5, pady=10)
 
+class WorkspaceNameDialog(CustomRemarkDialog):
+    """用于输入新账号池名称的对话框"""
+    def body(self, master):
+        ttk.Label(master, text=lang['enter_workspace_name']).pack(padx=10, pady=5, anchor=tk.W)
+        self.remark_var = tk.StringVar(value=self.initial_remark)
+        self.remark_entry = ttk.Entry(master, textvariable=self.remark_var, width=40)
+        self.remark_entry.pack(padx=10, pady=5, fill=tk.X)
+        return self.remark_entry
+
 class ExportMethodDialog(simpledialog.Dialog):
-    """用于选择导出方式的对话框（TXT文件或剪贴板）"""
+    """用于选择导出方式（文件或剪贴板）、格式和字段的对话框"""
+    # 默认导出的字段，与原来的 账号----密码----其它 一致
+    DEFAULT_FIELDS = ("account", "password", "others")
+
     def __init__(self, parent):
-        self.result = None  # 存储用户选择的导出方式："txt" 或 "clipboard"
+        self.result = None  # 存储用户选择的导出方式："file" 或 "clipboard"
+        self.format = "txt"
+        self.fields = None  # None 表示默认字段
         super().__init__(parent, title=lang['select_export_method'])
 
     def body(self, master):
-        # 不添加说明文本，只保留标题
+        from exporter import FIELDS, FORMATS
+        format_frame = ttk.Frame(master)
+        format_frame.pack(padx=10, pady=5, anchor=tk.W)
+        ttk.Label(format_frame, text=lang['export_format']).pack(side=tk.LEFT)
+        self.format_var = tk.StringVar(value=self.format)
+        for fmt in FORMATS:
+            ttk.Radiobutton(format_frame, text=fmt.upper(), value=fmt, variable=self.format_var).pack(side=tk.LEFT, padx=5)
+
+        fields_frame = ttk.Frame(master)
+        fields_frame.pack(padx=10, pady=5, anchor=tk.W)
+        ttk.Label(fields_frame, text=lang['export_fields']).pack(side=tk.LEFT)
+        self.field_vars = {}
+        for field in FIELDS:
+            self.field_vars[field] = tk.BooleanVar(value=field in self.DEFAULT_FIELDS)
+            ttk.Checkbutton(fields_frame, text=lang['columns'][field], variable=self.field_vars[field]).pack(side=tk.LEFT, padx=5)
         return master
 
+    def apply(self):
+        self.format = self.format_var.get()
+        fields = tuple(field for field, var in self.field_vars.items() if var.get())
+        self.fields = None if fields == self.DEFAULT_FIELDS or not fields else fields
+
     def buttonbox(self):
         box = ttk.Frame(self)
         
-        # TXT文件按钮
+        # 文件按钮
         ttk.Button(
             box, 
-            text=lang['txt_file'], 
+            text=lang['export_file'], 
             width=15, 
-            command=lambda: self.set_result("txt")
+            command=lambda: self.set_result("file")
         ).pack(side=tk.LEFT, padx=10, pady=10)
         
         # 剪贴板按钮
@@ -268,4 +297,121 @@ class ExportMethodDialog(simpledialog.Dialog):
     def set_result(self, method):
         """设置导出方式并关闭对话框"""
         self.result = method
-        self.ok()
\ No newline at end of file
+        self.ok()
+
+
+class ForecastDialog(simpledialog.Dialog):
+    """可用预测：各个时间点可用的账号数（整体和按备注等级），以及之后解除冷却的账号分布"""
+    # 表格中的时间点（与 lang['forecast_horizons'] 对应）
+    HORIZONS = ("0m", "1h", "6h", "24h", "3d", "7d")
+    # 分布图的分段：(每段时长, 段数)，与 lang['forecast_buckets'] 对应
+    BUCKETS = (("1h", 24), ("6h", 28), ("1d", 30))
+    BAR_WIDTH = 30
+
+    def __init__(self, parent, store):
+        self.store = store
+        super().__init__(parent, title=lang['forecast_title'])
+
+    def _tier_labels(self):
+        return [lang['forecast_all']] + [self.store.tier_name(tier) for tier in self.store.time_index().tiers()]
+
+    def _counts(self, time_text):
+        index = self.store.time_index()
+        return [index.count_until(time_text)] + [index.count_until(time_text, tier) for tier in index.tiers()]
+
+    def body(self, master):
+        self.now = datetime.datetime.now()
+        index = self.store.time_index()
+        labels = self._tier_labels()
+        totals = [len(index)] + [index.total(tier) for tier in index.tiers()]
+
+        # 各时间点可用数量：可用 / 共
+        columns = ["horizon"] + [f"tier{i}" for i in range(len(labels))]
+        table = ttk.Treeview(master, columns=columns, show="headings", height=len(self.HORIZONS))
+        table.heading("horizon", text=lang['forecast_time'])
+        table.column("horizon", width=110, anchor=tk.W)
+        for column, label in zip(columns[1:], labels):
+            table.heading(column, text=label)
+            table.column(column, width=90, anchor=tk.CENTER)
+        for horizon, title in zip(self.HORIZONS, lang['forecast_horizons']):
+            counts = self._counts(format_time(self.now + parse_duration(horizon)))
+            table.insert("", tk.END, values=[title] + [f"{count} / {total}" for count, total in zip(counts, totals)])
+        table.pack(padx=10, pady=5, fill=tk.X)
+
+        # 任意时间点：时长（如 2h、1d12h）或 YYYY-MM-DD HH:MM
+        query_frame = ttk.Frame(master)
+        query_frame.pack(padx=10, pady=5, fill=tk.X)
+        ttk.Label(query_frame, text=lang['forecast_at']).pack(side=tk.LEFT)
+        self.when_var = tk.StringVar(value="12h")
+        when_entry = ttk.Entry(query_frame, textvariable=self.when_var, width=18)
+        when_entry.pack(side=tk.LEFT, padx=5)
+        when_entry.bind("<Return>", self.update_query)
+        ttk.Button(query_frame, text=lang['forecast_query'], command=self.update_query).pack(side=tk.LEFT, padx=5)
+        self.query_var = tk.StringVar(value="")
+        ttk.Label(master, textvariable=self.query_var).pack(padx=10, anchor=tk.W)
+
+        # 之后解除冷却的分布
+        histogram_frame = ttk.Frame(master)
+        histogram_frame.pack(padx=10, pady=5, fill=tk.X)
+        ttk.Label(histogram_frame, text=lang['forecast_releases']).pack(side=tk.LEFT)
+        self.bucket_var = tk.StringVar(value=lang['forecast_buckets'][1])
+        bucket_box = ttk.Combobox(histogram_frame, textvariable=self.bucket_var, state="readonly", width=18,
+                                  values=lang['forecast_buckets'])
+        bucket_box.pack(side=tk.LEFT, padx=5)
+        bucket_box.bind("<<ComboboxSelected>>", self.update_histogram)
+        self.tier_var = tk.StringVar(value=labels[0])
+        tier_box = ttk.Combobox(histogram_frame, textvariable=self.tier_var, state="readonly", width=12, values=labels)
+        tier_box.pack(side=tk.LEFT, padx=5)
+        tier_box.bind("<<ComboboxSelected>>", self.update_histogram)
+        self.histogram = ttk.Treeview(master, columns=("range", "count", "bar"), show="headings", height=12)
+        self.histogram.heading("range", text=lang['forecast_range'])
+        self.histogram.heading("count", text=lang['forecast_count'])
+        self.histogram.heading("bar", text="")
+        self.histogram.column("range", width=190, anchor=tk.W)
+        self.histogram.column("count", width=60, anchor=tk.CENTER)
+        self.histogram.column("bar", width=self.BAR_WIDTH * 8, anchor=tk.W)
+        self.histogram.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
+
+        self.update_query()
+        self.update_histogram()
+        return when_entry
+
+    def _parse_when(self, text):
+        """解析时长或时间文本，返回时间文本；格式不正确时返回 None"""
+        text = text.strip()
+        if is_time_text(text):
+            return text
+        try:
+            return format_time(self.now + parse_duration(text))
+        except ValueError:
+            return None
+
+    def update_query(self, event=None):
+        time_text = self._parse_when(self.when_var.get())
+        if time_text is None:
+            self.query_var.set(lang['forecast_invalid'])
+            return
+        counts = self._counts(time_text)
+        detail = lang['forecast_separator'].join(
+            f"{label} {count}" for label, count in zip(self._tier_labels()[1:], counts[1:]))
+        self.query_var.set(lang['forecast_result'].format(time=time_text, count=counts[0], detail=detail))
+
+    def update_histogram(self, event=None):
+        step, count = self.BUCKETS[lang['forecast_buckets'].index(self.bucket_var.get())]
+        step = parse_duration(step)
+        labels = self._tier_labels()
+        tier_index = labels.index(self.tier_var.get()) if self.tier_var.get() in labels else 0
+        tier = None if tier_index == 0 else self.store.time_index().tiers()[tier_index - 1]
+        edges = [format_time(self.now + step * i) for i in range(count + 1)]
+        counts = self.store.time_index().histogram(edges, tier)
+        largest = max(counts) if counts else 0
+        self.histogram.delete(*self.histogram.get_children())
+        for start, end, released in zip(edges, edges[1:], counts):
+            bar = "█" * (round(released / largest * self.BAR_WIDTH) if largest else 0)
+            self.histogram.insert("", tk.END, values=(f"{start[5:]} – {end[5:]}", released, bar))
+
+    def buttonbox(self):
+        box = ttk.Frame(self)
+        ttk.Button(box, text=lang['close'], width=10, command=self.cancel).pack(side=tk.LEFT, padx=5, pady=5)
+        self.bind("<Escape>", self.cancel)
+        box.pack(padx=5, pady=10)
@@ -0,0 +1,94 @@
+"""流式导出：按块生成 TXT / CSV / JSON Lines 文本，写文件时不在内存中拼出完整内容
+
+TXT 默认是 账号----密码----其它，选择字段后按所选字段用 ---- 连接；CSV 第一行是字段名；
+JSON Lines 每行一个账号。界面通过 longop 在后台线程中调用 write_file，显示进度并可以取消。
+"""
+import csv
+import io
+import json
+import os
+
+from store import SEPARATOR, format_account_line
+
+FORMATS = ("txt", "csv", "jsonl")
+FIELDS = ("account", "password", "others", "remarks", "available_time")
+CHUNK_SIZE = 1000  # 每次写入的账号数
+CLIPBOARD_LIMIT = 1_000_000  # 复制到剪贴板超过这个字符数时提示改为导出文件
+
+
+def _txt_line(acc, fields):
+    if fields is None:
+        return format_account_line(acc)
+    return SEPARATOR.join(str(acc.get(field, '')) for field in fields)
+
+
+def iter_chunks(accounts, fmt="txt", fields=None, chunk_size=CHUNK_SIZE):
+    """逐块生成导出文本；每块以换行结尾（TXT 最后一行除外，与原来的导出内容保持一致）"""
+    for _, text in _iter_counted_chunks(accounts, fmt, fields, chunk_size):
+        yield text
+
+
+def _iter_counted_chunks(accounts, fmt, fields, chunk_size):
+    """生成 (本块账号数, 文本)"""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format: {fmt}")
+    if fmt != "txt" and fields is None:
+        fields = FIELDS
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(fields)
+        yield 0, buffer.getvalue()
+    first = True
+    for start in range(0, len(accounts), chunk_size):
+        chunk = accounts[start:start + chunk_size]
+        if fmt == "txt":
+            text = "\n".join(_txt_line(acc, fields) for acc in chunk)
+            yield len(chunk), text if first else "\n" + text
+        elif fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerows([acc.get(field, '') for field in fields] for acc in chunk)
+            yield len(chunk), buffer.getvalue()
+        else:
+            yield len(chunk), "".join(
+                json.dumps({field: acc.get(field, '') for field in fields}, ensure_ascii=False) + "\n"
+                for acc in chunk
+            )
+        first = False
+
+
+def text_within(accounts, fmt="txt", fields=None, limit=CLIPBOARD_LIMIT):
+    """返回完整的导出文本；超过 limit 个字符时立即停止生成并返回 None"""
+    chunks = []
+    total = 0
+    for chunk in iter_chunks(accounts, fmt, fields):
+        total += len(chunk)
+        if total > limit:
+            return None
+        chunks.append(chunk)
+    return "".join(chunks)
+
+
+def write_file(path, accounts, fmt="txt", fields=None, progress=None, cancelled=None):
+    """分块写入同目录下的临时文件，写完后替换 path，返回写入的账号数
+
+    cancelled() 为真时返回 None；取消或出错时只删除临时文件，path 原有的文件保持不变。
+    """
+    temp = path + ".tmp"
+    written = 0
+    try:
+        with open(temp, "w", encoding="utf-8", newline="") as f:
+            for count, text in _iter_counted_chunks(accounts, fmt, fields, CHUNK_SIZE):
+                if cancelled is not None and cancelled():
+                    return None
+                f.write(text)
+                written += count
+                if progress is not None:
+                    progress(written)
+        os.replace(temp, path)
+        return len(accounts)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
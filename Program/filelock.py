@@ -0,0 +1,155 @@
+"""跨进程的文件锁：用 O_CREAT | O_EXCL 创建锁文件，在共享文件夹（SMB 等）上也能使用
+
+锁文件中记录持有者的主机名和进程号。持有期间后台线程每隔 stale_after / 3 秒更新一次锁文件的修改时间，
+持有时间再长（例如在后台线程中写很大的账号池）也不会被当作失效。持有者异常退出时锁文件会残留：
+同一台机器上的进程已不存在时立即删除，其它机器上的超过 stale_after 秒未更新时删除。
+等待时间 timeout 长于 stale_after，残留的锁总能在等待期间被清除。
+
+删除残留的锁时先把它改成只有本进程知道的名字（改名是原子的，同一个锁只有一个进程能改名成功），
+再确认拿到的仍是判断为失效的那个文件才删除；判断之后锁已被其它进程清除并重新获取时放回原处。
+每次获取时锁文件中还写入一个随机标识，释放时只删除自己写的锁。
+"""
+import os
+import socket
+import threading
+import time
+import uuid
+
+
+class LockTimeout(OSError):
+    pass
+
+
+def _process_alive(pid):
+    """本机上的进程是否还在运行"""
+    if os.name == 'nt':
+        import ctypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return ctypes.get_last_error() == 5  # 拒绝访问说明进程存在
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_text(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _parse_owner(text):
+    """锁文件内容中的 (主机名, 进程号)，无法解析时返回 None"""
+    try:
+        host, pid = text.split()[:2]
+        return host, int(pid)
+    except (AttributeError, ValueError):
+        return None
+
+
+class FileLock:
+    def __init__(self, path, timeout=60.0, stale_after=30.0, poll_interval=0.05):
+        self.path = path
+        self.timeout = max(timeout, stale_after + 1)
+        self.stale_after = stale_after
+        self.poll_interval = poll_interval
+        self._held = False
+        self._content = None  # 本次获取时写入锁文件的内容
+        self._stop_refresh = None
+
+    def try_acquire(self):
+        """尝试一次（残留的锁先清除），返回是否得到锁"""
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            self._break_stale()
+            return False
+        self._content = f"{socket.gethostname()} {os.getpid()} {uuid.uuid4().hex}\n"
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self._content)
+        self._held = True
+        self._start_refresh()
+        return True
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f"timed out waiting for lock: {self.path}")
+            time.sleep(self.poll_interval)
+
+    def _start_refresh(self):
+        stop = self._stop_refresh = threading.Event()
+
+        def refresh():
+            while not stop.wait(self.stale_after / 3):
+                try:
+                    os.utime(self.path)
+                except OSError:
+                    pass
+
+        threading.Thread(target=refresh, name="filelock-refresh", daemon=True).start()
+
+    def _break_stale(self):
+        try:
+            before = os.stat(self.path)
+        except OSError:
+            return
+        content = _read_text(self.path)
+        owner = _parse_owner(content)
+        dead = owner is not None and owner[0] == socket.gethostname() and not _process_alive(owner[1])
+        if not dead and time.time() - before.st_mtime <= self.stale_after:
+            return
+        grabbed = f"{self.path}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(self.path, grabbed)
+        except OSError:
+            return  # 已被其它进程清除
+        try:
+            after = os.stat(grabbed)
+        except OSError:
+            return
+        if (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns) and _read_text(grabbed) == content:
+            print(f"删除失效的锁文件: {self.path}")
+        else:
+            # 改名的已是新获取的锁：原处还没有锁时放回
+            try:
+                os.link(grabbed, self.path)
+            except OSError:
+                pass
+        try:
+            os.remove(grabbed)
+        except OSError:
+            pass
+
+    def release(self):
+        if self._held:
+            self._held = False
+            self._stop_refresh.set()
+            if _read_text(self.path) != self._content:
+                print(f"锁文件已被其它进程替换，不删除: {self.path}")
+                return
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
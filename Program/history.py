@@ -0,0 +1,115 @@
+"""撤销/重做：每次操作只记录反向所需的差异，而不是整份账号数据
+
+Delta 记录一次操作中每个账号被修改字段的旧值和新值、被删除的账号（连同删除前的位置）以及新增的账号。
+AccountStore.recording() 在操作期间收集 Delta，AccountStore.apply_delta() 把它整体撤销或重做，
+批量修改上万个账号也只是一次操作。History 按估算的内存占用而不是步数限制保留的操作。
+"""
+import collections
+
+DEFAULT_LIMIT_BYTES = 16 * 1024 * 1024
+# 估算内存占用时每个字段修改、每条账号记录的固定开销（字典、元组和引用）
+FIELD_OVERHEAD = 160
+RECORD_OVERHEAD = 600
+
+
+def _value_size(value):
+    return len(value) if isinstance(value, str) else 8
+
+
+class Delta:
+    """一次操作的差异
+
+    fields:  {账号: {字段: [旧值, 新值]}}
+    removed: [(在原始顺序中的位置, 在显示顺序中的位置, 账号对象)]，按原始位置升序
+    added:   [账号对象]，按追加顺序
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.fields = {}
+        self.removed = []
+        self.added = []
+        self.size = 0
+
+    def note(self, acc, field):
+        """字段修改前调用；同一操作中只记录第一次修改前的值"""
+        changes = self.fields.setdefault(acc['account'], {})
+        if field not in changes:
+            changes[field] = [acc.get(field, ''), None]
+
+    def finish(self, lookup):
+        """操作结束：填入新值，去掉没有实际变化的字段，并估算占用的内存"""
+        size = 0
+        for account in list(self.fields):
+            acc = lookup(account)
+            changes = self.fields[account]
+            for field in list(changes):
+                if acc is None:
+                    del changes[field]
+                    continue
+                changes[field][1] = acc.get(field, '')
+                old, new = changes[field]
+                if old == new:
+                    del changes[field]
+                else:
+                    size += FIELD_OVERHEAD + _value_size(old) + _value_size(new)
+            if not changes:
+                del self.fields[account]
+        for acc in [entry[2] for entry in self.removed] + self.added:
+            size += RECORD_OVERHEAD + sum(_value_size(value) for value in acc.values())
+        self.size = size
+
+    def __bool__(self):
+        return bool(self.fields or self.removed or self.added)
+
+    def __len__(self):
+        """涉及的账号数"""
+        return len(self.fields) + len(self.removed) + len(self.added)
+
+
+class History:
+    """撤销和重做栈；撤销栈中的操作总占用超过 limit_bytes 时丢弃最早的操作（最近一次操作总会保留）"""
+
+    def __init__(self, limit_bytes=DEFAULT_LIMIT_BYTES):
+        self.limit_bytes = limit_bytes
+        self._undo = collections.deque()
+        self._redo = []
+        self.size = 0
+
+    def push(self, delta):
+        """记录一次新操作（空操作忽略），同时清空重做栈"""
+        if not delta:
+            return
+        self._undo.append(delta)
+        self.size += delta.size
+        self._redo = []
+        while self.size > self.limit_bytes and len(self._undo) > 1:
+            self.size -= self._undo.popleft().size
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo(self):
+        """取出要撤销的操作，没有时返回 None"""
+        if not self._undo:
+            return None
+        delta = self._undo.pop()
+        self.size -= delta.size
+        self._redo.append(delta)
+        return delta
+
+    def redo(self):
+        if not self._redo:
+            return None
+        delta = self._redo.pop()
+        self._undo.append(delta)
+        self.size += delta.size
+        return delta
+
+    def clear(self):
+        self._undo.clear()
+        self._redo = []
+        self.size = 0
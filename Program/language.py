@@ -26,7 +26,11 @@ LANGUAGES = {
             'available_time': "可用时间",
             'remarks': "备注",
             'shortcut': "冷却时间",
-            'others': "其它"
+            'others': "其它",
+            'last_login': "上次登录",
+            'logins_7d': "7天登录",
+            'logins_30d': "30天登录",
+            'avg_gap': "平均间隔"
         },
         'status_available': "可用",
         'status_unavailable': "不可用",
@@ -90,6 +94,86 @@ LANGUAGES = {
         '_minute': "分",
 
         'login_account': '登录此账号',
+
+        'profiling': "性能分析",
+        'profile_enable': "记录耗时",
+        'profile_export': "导出 Chrome Trace...",
+        'profile_clear': "清空记录",
+        'profile_readout': "重绘 {ms:.1f} 毫秒 · {rows} 行",
+        'profile_exported': "已导出 {count} 条记录到 {path}",
+
+        'steam_not_found': "未检测到Steam安装路径，无法登录",
+
+        'login_status_killing': "正在关闭 {detail}...",
+        'login_status_waiting': "等待进程退出...",
+        'login_status_launching': "正在启动Steam: {account}",
+        'login_status_done': "已启动Steam: {account}（{detail}）",
+        'login_status_failed': "登录 {account} 失败: {detail}",
+        'login_status_cancelled': "已取消登录: {account}",
+
+        'login_latencies': "最近切换耗时",
+        'login_latencies_empty': "还没有切换记录",
+
+        'login_next': "登录下一个可用",
+        'next_cooldown': "登录后冷却:",
+        'next_cooldown_none': "不设置",
+        'no_available_account': "没有可用的账号",
+
+        'workspace': "账号池:",
+        'new_workspace': "新建账号池",
+        'enter_workspace_name': "请输入新账号池的名称:",
+        'workspace_invalid': "账号池名称无效或已存在: {name}",
+
+        'export_file': "导出文件",
+        'export_format': "格式:",
+        'export_fields': "字段:",
+        'clipboard_too_large': "选中了 {count} 个账号，内容较大，复制到剪贴板可能很慢。\n是否改为导出到文件？（选“否”仍复制到剪贴板）",
+
+        'sync_failed': "同步失败: {error}",
+
+        'query_invalid': "查询格式不正确：{error}",
+
+        'group_label': "{remark}（可用 {available} / 共 {total}）",
+        'no_remarks': "无备注",
+
+        'undone': "已撤销：{action}（{count} 个账号）",
+        'redone': "已重做：{action}（{count} 个账号）",
+        'nothing_to_undo': "没有可撤销的操作",
+        'nothing_to_redo': "没有可重做的操作",
+
+        'other_remarks': "其它备注",
+        'availability_counter': "可用 {available}/{total}（{tiers}），24 小时内再有 {soon} 个",
+        'forecast': "可用预测",
+        'forecast_title': "可用预测",
+        'forecast_all': "全部",
+        'forecast_time': "时间",
+        'forecast_horizons': ["现在", "1 小时后", "6 小时后", "24 小时后", "3 天后", "7 天后"],
+        'forecast_at': "可用时间截至（如 12h、1d6h 或 YYYY-MM-DD HH:MM）:",
+        'forecast_query': "查询",
+        'forecast_invalid': "时间格式不正确",
+        'forecast_result': "到 {time} 共 {count} 个可用：{detail}",
+        'forecast_separator': "，",
+        'forecast_releases': "解除冷却分布:",
+        'forecast_buckets': ["每小时（24 小时）", "每 6 小时（7 天）", "每天（30 天）"],
+        'forecast_range': "时间段",
+        'forecast_count': "数量",
+        'close': "关闭",
+
+        'progress_text': "{label}：{done}/{total}",
+        'progress_rate': "，每秒 {rate:.0f} 个",
+        'progress_eta': "，剩余约 {eta}",
+        'eta_seconds': "{seconds} 秒",
+        'eta_minutes': "{minutes} 分 {seconds} 秒",
+        'progress_cancelling': "（正在取消）",
+        'operation_cancelled': "已取消：{label}",
+        'loading': "加载账号",
+        'saving': "保存",
+        'sorting': "排序",
+        'displaying': "显示账号",
+        'undoing': "撤销",
+        'redoing': "重做",
+        'deselecting': "取消选择",
+        'applying_external': "应用外部修改",
     },
     'English': {
         'app_title': "Steam Account Manager - v{version}",
@@ -118,7 +202,11 @@ LANGUAGES = {
             'available_time': "Available Time",
             'remarks': "Remarks",
             'shortcut': "Cooldown",
-            'others': "Others"
+            'others': "Others",
+            'last_login': "Last Login",
+            'logins_7d': "7d Logins",
+            'logins_30d': "30d Logins",
+            'avg_gap': "Avg Gap"
         },
         'status_available': "Available",
         'status_unavailable': "Unavailable",
@@ -182,5 +270,85 @@ LANGUAGES = {
         '_minute': "Minute",
 
         'login_account': 'Login this account',
+
+        'profiling': "Profiling",
+        'profile_enable': "Record Timings",
+        'profile_export': "Export Chrome Trace...",
+        'profile_clear': "Clear Records",
+        'profile_readout': "Repaint {ms:.1f} ms · {rows} rows",
+        'profile_exported': "Exported {count} records to {path}",
+
+        'steam_not_found': "Steam installation not found, unable to log in",
+
+        'login_status_killing': "Closing {detail}...",
+        'login_status_waiting': "Waiting for processes to exit...",
+        'login_status_launching': "Launching Steam: {account}",
+        'login_status_done': "Steam launched: {account} ({detail})",
+        'login_status_failed': "Login {account} failed: {detail}",
+        'login_status_cancelled': "Login cancelled: {account}",
+
+        'login_latencies': "Recent Switch Latencies",
+        'login_latencies_empty': "No account switches yet",
+
+        'login_next': "Login Next Available",
+        'next_cooldown': "Cooldown after login:",
+        'next_cooldown_none': "None",
+        'no_available_account': "No available account",
+
+        'workspace': "Pool:",
+        'new_workspace': "New Pool",
+        'enter_workspace_name': "Enter a name for the new pool:",
+        'workspace_invalid': "Invalid or existing pool name: {name}",
+
+        'export_file': "Export File",
+        'export_format': "Format:",
+        'export_fields': "Fields:",
+        'clipboard_too_large': "{count} accounts selected; copying this much to the clipboard may be slow.\nExport to a file instead? (Choose No to copy anyway)",
+
+        'sync_failed': "Sync failed: {error}",
+
+        'query_invalid': "Invalid search query: {error}",
+
+        'group_label': "{remark} ({available} available / {total})",
+        'no_remarks': "No remarks",
+
+        'undone': "Undone: {action} ({count} accounts)",
+        'redone': "Redone: {action} ({count} accounts)",
+        'nothing_to_undo': "Nothing to undo",
+        'nothing_to_redo': "Nothing to redo",
+
+        'other_remarks': "Other remarks",
+        'availability_counter': "Available {available}/{total} ({tiers}), {soon} more within 24h",
+        'forecast': "Forecast",
+        'forecast_title': "Availability Forecast",
+        'forecast_all': "All",
+        'forecast_time': "Time",
+        'forecast_horizons': ["Now", "In 1 hour", "In 6 hours", "In 24 hours", "In 3 days", "In 7 days"],
+        'forecast_at': "Available by (e.g. 12h, 1d6h or YYYY-MM-DD HH:MM):",
+        'forecast_query': "Query",
+        'forecast_invalid': "Invalid time",
+        'forecast_result': "{count} available by {time}: {detail}",
+        'forecast_separator': ", ",
+        'forecast_releases': "Upcoming releases:",
+        'forecast_buckets': ["Hourly (24 hours)", "Every 6 hours (7 days)", "Daily (30 days)"],
+        'forecast_range': "Period",
+        'forecast_count': "Count",
+        'close': "Close",
+
+        'progress_text': "{label}: {done}/{total}",
+        'progress_rate': ", {rate:.0f}/s",
+        'progress_eta': ", about {eta} left",
+        'eta_seconds': "{seconds}s",
+        'eta_minutes': "{minutes}m {seconds}s",
+        'progress_cancelling': " (cancelling)",
+        'operation_cancelled': "Cancelled: {label}",
+        'loading': "Loading accounts",
+        'saving': "Saving",
+        'sorting': "Sorting",
+        'displaying': "Showing accounts",
+        'undoing': "Undo",
+        'redoing': "Redo",
+        'deselecting': "Deselect",
+        'applying_external': "Apply external changes",
     }
 }
\ No newline at end of file
@@ -0,0 +1,274 @@
+"""登录流水线：在后台线程中结束旧进程、等待其退出并启动 Steam
+
+结束和启动进程的命令由 ProcessCommands 提供，进程是否在运行由探测器（TasklistProbe、ProcProbe）判断，
+两者都可以替换（例如在 Linux 上用替身程序测试）。没有在运行的进程不会去结束；结束后按有上限的退避间隔
+轮询，确认退出后再启动。每个阶段都会计时，最近几次切换的耗时保存在 LoginWorker.recent_latencies。
+新的登录请求会取消尚未启动 Steam 的旧请求。状态通过 on_status(phase, job, detail) 回调报告，
+回调在工作线程中执行，界面需要自行转回主线程。
+"""
+import collections
+import csv
+import os
+import subprocess
+import threading
+import time
+
+import profiler
+
+# Windows 下不弹出控制台窗口；其它平台没有这个标志
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+DEFAULT_KILL_COMMAND = ("taskkill", "/F", "/IM", "{name}")
+# 按顺序结束的进程
+KILL_IMAGES = ("cs2.exe", "steam.exe")
+SETTLE_SECONDS = 1.0  # 没有探测器时，结束进程后固定等待的时间
+EXIT_TIMEOUT = 10.0  # 等待进程退出的最长时间
+POLL_INITIAL = 0.02  # 轮询间隔从 20 毫秒开始翻倍，最多 0.5 秒
+POLL_MAX = 0.5
+RECENT_LATENCIES = 20
+
+PHASE_KILLING = "killing"
+PHASE_WAITING = "waiting"
+PHASE_LAUNCHING = "launching"
+PHASE_DONE = "done"
+PHASE_FAILED = "failed"
+PHASE_CANCELLED = "cancelled"
+
+
+class ProcessCommands:
+    """结束和启动进程的默认实现"""
+
+    def __init__(self, kill_command=DEFAULT_KILL_COMMAND):
+        self.kill_command = tuple(kill_command)
+
+    def kill(self, image_name):
+        """强制结束指定映像名的进程，返回是否成功"""
+        argv = [part.format(name=image_name) for part in self.kill_command]
+        try:
+            result = subprocess.run(
+                argv,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                creationflags=_NO_WINDOW
+            )
+        except OSError as e:
+            print(f"{image_name}: {e}")
+            return False
+        if result.returncode != 0:
+            print(f"{result.stderr}")
+            return False
+        print(f"{image_name} 进程已成功关闭")
+        return True
+
+    def launch(self, argv):
+        return subprocess.Popen(argv, creationflags=_NO_WINDOW)
+
+
+class TasklistProbe:
+    """Windows：用 tasklist 读取进程表"""
+
+    def running_images(self):
+        """返回正在运行的映像名集合（小写），读取失败时返回 None"""
+        try:
+            result = subprocess.run(
+                ["tasklist", "/FO", "CSV", "/NH"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                creationflags=_NO_WINDOW
+            )
+        except OSError as e:
+            print(f"tasklist: {e}")
+            return None
+        if result.returncode != 0:
+            return None
+        return {row[0].lower() for row in csv.reader(result.stdout.splitlines()) if row}
+
+
+class ProcProbe:
+    """Linux：读取 /proc，按进程名和命令行前两项的文件名匹配（便于用 python 脚本充当替身程序）"""
+
+    def __init__(self, proc_dir="/proc"):
+        self.proc_dir = proc_dir
+
+    def running_images(self):
+        images = set()
+        try:
+            pids = [name for name in os.listdir(self.proc_dir) if name.isdigit()]
+        except OSError:
+            return None
+        for pid in pids:
+            try:
+                with open(os.path.join(self.proc_dir, pid, "stat"), 'rb') as f:
+                    stat = f.read()
+                # 僵尸进程已经退出，只是还没被回收
+                if stat[stat.rfind(b")") + 2:stat.rfind(b")") + 3] == b"Z":
+                    continue
+                with open(os.path.join(self.proc_dir, pid, "cmdline"), 'rb') as f:
+                    argv = f.read().split(b"\0")[:2]
+            except OSError:
+                continue  # 进程已经退出
+            images.update(os.path.basename(arg).decode(errors="replace").lower() for arg in argv if arg)
+        return images
+
+
+def default_probe():
+    if os.name == "nt":
+        return TasklistProbe()
+    if os.path.isdir("/proc"):
+        return ProcProbe()
+    return None
+
+
+class LoginJob:
+    def __init__(self, account, password, steam_exe, extra_args=("-RememberPassword",)):
+        self.account = account
+        self.password = password
+        self.steam_exe = steam_exe
+        self.extra_args = tuple(extra_args)
+        self.process = None
+        self.submitted_at = time.perf_counter()
+        self.timings = {}  # 阶段 -> 秒
+        self._cancelled = threading.Event()
+
+    def argv(self):
+        return [self.steam_exe, "-login", self.account, self.password, *self.extra_args]
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def wait_cancelled(self, timeout):
+        """等待 timeout 秒，期间被取消时立即返回 True"""
+        return self._cancelled.wait(timeout)
+
+    def total_seconds(self):
+        """从提交到启动 Steam 的总耗时"""
+        return sum(self.timings.values())
+
+
+class LoginWorker:
+    """单线程登录队列：同一时间只保留最新的一个待执行请求"""
+
+    def __init__(self, commands=None, on_status=None, kill_images=KILL_IMAGES, settle_seconds=SETTLE_SECONDS,
+                 probe="default", exit_timeout=EXIT_TIMEOUT):
+        self.commands = commands or ProcessCommands()
+        self.on_status = on_status or (lambda phase, job, detail=None: None)
+        self.kill_images = tuple(kill_images)
+        self.settle_seconds = settle_seconds
+        # probe 为 None 时不探测，退回到结束进程后固定等待 settle_seconds
+        self.probe = default_probe() if probe == "default" else probe
+        self.exit_timeout = exit_timeout
+        self.recent_latencies = collections.deque(maxlen=RECENT_LATENCIES)  # (账号, {阶段: 秒})
+        self._condition = threading.Condition()
+        self._pending = None
+        self._current = None
+        self._thread = None
+
+    def submit(self, job):
+        """提交登录请求，并取消还没有启动 Steam 的旧请求"""
+        with self._condition:
+            if self._pending is not None:
+                self._pending.cancel()
+                self.on_status(PHASE_CANCELLED, self._pending)
+            if self._current is not None:
+                self._current.cancel()
+            self._pending = job
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="login-worker", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return job
+
+    def is_busy(self):
+        with self._condition:
+            return self._pending is not None or self._current is not None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    # 空闲一段时间后退出线程，下次提交时再创建
+                    if not self._condition.wait(timeout=30) and self._pending is None:
+                        self._thread = None
+                        return
+                job, self._pending = self._pending, None
+                self._current = job
+            try:
+                self._execute(job)
+            finally:
+                with self._condition:
+                    self._current = None
+
+    def _running(self, images):
+        """返回 images 中仍在运行的映像名；无法探测时返回 None"""
+        running = self.probe.running_images() if self.probe is not None else None
+        if running is None:
+            return None
+        return [name for name in images if name.lower() in running]
+
+    def _wait_for_exit(self, job, images):
+        """按翻倍的间隔轮询，直到进程全部退出或超时；被取消时返回 None，否则返回仍在运行的映像名"""
+        deadline = time.perf_counter() + self.exit_timeout
+        delay = POLL_INITIAL
+        while True:
+            running = self._running(images)
+            if not running:
+                return []
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return running
+            if job.wait_cancelled(min(delay, remaining)):
+                return None
+            delay = min(delay * 2, POLL_MAX)
+
+    def _timed(self, job, phase, start):
+        end = time.perf_counter()
+        job.timings[phase] = end - start
+        profiler.record("login." + phase, start, end, account=job.account)
+        return end
+
+    def _execute(self, job):
+        start = self._timed(job, "queued", job.submitted_at)
+        # 只结束正在运行的进程；无法探测时全部尝试结束
+        running = self._running(self.kill_images)
+        start = self._timed(job, "probe", start)
+        to_kill = self.kill_images if running is None else running
+        for image_name in to_kill:
+            if job.cancelled:
+                self.on_status(PHASE_CANCELLED, job)
+                return
+            self.on_status(PHASE_KILLING, job, image_name)
+            self.commands.kill(image_name)
+        start = self._timed(job, "kill", start)
+
+        if to_kill:
+            self.on_status(PHASE_WAITING, job)
+            if running is None:
+                still_running = None if job.wait_cancelled(self.settle_seconds) else []
+            else:
+                still_running = self._wait_for_exit(job, to_kill)
+            if still_running is None:
+                self.on_status(PHASE_CANCELLED, job)
+                return
+            if still_running:
+                print(f"等待退出超时: {', '.join(still_running)}")
+        start = self._timed(job, "wait", start)
+
+        if job.cancelled:
+            self.on_status(PHASE_CANCELLED, job)
+            return
+        self.on_status(PHASE_LAUNCHING, job)
+        try:
+            job.process = self.commands.launch(job.argv())
+        except OSError as e:
+            self.on_status(PHASE_FAILED, job, str(e))
+            return
+        self._timed(job, "launch", start)
+        self.recent_latencies.append((job.account, dict(job.timings)))
+        profiler.record("login.switch", job.submitted_at, time.perf_counter(), account=job.account)
+        self.on_status(PHASE_DONE, job, f"{job.total_seconds() * 1000:.0f} ms")
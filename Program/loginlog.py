@@ -0,0 +1,217 @@
+"""账号登录记录：只追加的定长记录日志，以及按账号增量维护的统计
+
+每次登录结束（成功、失败或取消）追加一条 92 字节的记录：
+    最后登录时间, 最早登录时间, 次数, 结果, 切换耗时（秒）, 账号（UTF-8，最长 64 字节）
+逐次登录的记录中最早、最后时间相同、次数为 1。文件超过一定大小时整理一次：最近 RAW_DAYS 天的记录原样保留，
+更早的成功记录按账号合并为每月一条，超过一年的合并为每年一条，失败和取消的旧记录丢弃，
+这样用很多年文件也只有几百 KB。合并后的记录保留最早、最后时间和次数，统计结果不变。
+
+内存中每个账号的统计（上次登录、最近 7 天和 30 天的登录次数、平均间隔）在加载时计算一次，之后每次登录增量更新。
+文件读写都加跨进程锁，多个实例可以共用同一个日志。
+"""
+import bisect
+import datetime
+import os
+import struct
+import time
+
+from filelock import FileLock
+
+LOG_NAME = "login_history.bin"
+RECORD = struct.Struct("<qqIBxxxf64s")
+ACCOUNT_BYTES = 64  # Steam 账号名最长 64 个字符
+OUTCOME_OK, OUTCOME_FAILED, OUTCOME_CANCELLED = 0, 1, 2
+DAY = 86400
+WINDOW_DAYS = (7, 30)
+RAW_DAYS = 35  # 保留逐次记录的天数，不能短于最长的统计窗口
+MONTHLY_DAYS = 365  # 一年内按月合并，更早的按年合并
+ROTATE_BYTES = 512 * 1024
+
+# 统计列
+LAST_LOGIN, LOGINS_7D, LOGINS_30D, AVG_GAP = "last_login", "logins_7d", "logins_30d", "avg_gap"
+COLUMNS = (LAST_LOGIN, LOGINS_7D, LOGINS_30D, AVG_GAP)
+
+
+class Rollup:
+    """一个账号的统计：最早和最后一次成功登录、成功次数，以及最近 30 天内每次登录的时间（升序）"""
+    __slots__ = ("first", "last", "count", "recent")
+
+    def __init__(self):
+        self.first = None
+        self.last = None
+        self.count = 0
+        self.recent = []
+
+    def add(self, first, last, count, cutoff):
+        self.first = first if self.first is None else min(self.first, first)
+        self.last = last if self.last is None else max(self.last, last)
+        self.count += count
+        if count == 1 and last >= cutoff:
+            bisect.insort(self.recent, last)
+
+    def expire(self, cutoff):
+        """丢掉超出最长统计窗口的登录时间"""
+        index = bisect.bisect_left(self.recent, cutoff)
+        if index:
+            del self.recent[:index]
+
+    def count_since(self, since):
+        return len(self.recent) - bisect.bisect_left(self.recent, since)
+
+    def average_gap(self):
+        """平均两次登录间隔的秒数，少于两次登录时返回 None"""
+        if self.count < 2:
+            return None
+        return (self.last - self.first) / (self.count - 1)
+
+
+def _name(account):
+    """记录中保存的账号名：超过 64 字节时截断"""
+    if len(account) * 4 <= ACCOUNT_BYTES:
+        return account
+    return account.encode('utf-8')[:ACCOUNT_BYTES].decode('utf-8', 'ignore')
+
+
+def _pack(account, first, last, count, outcome, duration):
+    return RECORD.pack(int(last), int(first), count, outcome, duration, account.encode('utf-8')[:ACCOUNT_BYTES])
+
+
+def _unpack(data):
+    """解析文件内容，末尾写了一半的记录忽略；返回 [(账号, 最早, 最后, 次数, 结果, 耗时)]"""
+    usable = len(data) - len(data) % RECORD.size
+    return [
+        (name.rstrip(b"\0").decode('utf-8', 'ignore'), first, last, count, outcome, duration)
+        for last, first, count, outcome, duration, name in RECORD.iter_unpack(data[:usable])
+    ]
+
+
+def _bucket(timestamp, now):
+    """合并旧记录时的分组：一年内按月，更早的按年"""
+    day = datetime.datetime.fromtimestamp(timestamp)
+    if now - timestamp <= MONTHLY_DAYS * DAY:
+        return (day.year, day.month)
+    return (day.year, 0)
+
+
+class LoginLog:
+    def __init__(self, path=LOG_NAME):
+        self.path = path
+        self._rollups = None  # 账号 -> Rollup，第一次用到时才读取文件
+        self._rotate_at = ROTATE_BYTES
+
+    def lock(self):
+        return FileLock(self.path + ".lock")
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                return _unpack(f.read())
+        except FileNotFoundError:
+            return []
+
+    def _build(self, records, now):
+        cutoff = now - max(WINDOW_DAYS) * DAY
+        rollups = {}
+        for account, first, last, count, outcome, _ in records:
+            if outcome == OUTCOME_OK:
+                rollups.setdefault(account, Rollup()).add(first, last, count, cutoff)
+        self._rollups = rollups
+
+    def rollups(self):
+        if self._rollups is None:
+            self._build(self._read(), time.time())
+        return self._rollups
+
+    def get(self, account):
+        return self.rollups().get(_name(account))
+
+    def append(self, account, outcome, duration, timestamp=None):
+        """追加一条登录记录并更新统计；文件过大时整理"""
+        # 文件中按整秒保存，内存中的统计也用整秒，与重新加载的结果一致
+        now = int(time.time() if timestamp is None else timestamp)
+        rollups = self.rollups()
+        with self.lock():
+            with open(self.path, 'ab') as f:
+                # 上次写到一半就中断时先截掉残缺的记录，否则之后追加的记录都会错位
+                end = f.seek(0, os.SEEK_END)
+                if end % RECORD.size:
+                    print(f"登录记录末尾有不完整的记录，已截断: {self.path}")
+                    f.truncate(end - end % RECORD.size)
+                f.write(_pack(account, now, now, 1, outcome, duration))
+                size = f.tell()
+        if outcome == OUTCOME_OK:
+            rollup = rollups.setdefault(_name(account), Rollup())
+            cutoff = now - max(WINDOW_DAYS) * DAY
+            rollup.add(now, now, 1, cutoff)
+            rollup.expire(cutoff)
+        if size > self._rotate_at:
+            self.compact(now)
+
+    def compact(self, now=None):
+        """整理日志：保留最近的逐次记录，把旧记录按账号合并成每月或每年一条"""
+        now = time.time() if now is None else now
+        raw_cutoff = now - RAW_DAYS * DAY
+        with self.lock():
+            records = self._read()
+            kept, merged = [], {}
+            for record in records:
+                account, first, last, count, outcome, duration = record
+                if last >= raw_cutoff:
+                    kept.append(record)
+                elif outcome == OUTCOME_OK:
+                    key = (account, _bucket(last, now))
+                    old = merged.get(key)
+                    if old is None:
+                        merged[key] = [first, last, count, duration * count]
+                    else:
+                        old[0] = min(old[0], first)
+                        old[1] = max(old[1], last)
+                        old[2] += count
+                        old[3] += duration * count
+            buckets = [
+                (account, first, last, count, OUTCOME_OK, total / count)
+                for (account, _), (first, last, count, total) in merged.items()
+            ]
+            buckets.sort(key=lambda record: record[2])
+            temp = self.path + ".tmp"
+            with open(temp, 'wb') as f:
+                for account, first, last, count, outcome, duration in buckets + kept:
+                    f.write(_pack(account, first, last, count, outcome, duration))
+            os.replace(temp, self.path)
+            size = os.path.getsize(self.path)
+        # 合并后仍然较大时推迟下一次整理，避免每次登录都重写文件
+        self._rotate_at = max(ROTATE_BYTES, size * 2)
+        # 重新统计，同时纳入其它实例追加的记录
+        self._build(buckets + kept, now)
+        return len(records), len(buckets) + len(kept)
+
+    # ---------- 统计列 ----------
+
+    def values(self, account, now=None):
+        """(上次登录时间戳或 None, 7 天次数, 30 天次数, 平均间隔秒数或 None)"""
+        rollup = self.get(account)
+        if rollup is None:
+            return None, 0, 0, None
+        now = time.time() if now is None else now
+        short, long = WINDOW_DAYS
+        return rollup.last, rollup.count_since(now - short * DAY), rollup.count_since(now - long * DAY), rollup.average_gap()
+
+    def sort_key(self, column, now=None):
+        """统计列的排序键；没有登录过的账号排在升序的最前（间隔为最后）"""
+        rollups = self.rollups()
+        now = time.time() if now is None else now
+        if column == LAST_LOGIN:
+            return lambda acc: getattr(rollups.get(_name(acc['account'])), 'last', None) or 0
+        if column == AVG_GAP:
+            def gap_key(acc):
+                rollup = rollups.get(_name(acc['account']))
+                gap = rollup.average_gap() if rollup else None
+                return float('inf') if gap is None else gap
+            return gap_key
+        days = WINDOW_DAYS[0] if column == LOGINS_7D else WINDOW_DAYS[1]
+        since = now - days * DAY
+
+        def count_key(acc):
+            rollup = rollups.get(_name(acc['account']))
+            return rollup.count_since(since) if rollup else 0
+        return count_key
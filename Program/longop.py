@@ -0,0 +1,341 @@
+"""长操作：分块执行、在主窗口显示进度和剩余时间，可以取消
+
+操作写成生成器：每处理完一块 yield (已完成, 总数)。Runner 在 Tk 主线程中用 root.after 分片驱动它，
+每片最多运行 SLICE_MS 毫秒就把控制交还事件循环，窗口不会“未响应”。读写文件这类不涉及界面和账号数据的步骤写成
+`result = yield in_thread(func, ...)`，在后台线程中执行，主线程每 POLL_MS 毫秒检查一次是否完成。
+
+取消时向生成器抛出 Cancelled，生成器负责撤销已做的修改后重新抛出。生成器 yield COMMIT 之后修改已经生效
+（例如开始保存），不能再取消。第一片内就完成的操作同步结束，与直接调用没有区别。
+同一时间只执行一个操作，其余的排队；刷新表格（DISPLAY）为其它操作让路，新的刷新取代旧的。
+"""
+import threading
+import time
+
+CHUNK = 2000  # 每块处理的账号数
+THREAD_MIN_ACCOUNTS = 20000  # 账号少于此数时读写文件直接在主线程进行，不值得开线程
+THREAD_MIN_BYTES = 1 << 20
+SLICE_MS = 40
+POLL_MS = 50
+SHOW_AFTER_MS = 300  # 不需要独占界面的操作超过这个时间才显示进度
+DISPLAY = "display"
+SAVE = "save"
+
+
+class Cancelled(Exception):
+    """操作被用户取消"""
+
+
+COMMIT = object()
+
+
+class _InThread:
+    __slots__ = ("func", "args", "kwargs", "inline", "progress", "cancellable")
+
+    def __init__(self, func, args, kwargs, inline, progress, cancellable):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.inline = inline
+        self.progress = progress
+        self.cancellable = cancellable
+
+    def call(self, op=None):
+        kwargs = dict(self.kwargs)
+        if op is not None:
+            base = op.done
+            if self.progress:
+                kwargs['progress'] = lambda done: setattr(op, 'done', base + done)
+            if self.cancellable:
+                kwargs['cancelled'] = op.cancel_requested
+        return self.func(*self.args, **kwargs)
+
+
+def in_thread(func, *args, inline=False, progress=False, cancellable=False, **kwargs):
+    """在后台线程中执行 func，结果作为 yield 的值返回（异常在 yield 处抛出）
+
+    inline=True 时直接在主线程执行（数据量小时）。progress=True 时传入 progress(已完成) 回调，
+    cancellable=True 时传入 cancelled() 回调，例如 exporter.write_file。
+    """
+    return _InThread(func, args, kwargs, inline, progress, cancellable)
+
+
+def finish(steps):
+    """在当前线程中把操作执行完，返回生成器的返回值（命令行、测试和不需要进度时使用）"""
+    value, error = None, None
+    while True:
+        try:
+            item = steps.throw(error) if error is not None else steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value, error = None, None
+        if isinstance(item, _InThread):
+            try:
+                value = item.call()
+            except Exception as e:
+                error = e
+
+
+class Operation:
+    def __init__(self, label, steps, on_done, on_cancel, on_error, cancellable, modal, key):
+        self.label = label
+        self.steps = steps
+        self.on_done = on_done
+        self.on_cancel = on_cancel
+        self.on_error = on_error
+        self.modal = modal
+        self.key = key
+        self.done = 0
+        self.total = 0
+        self.started = None
+        self.committed = not cancellable  # 提交之后不能再取消
+        self.shown = False
+        self.after_id = None
+        self.thread = None
+        self.outcome = None  # 后台线程的 (是否成功, 结果或异常)
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def rate(self):
+        """每秒处理的数量"""
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        return self.done / elapsed if elapsed > 0 and self.done else 0
+
+    def eta(self):
+        """预计剩余秒数，还无法估计时返回 None"""
+        rate = self.rate()
+        if not rate or self.total <= self.done:
+            return None
+        return (self.total - self.done) / rate
+
+
+class Runner:
+    """依次执行长操作；view 负责显示进度（show_operation / update_operation / hide_operation），可以为 None"""
+
+    def __init__(self, root, view=None):
+        self.root = root
+        self.view = view
+        self.current = None
+        self._queue = []
+        self._closing = False
+
+    @property
+    def busy(self):
+        """是否有独占界面的操作正在执行或排队（此时不应应用外部修改）"""
+        return any(op.modal for op in ([self.current] if self.current else []) + self._queue)
+
+    def run(self, label, steps, on_done=None, on_cancel=None, on_error=None,
+            cancellable=True, modal=True, key=None, supersedes=()):
+        """开始（或排队）一个操作，返回 Operation
+
+        on_done(结果)、on_cancel()、on_error(异常) 在主线程中调用；没有 on_error 时异常照常抛出。
+        supersedes 中的 key 对应的操作（还没开始的，以及正在进行的刷新）直接丢弃。
+        """
+        op = Operation(label, steps, on_done, on_cancel, on_error, cancellable, modal, key)
+        for queued in [queued for queued in self._queue if queued.key in supersedes]:
+            self._queue.remove(queued)
+            queued.steps.close()
+        if self._closing:
+            if key == DISPLAY:
+                steps.close()
+            else:
+                self._run_blocking(op)
+            return op
+        current = self.current
+        if current is not None and current.key == DISPLAY:
+            # 刷新表格为其它操作让路：被取代时丢弃，否则暂停，等这个操作完成后继续
+            self._detach(current)
+            if DISPLAY in supersedes:
+                current.steps.close()
+            else:
+                self._queue.insert(0, current)
+        if self.current is None:
+            self._start(op)
+        else:
+            self._queue.append(op)
+        return op
+
+    def pending(self, key):
+        """是否有某类操作正在进行或排队"""
+        return any(op.key == key for op in ([self.current] if self.current else []) + self._queue)
+
+    def discard(self, key):
+        """丢弃某类还没完成的操作（排队的和正在进行的）；只用于随时可以中止、不修改数据的操作，如刷新表格"""
+        for queued in [queued for queued in self._queue if queued.key == key]:
+            self._queue.remove(queued)
+            queued.steps.close()
+        current = self.current
+        if current is not None and current.key == key:
+            self._detach(current)
+            current.steps.close()
+            if self._queue:
+                self._start(self._queue.pop(0))
+
+    def cancel(self):
+        op = self.current
+        if op is not None and not op.committed:
+            op.cancel()
+            if self.view is not None:
+                self.view.update_operation(op)
+
+    def wait(self):
+        """在当前线程中把正在执行和排队的操作全部执行完（基准测试和脚本用）"""
+        while self.current is not None or self._queue:
+            if self.current is None:
+                self._start(self._queue.pop(0))
+                continue
+            op = self.current
+            value, error = self._join(op)
+            self._advance(op, value, error, blocking=True)
+
+    def close(self):
+        """退出前调用：还没提交的操作取消（回滚），已提交的（如保存）执行完，不再调用回调"""
+        self._closing = True
+        ops = ([self.current] if self.current else []) + self._queue
+        self.current, self._queue = None, []
+        for op in ops:
+            if op.key == DISPLAY:
+                op.steps.close()
+                continue
+            if not op.committed:
+                op.cancel()
+            self._run_blocking(op)
+        self._hide()
+
+    # ---------- 内部 ----------
+
+    def _start(self, op):
+        self.current = op
+        if op.started is None:
+            op.started = time.perf_counter()
+        self._advance(op, None, None)
+
+    def _detach(self, op):
+        if op.after_id is not None:
+            self.root.after_cancel(op.after_id)
+            op.after_id = None
+        op.shown = False
+        self.current = None
+        self._hide()
+
+    def _advance(self, op, value, error, blocking=False):
+        """执行一片：直到生成器结束、开始后台步骤或用完 SLICE_MS"""
+        if op.after_id is not None:
+            self.root.after_cancel(op.after_id)
+            op.after_id = None
+        if op is not self.current:
+            return
+        deadline = time.perf_counter() + SLICE_MS / 1000
+        try:
+            while True:
+                if error is not None:
+                    item = op.steps.throw(error)
+                elif op.cancel_requested() and not op.committed:
+                    item = op.steps.throw(Cancelled())
+                else:
+                    item = op.steps.send(value)
+                value, error = None, None
+                if item is COMMIT:
+                    op.committed = True
+                elif isinstance(item, _InThread):
+                    if item.inline or blocking:
+                        try:
+                            value = item.call(op)
+                        except Exception as e:
+                            error = e
+                        continue
+                    self._start_thread(op, item)
+                    break
+                elif item is not None:
+                    op.done, op.total = item
+                if not blocking and time.perf_counter() >= deadline:
+                    op.after_id = self.root.after(1, self._advance, op, None, None)
+                    break
+        except StopIteration as stop:
+            self._finish(op, op.on_done, stop.value)
+            return
+        except Cancelled:
+            self._finish(op, op.on_cancel)
+            return
+        except Exception as e:
+            if op.on_error is None:
+                self._finish(op, None)
+                raise
+            self._finish(op, op.on_error, e)
+            return
+        self._update_view(op)
+
+    def _start_thread(self, op, item):
+        def work():
+            try:
+                op.outcome = (True, item.call(op))
+            except Exception as e:
+                op.outcome = (False, e)
+
+        op.outcome = None
+        op.thread = threading.Thread(target=work, name="long-operation", daemon=True)
+        op.thread.start()
+        op.after_id = self.root.after(POLL_MS, self._poll, op)
+
+    def _poll(self, op):
+        op.after_id = None
+        if op is not self.current:
+            return
+        if op.thread.is_alive():
+            self._update_view(op)
+            op.after_id = self.root.after(POLL_MS, self._poll, op)
+            return
+        value, error = self._join(op)
+        self._advance(op, value, error)
+
+    @staticmethod
+    def _join(op):
+        """等待后台步骤结束，返回 (结果, 异常)"""
+        if op.thread is None:
+            return None, None
+        op.thread.join()
+        op.thread = None
+        ok, result = op.outcome
+        return (result, None) if ok else (None, result)
+
+    def _run_blocking(self, op):
+        """退出时在当前线程中执行完一个操作，不调用回调"""
+        self.current = op
+        value, error = self._join(op)
+        try:
+            self._advance(op, value, error, blocking=True)
+        except Exception as e:
+            print(f"{op.label} 失败: {e}")
+        self.current = None
+
+    def _finish(self, op, callback, *args):
+        if op.after_id is not None:
+            self.root.after_cancel(op.after_id)
+            op.after_id = None
+        self.current = None
+        self._hide()
+        if self._closing:
+            return
+        if callback is not None:
+            callback(*args)
+        if self.current is None and self._queue:
+            self._start(self._queue.pop(0))
+
+    def _update_view(self, op):
+        if self.view is None or op is not self.current:
+            return
+        if not op.shown:
+            # 独占界面的操作一旦跨出第一片就显示（同时阻止其它操作），刷新表格较慢时才显示
+            if not op.modal and time.perf_counter() - op.started < SHOW_AFTER_MS / 1000:
+                return
+            op.shown = True
+            self.view.show_operation(op)
+        self.view.update_operation(op)
+
+    def _hide(self):
+        if self.view is not None:
+            self.view.hide_operation()
@@ -0,0 +1,128 @@
+"""可选的热点耗时记录，导出为 Chrome trace（chrome://tracing 或 Perfetto 打开）
+
+设置环境变量 SAM_PROFILE=1 启用，或在界面中按 Ctrl+Shift+P 打开隐藏菜单切换。
+SAM_PROFILE_TRACE=路径 时在退出前自动导出。未启用时 traced/span 只多一次布尔判断。
+"""
+import atexit
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "SAM_PROFILE"
+TRACE_ENV_VAR = "SAM_PROFILE_TRACE"
+DEFAULT_CAPACITY = 20000
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0") or bool(os.environ.get(TRACE_ENV_VAR))
+# 环形缓冲区：(名称, 开始ns, 时长ns, 线程id, 参数)
+_spans = collections.deque(maxlen=DEFAULT_CAPACITY)
+_listeners = []
+_origin_ns = time.perf_counter_ns()
+
+
+def is_enabled():
+    return _enabled
+
+
+def set_enabled(flag):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def add_listener(callback):
+    """span 结束时调用 callback(name, duration_ms)，用于界面上的实时读数"""
+    _listeners.append(callback)
+
+
+def clear():
+    _spans.clear()
+
+
+def _record(name, start_ns, end_ns, args):
+    duration_ns = end_ns - start_ns
+    _spans.append((name, start_ns, duration_ns, threading.get_ident(), args))
+    for callback in _listeners:
+        callback(name, duration_ns / 1e6)
+
+
+class span:
+    """with profiler.span("json.dump"): ... 记录一段代码的耗时"""
+    __slots__ = ("name", "args", "_start")
+
+    def __init__(self, name, **args):
+        self.name = name
+        self.args = args
+        self._start = None
+
+    def __enter__(self):
+        if _enabled:
+            self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            _record(self.name, self._start, time.perf_counter_ns(), self.args)
+        return False
+
+
+def record(name, start, end, **args):
+    """记录一段已知起止时间（time.perf_counter() 秒）的 span"""
+    if _enabled:
+        _record(name, int(start * 1e9), int(end * 1e9), args)
+
+
+def traced(name=None):
+    """装饰器：记录每次调用的耗时，默认名称为函数的限定名"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(span_name, start, time.perf_counter_ns(), None)
+        return wrapper
+    return decorator
+
+
+def spans():
+    return list(_spans)
+
+
+def last_duration_ms(name):
+    for span_name, _, duration_ns, _, _ in reversed(_spans):
+        if span_name == name:
+            return duration_ns / 1e6
+    return None
+
+
+def export_chrome_trace(path):
+    """把缓冲区中的 span 写成 Chrome trace-event JSON，返回写入的事件数"""
+    pid = os.getpid()
+    events = []
+    for name, start_ns, duration_ns, tid, args in list(_spans):
+        event = {
+            'name': name, 'ph': "X", 'pid': pid, 'tid': tid,
+            'ts': (start_ns - _origin_ns) / 1000, 'dur': duration_ns / 1000,
+        }
+        if args:
+            event['args'] = args
+        events.append(event)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': "ms"}, f, ensure_ascii=False)
+    return len(events)
+
+
+def _export_at_exit():
+    path = os.environ.get(TRACE_ENV_VAR)
+    if path and _spans:
+        export_chrome_trace(path)
+
+
+atexit.register(_export_at_exit)
@@ -0,0 +1,477 @@
+"""搜索框的查询语法：查询文字编译成执行计划，能用索引的条件先用索引缩小范围，其余条件再逐个检查
+
+以空格分隔的条件需同时满足；值中有空格时用引号括起来；条件前加 - 表示取反。
+    二级                  账号或备注包含该文字；英文字母也匹配备注的拼音首字母（ej 可以找到二级），
+                          5 个字符以上时还匹配只有一两处输错的账号
+    remark:二级           备注等于二级；remark:"" 表示没有备注
+    remark:~二            备注包含
+    account:abc           账号以 abc 开头；account:~abc 表示包含
+    others:~prime         其它信息包含；others:xxx 表示等于
+    status:available      可用；也可写 unavailable，或界面上的状态文字（可用、不可用）
+    cooldown<2d           剩余冷却少于 2 天，支持 < <= > >= 和 2h、1d12h、90m 这样的时长
+    time>=2026-11-01      按可用时间比较，只写日期时视为当天 00:00
+字段名也可以用界面上的列名，例如 备注:二级；不认识的字段名按普通文字搜索。文字比较都不区分大小写。
+
+编译结果按查询文字缓存，输入时反复筛选不会重复解析。与时间有关的条件在执行时才换算成具体时间。
+普通文字用账号的三字母组（trigram）索引找候选：包含关系要求含有文字的全部三字母组，
+编辑距离不超过 k 时最多有 3k 个三字母组不同，只有共同三字母组足够多的账号才逐个计算编辑距离。
+"""
+import bisect
+import datetime
+import functools
+import re
+
+from language import LANGUAGES
+from store import format_time, is_time_text, parse_duration, time_key
+
+_TERM_PATTERN = re.compile(r'(-?)(?:([^\s:<>=~"]+)(:~|:|<=|>=|<|>))?("[^"]*"?|\S*)')
+_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# 超过这个比例时直接按顺序扫描，比取出索引结果再排序更快
+SCAN_RATIO = 0.5
+# 普通文字至少这么长时才匹配输错的账号；9 个字符以上允许两处错误
+FUZZY_MIN_LENGTH = 5
+FUZZY_LONG_LENGTH = 9
+
+FIELD_ALIASES = {
+    'account': 'account', 'remark': 'remarks', 'remarks': 'remarks', 'others': 'others',
+    'status': 'status', 'cooldown': 'cooldown', 'time': 'available_time', 'available_time': 'available_time',
+}
+
+
+class QueryError(ValueError):
+    pass
+
+
+def trigrams(text, pad=True):
+    """文字的三字母组集合；pad 为 True 时在两端补位，使开头和结尾的字符也出现在三个组中"""
+    if pad:
+        text = "\x00\x00" + text + "\x00\x00"
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def within_distance(a, b, limit):
+    """a 与 b 的编辑距离是否不超过 limit；某一行的最小值已超过 limit 时提前结束"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def _sorted_accounts(accounts):
+    ordered = sorted(accounts, key=lambda acc: acc['account'].lower())
+    return [acc['account'].lower() for acc in ordered], ordered
+
+
+def build_postings(keys):
+    """三字母组 -> 含有它的账号在 keys 中的位置（升序）"""
+    postings = {}
+    for i, key in enumerate(keys):
+        for gram in trigrams(key):
+            postings.setdefault(gram, []).append(i)
+    return postings
+
+
+class SearchIndex:
+    """查询用的索引：按账号排序和账号的三字母组、备注 -> 账号，以及当前显示顺序中的位置
+
+    每一部分在第一次用到时才建立，并按 store 的修改计数分别失效：账号增删后重建账号部分，
+    任意数据修改后重建备注部分，顺序变化后只重建位置。三字母组可以用 prepare() 在后台线程中预先建好。
+    按可用时间的条件使用存储中增量维护的时间索引（store.time_index()），修改冷却后不必重新排序。
+    """
+
+    def __init__(self):
+        self.store = None
+        self._accounts = (None, [], [])  # (accounts_revision, 小写账号, 账号对象)
+        self._postings = (None, None)
+        self._prepared = None
+        self._remarks = (None, {})
+        self._position = (None, {})
+
+    def refresh(self, store):
+        self.store = store
+        return self
+
+    def accounts(self):
+        """(按小写账号排序的账号名, 对应的账号对象)"""
+        revision = self.store.accounts_revision
+        if self._accounts[0] != revision:
+            prepared = self._prepared
+            if prepared is not None and prepared[0] == revision:
+                self._accounts = prepared[:3]
+                self._postings = (revision, prepared[3])
+            else:
+                self._accounts = (revision,) + _sorted_accounts(self.store.original_data)
+        return self._accounts[1], self._accounts[2]
+
+    def prepare(self, store):
+        """在后台线程中建好账号部分和三字母组；建好时账号没有增删才会被采用"""
+        revision = store.accounts_revision
+        keys, accounts = _sorted_accounts(list(store.original_data))
+        self._prepared = (revision, keys, accounts, build_postings(keys))
+
+    def postings(self):
+        keys, _ = self.accounts()
+        if self._postings[0] != self._accounts[0]:
+            self._postings = (self._accounts[0], build_postings(keys))
+        return self._postings[1]
+
+    def remarks(self):
+        """备注 -> 账号列表"""
+        if self._remarks[0] != self.store.revision:
+            by_remark = {}
+            for acc in self.store.original_data:
+                by_remark.setdefault(acc.get('remarks', ''), []).append(acc)
+            self._remarks = (self.store.revision, by_remark)
+        return self._remarks[1]
+
+    def position(self):
+        """id(账号对象) -> 在当前显示顺序中的位置"""
+        if self._position[0] != self.store.order_revision:
+            self._position = (self.store.order_revision,
+                              {id(acc): i for i, acc in enumerate(self.store.accounts_data)})
+        return self._position[1]
+
+    def time_range(self, op, bound):
+        index = self.store.time_index()
+        before = index.count_until(bound, inclusive=op in ('<=', '>'))
+        names = index.names(0, before) if op in ('<', '<=') else index.names(before)
+        return [self.store.get(name) for name in names]
+
+    def time_count(self, op, bound):
+        index = self.store.time_index()
+        before = index.count_until(bound, inclusive=op in ('<=', '>'))
+        return before if op in ('<', '<=') else len(index) - before
+
+    def containing(self, text):
+        """账号中包含 text（至少三个字符）的位置，用三字母组求交集后再核对"""
+        postings = self.postings()
+        lists = sorted((postings.get(gram, ()) for gram in trigrams(text, pad=False)), key=len)
+        if not lists[0]:
+            return set()
+        found = set(lists[0])
+        for positions in lists[1:]:
+            found.intersection_update(positions)
+            if not found:
+                break
+        keys, _ = self.accounts()
+        return {i for i in found if text in keys[i]}
+
+    def similar(self, text, limit):
+        """编辑距离不超过 limit 的账号位置：共同三字母组不少于 text 的组数 - 3 * limit 的账号才计算编辑距离"""
+        postings = self.postings()
+        grams = trigrams(text)
+        needed = len(grams) - 3 * limit
+        counts = {}
+        for gram in grams:
+            for i in postings.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        keys, _ = self.accounts()
+        return {i for i, count in counts.items() if count >= needed and within_distance(text, keys[i], limit)}
+
+    def remarks_matching(self, text):
+        """备注包含 text，或者 text 是英文字母且出现在备注的拼音首字母中"""
+        initials = self.store.remark_initials() if text.isascii() and text.isalpha() else None
+        found = []
+        for remark, accounts in self.remarks().items():
+            if text in remark.lower() or (initials is not None and text in (initials.get(remark) or "").lower()):
+                found.extend(accounts)
+        return found
+
+    def prefix_range(self, prefix):
+        keys, _ = self.accounts()
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\U0010ffff")
+        return start, end
+
+
+def ctx_index(ctx):
+    """本次执行使用的索引，第一次用到时才刷新"""
+    index = ctx.get('index')
+    if index is None:
+        index = ctx['index'] = ctx['store'].search_index()
+    return index
+
+
+class Condition:
+    """一个条件；indexed 为 True 的条件可以直接从索引取出满足条件的账号"""
+    indexed = False
+
+    def test(self, acc, ctx):
+        raise NotImplementedError
+
+    def estimate(self, index, ctx):
+        return None
+
+    def candidates(self, index, ctx):
+        return None
+
+
+class Text(Condition):
+    """普通文字：账号包含、备注包含或拼音首字母包含，较长时还包括编辑距离很小的账号
+
+    匹配的账号每次执行只从索引计算一次，test 只检查是否在结果中。
+    """
+    indexed = True
+
+    def __init__(self, text):
+        self.text = text
+        if len(text) >= FUZZY_MIN_LENGTH:
+            self.limit = 2 if len(text) >= FUZZY_LONG_LENGTH else 1
+        else:
+            self.limit = 0
+
+    def _matches(self, index, ctx):
+        matches = ctx.get(self)
+        if matches is None:
+            text = self.text
+            keys, accounts = index.accounts()
+            if len(text) >= 3:
+                positions = index.containing(text)
+            else:
+                positions = {i for i, key in enumerate(keys) if text in key}
+            if self.limit:
+                positions |= index.similar(text, self.limit)
+            found = [accounts[i] for i in positions]
+            seen = {id(acc) for acc in found}
+            found.extend(acc for acc in index.remarks_matching(text) if id(acc) not in seen)
+            matches = ctx[self] = (found, {id(acc) for acc in found})
+        return matches
+
+    def test(self, acc, ctx):
+        return id(acc) in self._matches(ctx_index(ctx), ctx)[1]
+
+    def estimate(self, index, ctx):
+        return len(self._matches(index, ctx)[0])
+
+    def candidates(self, index, ctx):
+        return self._matches(index, ctx)[0]
+
+
+class Contains(Condition):
+    def __init__(self, field, text):
+        self.field, self.text = field, text
+
+    def test(self, acc, ctx):
+        return self.text in str(acc.get(self.field, '')).lower()
+
+
+class Equals(Condition):
+    def __init__(self, field, text):
+        self.field, self.text = field, text
+        self.indexed = field == 'remarks'
+
+    def test(self, acc, ctx):
+        return str(acc.get(self.field, '')).lower() == self.text
+
+    def candidates(self, index, ctx):
+        found = ctx.get(self)
+        if found is None:
+            # 不同的备注只有几种，逐个比较即可
+            found = ctx[self] = [
+                acc for remark, accounts in index.remarks().items() if remark.lower() == self.text for acc in accounts
+            ]
+        return found
+
+    def estimate(self, index, ctx):
+        return len(self.candidates(index, ctx))
+
+
+class Remarked(Condition):
+    """有备注（对应“只显示已备注”）"""
+
+    def test(self, acc, ctx):
+        return bool(acc.get('remarks', '').strip())
+
+
+class Prefix(Condition):
+    indexed = True
+
+    def __init__(self, text):
+        self.text = text
+
+    def test(self, acc, ctx):
+        return acc.get('account', '').lower().startswith(self.text)
+
+    def estimate(self, index, ctx):
+        start, end = index.prefix_range(self.text)
+        return end - start
+
+    def candidates(self, index, ctx):
+        start, end = index.prefix_range(self.text)
+        return index.accounts()[1][start:end]
+
+
+class TimeCompare(Condition):
+    """可用时间与某个时间比较；offset 不为 None 时比较的是 现在 + offset（用于 status 和 cooldown）"""
+    indexed = True
+
+    def __init__(self, op, bound=None, offset=None):
+        self.op, self.bound, self.offset = op, bound, offset
+
+    def _bound(self, ctx):
+        if self.offset is None:
+            return self.bound
+        # 每次执行只换算一次
+        bound = ctx.get(self)
+        if bound is None:
+            bound = ctx[self] = format_time(ctx['now'] + self.offset)
+        return bound
+
+    def test(self, acc, ctx):
+        value, bound = time_key(acc), self._bound(ctx)
+        if self.op == '<':
+            return value < bound
+        if self.op == '<=':
+            return value <= bound
+        if self.op == '>':
+            return value > bound
+        return value >= bound
+
+    def estimate(self, index, ctx):
+        return index.time_count(self.op, self._bound(ctx))
+
+    def candidates(self, index, ctx):
+        return index.time_range(self.op, self._bound(ctx))
+
+
+class Not(Condition):
+    def __init__(self, condition):
+        self.condition = condition
+
+    def test(self, acc, ctx):
+        return not self.condition.test(acc, ctx)
+
+
+AVAILABLE = TimeCompare('<=', offset=datetime.timedelta())
+REMARKED = Remarked()
+
+
+class Plan:
+    """编译好的查询：conditions 中的条件需全部满足"""
+
+    def __init__(self, conditions):
+        self.conditions = tuple(conditions)
+
+    def run(self, store, show_available=False, show_remarked=False):
+        """按 store 当前顺序返回满足条件的账号，并刷新这些账号的状态"""
+        now = datetime.datetime.now()
+        ctx = {'now': now, 'now_text': format_time(now), 'store': store}
+        conditions = list(self.conditions)
+        if show_available:
+            conditions.append(AVAILABLE)
+        if show_remarked:
+            conditions.append(REMARKED)
+        best = index = None
+        indexed = [condition for condition in conditions if condition.indexed]
+        if indexed:
+            index = ctx_index(ctx)
+            estimates = [(condition.estimate(index, ctx), i) for i, condition in enumerate(indexed)]
+            count, i = min(estimates)
+            if count <= len(store.accounts_data) * SCAN_RATIO:
+                best = indexed[i]
+        if best is None:
+            source = store.accounts_data
+            rest = conditions
+        else:
+            position = index.position()
+            source = sorted(best.candidates(index, ctx), key=lambda acc: position[id(acc)])
+            rest = [condition for condition in conditions if condition is not best]
+        if rest:
+            source = [acc for acc in source if all(condition.test(acc, ctx) for condition in rest)]
+        else:
+            source = list(source)
+        now_text = ctx['now_text']
+        for acc in source:
+            store.refresh_status(acc, now_text)
+        return source
+
+
+def _unquote(value):
+    if value.startswith('"'):
+        return value[1:-1] if len(value) > 1 and value.endswith('"') else value[1:]
+    return value
+
+
+def _time_bound(text):
+    if _DATE_PATTERN.match(text):
+        text += " 00:00"
+    if not is_time_text(text):
+        raise QueryError(f"invalid time: {text!r}")
+    return text
+
+
+def _status_condition(value):
+    if value == 'available' or value in _STATUS_WORDS['status_available']:
+        return AVAILABLE
+    if value == 'unavailable' or value in _STATUS_WORDS['status_unavailable']:
+        return Not(AVAILABLE)
+    raise QueryError(f"invalid status: {value!r}")
+
+
+def _field_condition(field, op, value):
+    if field == 'status':
+        if op != ':':
+            raise QueryError("status only supports ':'")
+        return _status_condition(value)
+    if field in ('cooldown', 'available_time'):
+        if op in (':', ':~'):
+            raise QueryError(f"{field} needs <, <=, > or >=")
+        if field == 'cooldown':
+            try:
+                return TimeCompare(op, offset=parse_duration(value))
+            except ValueError as e:
+                raise QueryError(str(e)) from None
+        return TimeCompare(op, bound=_time_bound(value))
+    if op not in (':', ':~'):
+        raise QueryError(f"{field} only supports ':' and ':~'")
+    if op == ':~':
+        return Contains(field, value)
+    if field == 'account':
+        return Prefix(value)
+    return Equals(field, value)
+
+
+# 各语言的状态文字和列名都可以在查询中使用
+_STATUS_WORDS = {
+    key: {texts[key].lower() for texts in LANGUAGES.values()} for key in ('status_available', 'status_unavailable')
+}
+_FIELD_NAMES = dict(FIELD_ALIASES)
+for _texts in LANGUAGES.values():
+    for _column, _title in _texts['columns'].items():
+        if _column == 'shortcut':
+            _FIELD_NAMES[_title.lower()] = 'cooldown'
+        elif _column in FIELD_ALIASES:
+            _FIELD_NAMES[_title.lower()] = FIELD_ALIASES[_column]
+
+
+def parse(text):
+    """把查询文字解析成条件列表，格式不正确时抛出 QueryError"""
+    conditions = []
+    for match in _TERM_PATTERN.finditer(text):
+        negate, name, op, value = match.groups()
+        field = _FIELD_NAMES.get(name.lower()) if name else None
+        if name and field is None:
+            # 不是字段名，整段按普通文字搜索
+            field, value = None, name + op + value
+        value = _unquote(value).lower()
+        if field is None:
+            if not value:
+                continue
+            condition = Text(value)
+        else:
+            condition = _field_condition(field, op, value)
+        conditions.append(Not(condition) if negate else condition)
+    return conditions
+
+
+@functools.lru_cache(maxsize=128)
+def compile_query(text):
+    """编译查询文字，结果按文字缓存"""
+    return Plan(parse(text.strip()))
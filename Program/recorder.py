@@ -0,0 +1,100 @@
+"""界面操作录制：把一次会话中的高层操作逐行写入 JSON Lines 文件，用于回放性能测试
+
+设置环境变量 SAM_RECORD=路径 启用。每行是 {"t": 距开始的秒数, "action": 操作, ...参数}，
+行用“当前显示的第几行”而不是账号名记录，回放时可以在生成的测试数据上重现同样的操作。
+回放见 benchmarks/replay.py。未启用时 log 只多一次判断。
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+ENV_VAR = "SAM_RECORD"
+
+# 操作名（回放脚本按这些名称驱动对应的处理函数）
+SEARCH = "search"
+TOGGLE = "toggle"
+SORT = "sort"
+PRESS = "press"
+DRAG = "drag"
+RELEASE = "release"
+RIGHT_CLICK = "right_click"
+MENU = "menu"
+GROUP = "group"
+SELECT_ALL = "select_all"
+UNDO = "undo"
+REDO = "redo"
+
+
+class Recorder:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def log(self, action, **args):
+        entry = {'t': round(time.perf_counter() - self._start, 3), 'action': action}
+        entry.update(args)
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+_recorder = None
+
+
+def start(path):
+    global _recorder
+    stop()
+    _recorder = Recorder(path)
+    return _recorder
+
+
+def stop():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def is_enabled():
+    return _recorder is not None
+
+
+def log(action, **args):
+    if _recorder is not None:
+        _recorder.log(action, **args)
+
+
+def wrap_menu(menu):
+    """录制时让菜单项被选中时记录 (menu, label)；只包装 add_command 添加的项"""
+    add_command = menu.add_command
+
+    def recorded_add_command(label=None, command=None, **kwargs):
+        if command is not None:
+            original = command
+
+            def command():
+                log(MENU, label=label)
+                return original()
+        return add_command(label=label, command=command, **kwargs)
+
+    menu.add_command = recorded_add_command
+    return menu
+
+
+def read_session(path):
+    """读取录制文件，返回操作列表（跳过空行）"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+if os.environ.get(ENV_VAR):
+    start(os.environ[ENV_VAR])
+    atexit.register(stop)
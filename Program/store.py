@@ -0,0 +1,878 @@
+import contextlib
+import datetime
+import heapq
+import itertools
+import json
+import os
+import re
+
+import compression
+import longop
+import profiler
+from filelock import FileLock
+from history import Delta
+from loginlog import COLUMNS as LOGIN_COLUMNS
+from language import LANGUAGES
+from utils import get_system_language, get_pinyin_initial_abbr
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+SEPARATOR = "----"
+# 排序时可按时间比较的列
+TIME_COLUMNS = ("available_time", "shortcut")
+_DURATION_PATTERN = re.compile(r"(\d+)\s*([dhm])", re.IGNORECASE)
+
+
+def format_time(dt):
+    """格式化为 YYYY-MM-DD HH:MM（年份始终补足4位，保证字符串顺序与时间顺序一致）"""
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
+
+MIN_TIME_TEXT = format_time(datetime.datetime.min)
+
+
+def is_time_text(text):
+    """快速判断字符串是否为规范的 YYYY-MM-DD HH:MM 格式"""
+    return (
+        isinstance(text, str) and len(text) == 16
+        and text[4] == '-' and text[7] == '-' and text[10] == ' ' and text[13] == ':'
+        and text[:4].isdigit() and text[5:7].isdigit() and text[8:10].isdigit()
+        and text[11:13].isdigit() and text[14:].isdigit()
+    )
+
+
+def parse_time(text):
+    """解析可用时间字符串，失败时返回 datetime.min"""
+    try:
+        return datetime.datetime.strptime(text, TIME_FORMAT)
+    except (ValueError, TypeError):
+        return datetime.datetime.min
+
+
+def time_key(acc):
+    """账号的规范可用时间文本，与 refresh_status 规范化后的结果相同"""
+    available_time = acc.get('available_time')
+    return available_time if is_time_text(available_time) else format_time(parse_time(available_time))
+
+
+def current_time_text():
+    return format_time(datetime.datetime.now())
+
+
+def parse_duration(text):
+    """解析 2h、3d、1d12h、90m 这样的时长，返回 timedelta，格式不正确时抛出 ValueError"""
+    text = text.strip()
+    matches = _DURATION_PATTERN.findall(text)
+    if not matches or _DURATION_PATTERN.sub("", text).strip():
+        raise ValueError(f"invalid duration: {text!r}")
+    delta = datetime.timedelta()
+    for amount, unit in matches:
+        unit = unit.lower()
+        if unit == 'd':
+            delta += datetime.timedelta(days=int(amount))
+        elif unit == 'h':
+            delta += datetime.timedelta(hours=int(amount))
+        else:
+            delta += datetime.timedelta(minutes=int(amount))
+    return delta
+
+
+def parse_account_line(line):
+    """解析一行 账号----密码----其它，格式不正确时返回 None"""
+    line = line.strip()
+    if SEPARATOR not in line:
+        return None
+    # 最多分割两次，获取账号、密码和其它信息
+    parts = line.split(SEPARATOR, 2)
+    account = parts[0].strip()
+    password = parts[1].strip() if len(parts) > 1 else ""
+    others = parts[2].strip() if len(parts) > 2 else ""
+    if account and password:
+        return account, password, others
+    return None
+
+
+def read_lines(path):
+    """读取要导入的文本文件的所有行"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.readlines()
+
+
+def file_signature(path):
+    """文件的 [修改时间, 大小]（列表，可以直接与 JSON 中保存的比较），文件不存在时返回 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def read_entries(path):
+    """读取数据文件（可能是压缩的），返回 (版本号, 记录列表)；兼容旧的纯列表格式（视为版本 0）"""
+    return compression.read_document(path)
+
+
+_ACCOUNTS_HEAD = '{\n    "accounts": ['
+_ACCOUNTS_TAIL = '\n    ]\n}'
+
+
+def write_document(path, version, entries, method=None, level=None, progress=None):
+    """写入数据文件，内容与 json.dump(..., indent=4) 相同；按块写入，progress(已写条数) 报告进度"""
+    with compression.open_text(path, 'w', method, level) as f:
+        if not entries:
+            json.dump({'version': version, 'accounts': []}, f, ensure_ascii=False, indent=4)
+            return
+        f.write('{\n    "version": %s,\n    "accounts": [' % json.dumps(version))
+        for start in range(0, len(entries), longop.CHUNK):
+            # 放在同一层级的 "accounts" 中输出再去掉首尾，缩进与整体输出时相同
+            text = json.dumps({'accounts': entries[start:start + longop.CHUNK]}, ensure_ascii=False, indent=4)
+            f.write(("," if start else "") + text[len(_ACCOUNTS_HEAD):-len(_ACCOUNTS_TAIL)])
+            if progress is not None:
+                progress(min(start + longop.CHUNK, len(entries)))
+        f.write(_ACCOUNTS_TAIL)
+
+
+def _replace_if_unchanged(path, expected_signature, version, entries, method=None, level=None, progress=None):
+    """文件签名仍是 expected_signature 时先写临时文件再替换（其它实例不会读到写了一半的文件），返回新的签名；
+    文件已被其它实例修改时不写，返回 None。调用方需持有文件锁"""
+    if file_signature(path) != expected_signature:
+        return None
+    temp = path + ".tmp"
+    write_document(temp, version, entries, method, level, progress)
+    os.replace(temp, path)
+    return file_signature(path)
+
+
+def _write_locked(lock, path, expected_signature, version, entries, method=None, level=None, progress=None):
+    """等到文件锁后写入（在后台线程中执行，见 AccountStore.save_steps）"""
+    with lock:
+        return _replace_if_unchanged(path, expected_signature, version, entries, method, level, progress)
+
+
+def _entry_hash(entry):
+    """文件中一条记录的哈希，用于判断记录是否被外部修改
+
+    不对键排序：键顺序不同只会让记录被当作已修改重新应用一次，结果不变。
+    """
+    try:
+        return hash(tuple(entry.items()))
+    except TypeError:
+        # 含有列表等不可哈希的值
+        return hash(json.dumps(entry, sort_keys=True, ensure_ascii=False))
+
+
+def _merge_at(items, inserts):
+    """把 [(位置, 元素)]（按位置升序）放回列表；位置是放回后元素所在的位置，一次遍历完成"""
+    result = []
+    remaining = iter(items)
+    for position, item in inserts:
+        while len(result) < position:
+            existing = next(remaining, _MISSING)
+            if existing is _MISSING:
+                break
+            result.append(existing)
+        result.append(item)
+    result.extend(remaining)
+    return result
+
+
+_MISSING = object()
+
+
+def format_account_line(acc):
+    # 有其它信息则导出三部分，否则只导出账号密码
+    if acc.get('others'):
+        return f"{acc['account']}{SEPARATOR}{acc['password']}{SEPARATOR}{acc['others']}"
+    return f"{acc['account']}{SEPARATOR}{acc['password']}"
+
+
+class AccountStore:
+    """不依赖GUI的账号数据核心：负责加载、保存、导入、筛选、排序、冷却和导出"""
+    REMARKS_TO_JSON = {"": 0, "一级": 1, "二级": 2, "Level 1": 1, "Level 2": 2}
+    # 仅在运行时使用、不写入文件的字段
+    RUNTIME_FIELDS = ('tree_id', 'selected_state', 'status')
+    # “登录下一个可用账号”时备注等级的优先顺序：一级、二级、无备注，其它自定义备注最后
+    NEXT_TIER_ORDER = (1, 2, 0)
+
+    def __init__(self, data_file="accounts_data.json", lang=None):
+        self.data_file = data_file
+        self.lang = lang if lang is not None else LANGUAGES[get_system_language()]
+        self.REMARKS_FROM_JSON = {0: "", 1: self.lang['remarks_options'][1], 2: self.lang['remarks_options'][2]}
+        self.accounts_data = []   # 当前（可能已排序的）顺序
+        self.original_data = []   # 原始顺序，用于恢复未排序状态；与 accounts_data 共享同一批账号对象
+        self._by_account = {}
+        self.loaded = False  # 是否已从文件加载过
+        # 最近一次读写时文件的签名和每条记录的哈希，用于检测并增量应用外部修改
+        self._signature = None
+        self._hashes = {}
+        self._version = 0  # 文件中的版本号，每次保存加一
+        self._compression = compression.NONE  # 文件当前的压缩方法，未指定压缩方法时保存沿用
+        # 按备注等级分组的最小堆 [(可用时间, 序号, 账号对象)]；账号修改后旧条目不删除，取出时再跳过
+        self._tier_heaps = {}
+        self._heap_entries = 0
+        self._heap_seq = itertools.count()
+        # 按可用时间排序的索引（timeindex.TimeIndex），第一次用到时建立，之后随冷却和备注的修改增量更新
+        self._time_index = None
+        # 修改计数，查询索引据此判断是否需要重建：任意数据、账号增删、显示顺序
+        self.revision = 0
+        self.accounts_revision = 0
+        self.order_revision = 0
+        self._search_index = None
+        # 出现过的备注 -> 拼音首字母（第一次用到时才计算，避免启动时导入 pypinyin）
+        self._remark_initials = {}
+        self._delta = None  # recording() 期间收集撤销用的差异
+        self.login_log = None  # 登录记录（loginlog.LoginLog），用于按登录统计排序；由 Workspace 设置
+
+    def __len__(self):
+        return len(self.original_data)
+
+    def get(self, account):
+        return self._by_account.get(account)
+
+    def is_taken(self, account):
+        """账号是否已属于其它账号池；由 Workspace 为每个账号池替换"""
+        return False
+
+    def after_save(self):
+        """保存后的回调；由 Workspace 替换以更新账号池索引"""
+
+    def clear(self):
+        self.accounts_data = []
+        self.original_data = []
+        self._by_account = {}
+        self._tier_heaps = {}
+        self._heap_entries = 0
+        self._time_index = None
+        self._remark_initials = {}
+        self.revision += 1
+        self.accounts_revision += 1
+        self.order_revision += 1
+
+    # ---------- 加载与保存 ----------
+
+    def _normalize_entry(self, entry, default_time):
+        entry.setdefault('selected_state', False)
+        entry.setdefault('available_time', default_time)
+        entry.setdefault('others', '')
+        # 兼容数字和字符串
+        if isinstance(entry.get('remarks', ""), int):
+            entry['remarks'] = self.REMARKS_FROM_JSON.get(entry.get('remarks', 0), '')
+        else:
+            entry['remarks'] = entry.get('remarks', '')
+        entry.pop('id', None)
+        entry.pop('shortcut', None)
+        entry.pop('delay_days', None)
+        entry.pop('delay_hours', None)
+        entry.pop('status', None)
+        return entry
+
+    @profiler.traced("store.load")
+    def load(self):
+        """从数据文件加载账号，文件不存在时视为空；其它错误向上抛出"""
+        longop.finish(self.load_steps())
+
+    def load_steps(self):
+        """分块加载（见 longop）：文件较大时在后台线程中读取；整理记录期间可以取消，
+        此时内存中的数据不变，之后一次换成新数据"""
+        signature = file_signature(self.data_file)
+        try:
+            method = compression.detect(self.data_file)
+            with profiler.span("json.load"):
+                version, loaded_entries = yield longop.in_thread(
+                    read_entries, self.data_file, inline=signature is None or signature[1] < longop.THREAD_MIN_BYTES)
+        except FileNotFoundError:
+            self.clear()
+            self.loaded = True
+            self._signature, self._hashes, self._version = None, {}, 0
+            return
+        default_time = current_time_text()
+        total = len(loaded_entries)
+        hashes = {}
+        for start in range(0, total, longop.CHUNK):
+            with profiler.span("store.normalize", count=min(longop.CHUNK, total - start)):
+                for entry in loaded_entries[start:start + longop.CHUNK]:
+                    hashes[entry.get('account')] = _entry_hash(entry)
+                    self._normalize_entry(entry, default_time)
+            yield min(start + longop.CHUNK, total), 2 * total
+        yield longop.COMMIT
+        self.clear()
+        self.loaded = True
+        for start in range(0, total, longop.CHUNK):
+            for entry in loaded_entries[start:start + longop.CHUNK]:
+                self._append(entry)
+            yield total + min(start + longop.CHUNK, total), 2 * total
+        self._compression = method
+        self._signature, self._hashes, self._version = signature, hashes, version
+
+    def has_external_changes(self):
+        """数据文件的修改时间或大小与最近一次读写时不同"""
+        return self.loaded and file_signature(self.data_file) != self._signature
+
+    @profiler.traced("store.reload_changes")
+    def reload_changes(self):
+        """重新读取被外部修改的数据文件，按账号和记录哈希比较，只应用新增、删除和修改的记录
+
+        修改的记录原地更新（保留选中状态等运行时字段），新增的追加到末尾；返回 (新增, 删除的账号名, 修改)。
+        """
+        return longop.finish(self.reload_steps())
+
+    def reload_steps(self):
+        """分块应用外部修改（见 longop），返回值同 reload_changes；取消时由调用方用 recording() 的记录回滚，
+        文件签名不变，下次检查时会重新应用"""
+        signature = file_signature(self.data_file)
+        try:
+            version, entries = yield longop.in_thread(
+                read_entries, self.data_file, inline=signature is None or signature[1] < longop.THREAD_MIN_BYTES)
+        except FileNotFoundError:
+            version, entries = 0, []
+        default_time = current_time_text()
+        hashes = {}
+        added, changed = [], []
+        for start in range(0, len(entries), longop.CHUNK):
+            for entry in entries[start:start + longop.CHUNK]:
+                account = entry.get('account')
+                if not account or account in hashes:
+                    continue
+                entry_hash = hashes[account] = _entry_hash(entry)
+                acc = self._by_account.get(account)
+                if acc is None:
+                    acc = self._normalize_entry(entry, default_time)
+                    self._append(acc)
+                    added.append(acc)
+                elif self._hashes.get(account) != entry_hash:
+                    self._replace_entry(acc, entry, default_time)
+                    changed.append(acc)
+            yield min(start + longop.CHUNK, len(entries)), len(entries)
+        removed = [account for account in self._by_account if account not in hashes]
+        yield from self.delete_steps(removed)
+        self._signature, self._hashes, self._version = signature, hashes, version
+        # 内存中的数据已与文件一致
+        self.after_save()
+        return added, removed, changed
+
+    def _replace_entry(self, acc, entry, default_time):
+        """用文件中的记录原地更新账号对象，保留选中状态等运行时字段"""
+        runtime = {key: acc[key] for key in self.RUNTIME_FIELDS if key in acc}
+        if self._delta is not None:
+            for field in set(acc).union(entry).difference(self.RUNTIME_FIELDS):
+                self._delta.note(acc, field)
+        acc.clear()
+        acc.update(self._normalize_entry(entry, default_time))
+        acc.update(runtime)
+        self._index_push(acc)
+
+    def _merge_disk_entries(self, entries):
+        """把其它实例保存到文件中的修改合并到内存，返回 (新增, 删除的账号名, 修改)
+
+        以上次读写时每条记录的哈希为基准：只有文件一方修改的记录采用文件中的内容，只有本实例修改的保留本实例的，
+        两边都修改了同一账号时以本实例为准。其它实例新增的账号加入，其它实例删除且本实例未修改的账号删除。
+        """
+        base = self._hashes
+        default_time = current_time_text()
+        added, changed = [], []
+        on_disk = {}  # 账号 -> 文件中记录的哈希
+        for entry in entries:
+            account = entry.get('account')
+            if not account or account in on_disk:
+                continue
+            entry_hash = on_disk[account] = _entry_hash(entry)
+            base_hash = base.get(account)
+            if entry_hash == base_hash:
+                continue  # 文件中没有变化
+            acc = self._by_account.get(account)
+            if acc is None:
+                if base_hash is None:
+                    acc = self._normalize_entry(entry, default_time)
+                    self._append(acc)
+                    added.append(acc)
+                continue  # 否则是本实例已删除
+            if base_hash is None or _entry_hash(self.to_json_entry(acc)) != base_hash:
+                continue  # 本实例也修改（或新增）了这个账号
+            self._replace_entry(acc, entry, default_time)
+            changed.append(acc)
+        removed = [
+            account for account, base_hash in base.items()
+            if account not in on_disk and account in self._by_account
+            and _entry_hash(self.to_json_entry(self._by_account[account])) == base_hash
+        ]
+        self.delete_accounts(removed)
+        # 之后以文件中的内容为基准判断哪些记录是本实例修改的
+        self._hashes = on_disk
+        return added, removed, changed
+
+    def apply_remote(self, updates, deleted):
+        """应用同步得到的修改：updates 为 {账号: {字段: 文件格式的值}}，已有账号只覆盖给出的字段
+
+        返回 (新增, 删除的账号名, 修改)。
+        """
+        default_time = current_time_text()
+        added, changed = [], []
+        for account, fields in updates.items():
+            acc = self._by_account.get(account)
+            if acc is None:
+                acc = self._normalize_entry(dict(fields, account=account), default_time)
+                self._append(acc)
+                added.append(acc)
+                continue
+            entry = self.to_json_entry(acc)
+            merged = dict(entry, **fields)
+            if merged != entry:
+                self._replace_entry(acc, merged, default_time)
+                changed.append(acc)
+        removed = [account for account in deleted if account in self._by_account]
+        self.delete_accounts(removed)
+        return added, removed, changed
+
+    def lock(self):
+        """数据文件的跨进程锁，多个实例同时保存时依次进行"""
+        return FileLock(self.data_file + ".lock")
+
+    def to_json_entry(self, acc):
+        entry = {key: value for key, value in acc.items() if key not in self.RUNTIME_FIELDS}
+        # 固定备注保存为数字，其它内容直接存字符串
+        remarks = entry.get('remarks', '')
+        if remarks in self.REMARKS_TO_JSON:
+            entry['remarks'] = self.REMARKS_TO_JSON[remarks]
+        return entry
+
+    @profiler.traced("store.save")
+    def save(self):
+        """加锁保存；文件在上次读写后被其它实例修改过时先逐条合并
+
+        返回合并进来的 (新增, 删除的账号名, 修改)，没有合并时返回 None。
+        """
+        return longop.finish(self.save_steps())
+
+    def save_steps(self):
+        """分块保存（见 save 和 longop）：转换记录时每块报告一次进度，账号较多时在后台线程中写文件；保存不能取消
+
+        文件锁只在写文件时持有：等锁和写入都在后台线程中进行（锁空闲且账号不多时直接写），
+        界面不会因为其它实例正在保存而卡住。写入前在锁内确认文件没有再被修改，否则重新合并后再写。
+        """
+        merged = None
+        while True:
+            version = self._version
+            signature = file_signature(self.data_file)
+            if signature != self._signature:
+                try:
+                    with profiler.span("store.merge"):
+                        version, entries = read_entries(self.data_file)
+                        changes = self._merge_disk_entries(entries)
+                    merged = changes if merged is None else tuple(a + b for a, b in zip(merged, changes))
+                except FileNotFoundError:
+                    pass
+                self._signature = signature
+            total = len(self.original_data)
+            data_to_save = []
+            for start in range(0, total, longop.CHUNK):
+                with profiler.span("store.to_json_entries", count=min(longop.CHUNK, total - start)):
+                    data_to_save.extend(map(self.to_json_entry, self.original_data[start:start + longop.CHUNK]))
+                yield len(data_to_save), 2 * total
+            method, level = compression.configured() or (self._compression, None)
+            lock = self.lock()
+            with profiler.span("json.dump", count=total, compression=method):
+                if total < longop.THREAD_MIN_ACCOUNTS and lock.try_acquire():
+                    try:
+                        written = _replace_if_unchanged(self.data_file, signature, version + 1, data_to_save, method, level)
+                    finally:
+                        lock.release()
+                else:
+                    written = yield longop.in_thread(_write_locked, lock, self.data_file, signature, version + 1,
+                                                     data_to_save, method, level, progress=True)
+            if written is not None:
+                break
+            # 合并之后其它实例又保存过，重新合并
+        self._compression = method
+        self._signature = written
+        self._version = version + 1
+        with profiler.span("store.hash"):
+            self._hashes = {entry['account']: _entry_hash(entry) for entry in data_to_save}
+        self.after_save()
+        return merged
+
+    # ---------- 添加、导入与删除 ----------
+
+    def _append(self, acc):
+        self.accounts_data.append(acc)
+        self.original_data.append(acc)
+        self._by_account[acc['account']] = acc
+        self.accounts_revision += 1
+        self.order_revision += 1
+        self._index_push(acc)
+        if self._delta is not None:
+            self._delta.added.append(acc)
+
+    def add_account(self, account, password, others=""):
+        """添加新账号，账号已存在（包括在其它账号池中）时返回 False（只检查账号，不考虑密码）"""
+        if account in self._by_account or self.is_taken(account):
+            return False
+        self._append({
+            'account': account,
+            'password': password.strip(),
+            'available_time': current_time_text(),
+            'remarks': '',
+            'selected_state': False,
+            'others': others
+        })
+        return True
+
+    @profiler.traced("store.import_lines")
+    def import_lines(self, lines):
+        """导入 账号----密码----其它 格式的多行文本，返回新增账号数"""
+        return longop.finish(self.import_steps(lines))
+
+    def import_steps(self, lines):
+        """分块导入（见 longop），返回新增账号数；取消时由调用方用 recording() 的记录回滚"""
+        lines = lines if isinstance(lines, list) else list(lines)
+        new_accounts_count = 0
+        for start in range(0, len(lines), longop.CHUNK):
+            for line in lines[start:start + longop.CHUNK]:
+                parsed = parse_account_line(line)
+                if parsed and self.add_account(*parsed):
+                    new_accounts_count += 1
+            yield min(start + longop.CHUNK, len(lines)), len(lines)
+        return new_accounts_count
+
+    def import_txt(self, filepath):
+        return self.import_lines(read_lines(filepath))
+
+    def delete_accounts(self, accounts):
+        """按账号名删除，返回实际删除的数量"""
+        return longop.finish(self.delete_steps(accounts))
+
+    def delete_steps(self, accounts):
+        """分块删除（见 longop）：先逐块挑出保留的账号，这期间可以取消且数据不变，最后一次替换"""
+        accounts = set(accounts) & self._by_account.keys()
+        if not accounts:
+            return 0
+        total = len(self.accounts_data) + len(self.original_data)
+        done = 0
+        kept, removed = [], []
+        for data in (self.accounts_data, self.original_data):
+            keep, gone = [], []
+            for start in range(0, len(data), longop.CHUNK):
+                chunk = data[start:start + longop.CHUNK]
+                keep.extend([acc for acc in chunk if acc['account'] not in accounts])
+                if self._delta is not None:
+                    gone.extend([(start + i, acc) for i, acc in enumerate(chunk) if acc['account'] in accounts])
+                done += len(chunk)
+                yield done, total
+            kept.append(keep)
+            removed.append(gone)
+        if self._delta is not None:
+            display_position = {id(acc): i for i, acc in removed[0]}
+            self._delta.removed.extend(
+                (i, display_position.get(id(acc), len(self.accounts_data)), acc) for i, acc in removed[1]
+            )
+        self.accounts_data, self.original_data = kept
+        for account in accounts:
+            del self._by_account[account]
+        if self._time_index is not None:
+            for account in accounts:
+                self._time_index.remove(account)
+        self.revision += 1
+        self.accounts_revision += 1
+        self.order_revision += 1
+        return len(accounts)
+
+    # ---------- 撤销与重做 ----------
+
+    @contextlib.contextmanager
+    def recording(self, label):
+        """在 with 块中收集修改，得到可撤销的 Delta（与 history.History 配合使用）"""
+        delta = self._delta = Delta(label)
+        try:
+            yield delta
+        finally:
+            self._delta = None
+            delta.finish(self._by_account.get)
+
+    def apply_delta(self, delta, undo=True):
+        """整体撤销（undo=True）或重做一次操作：账号的增删各只重建一次列表，字段按账号名恢复"""
+        longop.finish(self.apply_delta_steps(delta, undo))
+
+    def apply_delta_steps(self, delta, undo=True):
+        """分块撤销或重做（见 longop）；在 recording() 中执行时同样记录所做的修改，取消时由调用方据此回滚"""
+        if undo:
+            yield from self.delete_steps([acc['account'] for acc in delta.added])
+            yield from self._insert_steps(delta.removed)
+        else:
+            yield from self.delete_steps([acc['account'] for _, _, acc in delta.removed])
+            for acc in delta.added:
+                if acc['account'] not in self._by_account:
+                    self._append(acc)
+        value_index = 0 if undo else 1
+        fields = list(delta.fields.items())
+        for start in range(0, len(fields), longop.CHUNK):
+            for account, changes in fields[start:start + longop.CHUNK]:
+                acc = self._by_account.get(account)
+                if acc is None:
+                    continue  # 账号已被其它实例删除
+                for field, values in changes.items():
+                    if self._delta is not None:
+                        self._delta.note(acc, field)
+                    acc[field] = values[value_index]
+                self._index_push(acc)
+                self.refresh_status(acc)
+            yield min(start + longop.CHUNK, len(fields)), len(fields)
+
+    def _insert_steps(self, removed):
+        """把删除的账号放回删除前的位置，removed 为 [(原始位置, 显示位置, 账号对象)]
+
+        先分块登记账号（取消时回滚会按账号名删除已登记的），最后一次合并回两个列表。
+        """
+        removed = [entry for entry in removed if entry[2]['account'] not in self._by_account]
+        if not removed:
+            return
+        for start in range(0, len(removed), longop.CHUNK):
+            chunk = [acc for _, _, acc in removed[start:start + longop.CHUNK]]
+            for acc in chunk:
+                self._by_account[acc['account']] = acc
+                self._index_push(acc)
+            if self._delta is not None:
+                self._delta.added.extend(chunk)
+            yield min(start + longop.CHUNK, len(removed)), len(removed)
+        self.original_data = _merge_at(self.original_data, [(entry[0], entry[2]) for entry in removed])
+        self.accounts_data = _merge_at(self.accounts_data, sorted((entry[1], entry[2]) for entry in removed))
+        self.revision += 1
+        self.accounts_revision += 1
+        self.order_revision += 1
+
+    # ---------- 状态、冷却与备注 ----------
+
+    def refresh_status(self, acc, now_text=None):
+        """根据可用时间刷新状态，顺便把不规范的时间规范化"""
+        available_time = acc.get('available_time')
+        if not is_time_text(available_time):
+            available_time = format_time(parse_time(available_time))
+            acc['available_time'] = available_time
+            self._index_push(acc)
+        if now_text is None:
+            now_text = current_time_text()
+        # 规范格式下字符串顺序即时间顺序，无需逐条 strptime
+        if available_time <= now_text:
+            acc['status'] = self.lang['status_available']
+        else:
+            acc['status'] = self.lang['status_unavailable']
+
+    def update_status(self, acc, new_available_time_dt=None):
+        if new_available_time_dt is not None:
+            if self._delta is not None:
+                self._delta.note(acc, 'available_time')
+            acc['available_time'] = format_time(new_available_time_dt)
+            self._index_push(acc)
+        self.refresh_status(acc)
+
+    def apply_cooldown(self, acc, action_type, hours=0, days=0):
+        """reset 立即可用，delta 从现在起冷却指定时长；返回是否有修改"""
+        now = datetime.datetime.now()
+        if action_type == "reset":
+            new_available_time_dt = now
+        elif action_type == "delta":
+            new_available_time_dt = now + datetime.timedelta(days=days, hours=hours)
+        else:
+            return False
+        self.update_status(acc, new_available_time_dt)
+        return True
+
+    def set_remarks(self, acc, remark_text):
+        if self._delta is not None:
+            self._delta.note(acc, 'remarks')
+        acc['remarks'] = remark_text
+        self._index_push(acc)
+
+    def is_available(self, acc):
+        return acc.get('status') == self.lang['status_available']
+
+    def format_cooldown(self, acc, now=None):
+        """返回剩余冷却时间的显示文本，已可用时返回空字符串"""
+        available_dt = parse_time(acc.get('available_time'))
+        if now is None:
+            now = datetime.datetime.now()
+        if available_dt <= now:
+            return ""
+        time_left = available_dt - now
+        days = time_left.days
+        hours = time_left.seconds // 3600
+
+        # 根据语言和数量选择正确的单复数形式
+        day_unit = self.lang['day'] if days == 1 else self.lang['days']
+        hour_unit = self.lang['hour'] if hours == 1 else self.lang['hours']
+
+        if days > 0:
+            return f"{days} {day_unit} {hours} {hour_unit}" if hours > 0 else f"{days} {day_unit}"
+        elif hours > 0:
+            return f"{hours} {hour_unit}"
+        return self.lang['less_than_one_hour']
+
+    # ---------- 下一个可用账号 ----------
+
+    def _tier(self, acc):
+        level = self.REMARKS_TO_JSON.get(acc.get('remarks', ''))
+        if level in self.NEXT_TIER_ORDER:
+            return self.NEXT_TIER_ORDER.index(level)
+        return len(self.NEXT_TIER_ORDER)
+
+    def tier_name(self, tier):
+        """备注等级的显示名称：一级、二级、无备注、其它备注"""
+        if tier < len(self.NEXT_TIER_ORDER):
+            return self.REMARKS_FROM_JSON[self.NEXT_TIER_ORDER[tier]] or self.lang['no_remarks']
+        return self.lang['other_remarks']
+
+    def _index_push(self, acc):
+        """账号的备注或可用时间变化后重新入堆，O(log n)"""
+        self.revision += 1
+        self._remark_initials.setdefault(acc.get('remarks', ''), None)
+        tier = self._tier(acc)
+        heap = self._tier_heaps.setdefault(tier, [])
+        heapq.heappush(heap, (acc.get('available_time', ''), next(self._heap_seq), acc))
+        self._heap_entries += 1
+        if self._time_index is not None:
+            self._time_index.update(acc['account'], tier, time_key(acc))
+        # 过期条目太多时重建，保持堆大小与账号数同阶
+        if self._heap_entries > 2 * len(self._by_account) + 64:
+            self._rebuild_index()
+
+    def time_index(self):
+        """按可用时间排序的索引，用于统计到某个时间可用的账号数和解除冷却的分布"""
+        from timeindex import TimeIndex
+        if self._time_index is None:
+            with profiler.span("store.time_index", count=len(self._by_account)):
+                self._time_index = TimeIndex(
+                    (acc['account'], self._tier(acc), time_key(acc)) for acc in self._by_account.values())
+        return self._time_index
+
+    def _rebuild_index(self):
+        self._tier_heaps = {}
+        for acc in self._by_account.values():
+            self._tier_heaps.setdefault(self._tier(acc), []).append(
+                (acc.get('available_time', ''), next(self._heap_seq), acc))
+        for heap in self._tier_heaps.values():
+            heapq.heapify(heap)
+        self._heap_entries = len(self._by_account)
+
+    def _is_current(self, tier, entry):
+        available_time, _, acc = entry
+        return (self._by_account.get(acc['account']) is acc
+                and acc.get('available_time', '') == available_time
+                and self._tier(acc) == tier)
+
+    def next_available(self, now_text=None, exclude=()):
+        """返回下一个要登录的可用账号：先按备注等级，再按可用得最久；没有可用账号时返回 None
+
+        exclude 为要跳过的账号名集合。每个等级只查看堆顶，过期条目弹出丢弃，均摊 O(log n)。
+        """
+        if now_text is None:
+            now_text = current_time_text()
+        for tier in sorted(self._tier_heaps):
+            heap = self._tier_heaps[tier]
+            skipped = []
+            found = None
+            while heap:
+                entry = heap[0]
+                if not self._is_current(tier, entry):
+                    heapq.heappop(heap)
+                    self._heap_entries -= 1
+                    continue
+                if entry[0] > now_text:
+                    break
+                if entry[2]['account'] in exclude:
+                    skipped.append(heapq.heappop(heap))
+                    continue
+                found = entry[2]
+                break
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+            if found is not None:
+                return found
+        return None
+
+    # ---------- 筛选与排序 ----------
+
+    @profiler.traced("store.filter")
+    def filter(self, show_available=False, show_remarked=False, search_text=""):
+        """按当前顺序返回满足条件的账号，同时刷新这些账号的状态
+
+        search_text 使用 query 模块的查询语法（普通文字仍是搜索账号和备注），格式不正确时抛出 query.QueryError。
+        """
+        from query import compile_query
+        return compile_query(search_text).run(self, show_available, show_remarked)
+
+    def remark_initials(self):
+        """返回 {备注: 拼音首字母}，只为新出现的备注计算拼音"""
+        missing = [remark for remark, initials in self._remark_initials.items() if initials is None]
+        if missing:
+            with profiler.span("pinyin", count=len(missing)):
+                for remark in missing:
+                    self._remark_initials[remark] = get_pinyin_initial_abbr(remark)
+        return self._remark_initials
+
+    def search_index(self):
+        """查询用的索引，数据或顺序变化后在下次使用时重建"""
+        from query import SearchIndex
+        if self._search_index is None:
+            self._search_index = SearchIndex()
+        return self._search_index.refresh(self)
+
+    def available_before(self, deadline, accounts=None):
+        """返回在 deadline 之前（含）可用的账号"""
+        deadline_text = format_time(deadline)
+        source = self.accounts_data if accounts is None else accounts
+        result = []
+        for acc in source:
+            self.refresh_status(acc)
+            if acc['available_time'] <= deadline_text:
+                result.append(acc)
+        return result
+
+    def sort_key(self, column):
+        if column == "remarks":
+            # 只按拼音首字母排序；相同备注只计算一次拼音
+            abbr_cache = self.remark_initials()
+            return lambda acc: abbr_cache[acc.get("remarks", "")]
+        if column in TIME_COLUMNS:
+            # 规范时间字符串可直接比较，不规范的视为最小时间
+            def key_func(acc):
+                available_time = acc.get("available_time", "")
+                return available_time if is_time_text(available_time) else MIN_TIME_TEXT
+            return key_func
+        if column in LOGIN_COLUMNS:
+            if self.login_log is None:
+                return lambda acc: 0
+            return self.login_log.sort_key(column)
+        if column == "account":
+            return lambda acc: acc.get("account", "").lower()
+        if column == "status":
+            # 可用排在前面
+            available = self.lang['status_available']
+            return lambda acc: 0 if acc.get("status", "") == available else 1
+        return lambda acc: acc.get(column)
+
+    def sort(self, column, reverse=False):
+        longop.finish(self.sort_steps(column, reverse))
+
+    def sort_steps(self, column, reverse=False):
+        """分块计算排序键（见 longop），这期间可以取消且顺序不变，最后一次排好"""
+        key_func = self.sort_key(column)
+        data = self.accounts_data
+        keys = []
+        for start in range(0, len(data), longop.CHUNK):
+            keys.extend(map(key_func, data[start:start + longop.CHUNK]))
+            yield len(keys), len(data)
+        with profiler.span("store.sort", column=column):
+            order = sorted(range(len(data)), key=keys.__getitem__, reverse=reverse)
+            self.accounts_data = [data[i] for i in order]
+        self.order_revision += 1
+
+    def reset_sorting(self):
+        # 恢复原始数据顺序
+        self.accounts_data = list(self.original_data)
+        self.order_revision += 1
+
+    # ---------- 选择与导出 ----------
+
+    def selected_accounts(self):
+        return [acc for acc in self.accounts_data if acc.get('selected_state', False)]
+
+    def export_lines(self, accounts):
+        for acc in accounts:
+            yield format_account_line(acc)
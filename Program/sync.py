@@ -0,0 +1,285 @@
+"""多台电脑共享账号池的同步：一个实例运行本地 HTTP 同步服务，其它实例只收发有变化的记录
+
+每条记录按字段保存 [值, 逻辑时钟, 节点]，逻辑时钟是 Lamport 时钟，冲突时按字段比较 (时钟, 节点)，
+较大的一方获胜（按字段的最后写入者获胜）。每条记录还带有版本向量 {节点: 时钟}，用来判断两次修改是否并发，
+并发修改计入 conflicts 统计。删除用 "_deleted" 字段表示，同样参与比较。
+
+接口：
+    GET  /snapshot   gzip 压缩的全部记录，用于首次同步
+    POST /exchange   {"node", "since", "records"}：上传本地修改，返回 since 之后服务器上变化的记录
+服务器给每次变化分配递增的序号 seq，客户端记住收到的最大序号，下次只拉取之后的变化。
+每个请求都要带共享密钥（Authorization: Bearer 密钥），否则返回 401；记录中含有明文密码，
+服务默认只监听本机，供其它电脑使用时才用 --host 指定地址。
+
+服务端：SAM_SYNC_TOKEN=密钥 python cli.py serve --host 0.0.0.0 --port 8765
+客户端：设置环境变量 SAM_SYNC_URL=http://主机:8765 和相同的 SAM_SYNC_TOKEN 后启动界面
+"""
+import gzip
+import hmac
+import json
+import os
+import threading
+import uuid
+
+DELETED = "_deleted"
+DEFAULT_PORT = 8765
+TOKEN_ENV = "SAM_SYNC_TOKEN"
+
+
+def _newer(clock_a, clock_b):
+    """字段时钟 [时钟, 节点] 比较：a 是否比 b 新"""
+    return clock_b is None or (clock_a[0], clock_a[1]) > (clock_b[0], clock_b[1])
+
+
+def _dominates(vv_a, vv_b):
+    return all(vv_a.get(node, 0) >= counter for node, counter in vv_b.items())
+
+
+def merge_record(target, incoming):
+    """把 incoming 的字段按最后写入者获胜合并进 target（原地修改），返回 (有变化的字段, 是否并发修改)"""
+    concurrent = not _dominates(target['vv'], incoming['vv']) and not _dominates(incoming['vv'], target['vv'])
+    changed = []
+    for field, (value, counter, node) in incoming['fields'].items():
+        current = target['fields'].get(field)
+        if _newer((counter, node), None if current is None else current[1:]):
+            target['fields'][field] = [value, counter, node]
+            changed.append(field)
+    for node, counter in incoming['vv'].items():
+        if counter > target['vv'].get(node, 0):
+            target['vv'][node] = counter
+    return changed, concurrent
+
+
+class SyncState:
+    """服务器上的记录表：账号 -> {'fields', 'vv', 'seq'}"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.records = {}
+        self.seq = 0
+        self.conflicts = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            self.records, self.seq = data['records'], data['seq']
+
+    def exchange(self, records, since):
+        with self._lock:
+            for account, incoming in records.items():
+                target = self.records.setdefault(account, {'fields': {}, 'vv': {}, 'seq': 0})
+                changed, concurrent = merge_record(target, incoming)
+                if concurrent:
+                    self.conflicts += 1
+                if changed:
+                    self.seq += 1
+                    target['seq'] = self.seq
+                    self.dirty = True
+            return {
+                'seq': self.seq,
+                'records': {account: record for account, record in self.records.items() if record['seq'] > since},
+            }
+
+    def snapshot(self):
+        """gzip 压缩的全部记录"""
+        with self._lock:
+            body = json.dumps({'seq': self.seq, 'records': self.records}, ensure_ascii=False)
+        return gzip.compress(body.encode('utf-8'))
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        data = self.snapshot()
+        self.dirty = False
+        temp = self.path + ".tmp"
+        with open(temp, 'wb') as f:
+            f.write(data)
+        os.replace(temp, self.path)
+
+
+class SyncServer:
+    """基于标准库 http.server 的同步服务，在后台线程运行；port 为 0 时自动选择端口"""
+
+    def __init__(self, token, host="127.0.0.1", port=DEFAULT_PORT, state_path=None, save_interval=5.0):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        if not token:
+            raise ValueError(f"sync server needs a shared token (set {TOKEN_ENV} or --token)")
+        state = self.state = SyncState(state_path)
+        expected = f"Bearer {token}".encode('utf-8')
+
+        class Handler(BaseHTTPRequestHandler):
+            def _authorized(self):
+                """检查共享密钥，不正确时回复 401"""
+                given = self.headers.get("Authorization", "").encode('utf-8')
+                if hmac.compare_digest(given, expected):
+                    return True
+                self.send_response(401)
+                self.send_header("WWW-Authenticate", "Bearer")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return False
+
+            def _reply(self, body, content_type="application/json", encoding=None):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                if encoding:
+                    self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path == "/snapshot":
+                    self._reply(state.snapshot(), encoding="gzip")
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                if self.path != "/exchange":
+                    self.send_error(404)
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    response = state.exchange(request.get('records', {}), request.get('since', 0))
+                except (ValueError, KeyError, TypeError) as e:
+                    self.send_error(400, str(e))
+                    return
+                self._reply(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+
+            def log_message(self, format, *args):
+                pass  # 不在控制台逐条打印请求
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.save_interval = save_interval
+        self._stopped = threading.Event()
+        self._threads = []
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _save_loop(self):
+        while not self._stopped.wait(self.save_interval):
+            self.state.save()
+
+    def start(self):
+        for target in (self.httpd.serve_forever, self._save_loop):
+            thread = threading.Thread(target=target, name="sync-server", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.state.save()
+
+
+class SyncClient:
+    """把 AccountStore 与同步服务对接
+
+    local_changes() 在界面线程中比较账号与上次同步时的内容，生成带新时钟的修改；transfer() 只做网络请求，
+    可以放在后台线程；apply() 再回到界面线程把服务器上的变化写入 AccountStore。
+    """
+
+    def __init__(self, store, url, token, node=None, timeout=5):
+        self.store = store
+        self.url = url.rstrip("/")
+        self.token = token
+        self.node = node or uuid.uuid4().hex[:12]
+        self.timeout = timeout
+        self.records = {}  # 上次同步时的记录，格式与服务器相同
+        self.clock = 0
+        self.seq = 0
+        self.initialized = False  # 是否已应用过首次的全量快照
+
+    def _request(self, path, body=None):
+        import urllib.request
+        request = urllib.request.Request(
+            self.url + path,
+            data=None if body is None else json.dumps(body, ensure_ascii=False).encode('utf-8'),
+            headers={"Content-Type": "application/json", "Authorization": f"Bearer {self.token}"},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            data = response.read()
+            if response.headers.get("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+        return json.loads(data)
+
+    def fetch_snapshot(self):
+        return self._request("/snapshot")
+
+    def _tick(self):
+        self.clock += 1
+        return self.clock
+
+    def local_changes(self):
+        """返回自上次同步以来本地修改过的记录（只包含修改过的字段）"""
+        changes = {}
+        current = set()
+        for acc in self.store.original_data:
+            account = acc['account']
+            current.add(account)
+            entry = self.store.to_json_entry(acc)
+            known = self.records.get(account)
+            known_fields = known['fields'] if known else {}
+            fields = {}
+            for field, value in entry.items():
+                if field not in known_fields or known_fields[field][0] != value:
+                    fields[field] = [value, self._tick(), self.node]
+            if known_fields.get(DELETED, [False])[0]:
+                fields[DELETED] = [False, self._tick(), self.node]
+            if fields:
+                changes[account] = {'fields': fields, 'vv': {}}
+        for account, known in self.records.items():
+            if account not in current and not known['fields'].get(DELETED, [False])[0]:
+                changes[account] = {'fields': {DELETED: [True, self._tick(), self.node]}, 'vv': {}}
+        for account, change in changes.items():
+            known = self.records.setdefault(account, {'fields': {}, 'vv': {}})
+            change['vv'] = dict(known['vv'], **{self.node: self.clock})
+            merge_record(known, change)
+        return changes
+
+    def transfer(self, changes):
+        """上传本地修改并拉取服务器上的变化（只做网络请求，不访问 AccountStore）"""
+        return self._request("/exchange", {'node': self.node, 'since': self.seq, 'records': changes})
+
+    def apply(self, response):
+        """把服务器返回的记录合并进本地，返回 AccountStore 的 (新增, 删除的账号名, 修改)"""
+        updates, deleted = {}, []
+        for account, incoming in response['records'].items():
+            for _, counter, _ in incoming['fields'].values():
+                self.clock = max(self.clock, counter)
+            known = self.records.setdefault(account, {'fields': {}, 'vv': {}})
+            acc = self.store.get(account)
+            pending = self._pending_fields(acc, known) if acc is not None else set()
+            changed, _ = merge_record(known, incoming)
+            # 上次 local_changes() 之后本地又改过的字段还没有上传，上传时会得到更大的时钟，按最后写入者获胜保留本地的值
+            changed = [field for field in changed if field not in pending]
+            if not changed:
+                continue
+            fields = {field: value for field, (value, _, _) in known['fields'].items()}
+            if fields.pop(DELETED, False):
+                if not pending:
+                    deleted.append(account)
+            elif acc is None:
+                updates[account] = fields
+            else:
+                # 只覆盖服务器上变化、本地没有再修改的字段
+                updates[account] = {field: fields[field] for field in changed if field in fields}
+        self.seq = max(self.seq, response['seq'])
+        self.initialized = True
+        return self.store.apply_remote(updates, deleted)
+
+    def _pending_fields(self, acc, known):
+        """账号中与上次同步时的内容不同的字段，即本地修改后尚未由 local_changes() 取走的字段"""
+        entry = self.store.to_json_entry(acc)
+        return {field for field, (value, _, _) in known['fields'].items() if field in entry and entry[field] != value}
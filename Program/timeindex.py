@@ -0,0 +1,118 @@
+"""按可用时间排序的索引：回答“到某个时间有多少账号可用”、哪些账号在某个时间范围内可用，
+以及之后一段时间内解除冷却的账号分布
+
+整体和每个备注等级各保存一个升序的 (可用时间文本, 账号名) 列表（YYYY-MM-DD HH:MM 的字符串顺序就是时间顺序，
+时间相同的按账号名排列）；到某个时间可用的数量只需一次二分查找，O(log n)。
+
+修改冷却或备注时只记下变化的账号，O(1)，下次查询时才整理列表：变化的账号不多时逐个二分查找删除旧值、插入新值，
+较多时（批量设置备注、撤销、导入）先找出所有位置再把每个列表整段拼接一次，O(n + k log n)，
+变化占了列表的大部分时直接过滤后重排，不会因为每个账号都移动一次列表而变成 O(k·n)。
+"""
+import bisect
+
+SMALL_BATCH = 64  # 变化的账号不超过这个数时逐个插入删除
+
+
+class TimeIndex:
+    def __init__(self, entries=()):
+        """entries 为 [(账号名, 备注等级, 可用时间文本)]，建立时整体排序一次"""
+        self._entries = {name: (tier, time_text) for name, tier, time_text in entries}
+        self._all = sorted((time_text, name) for name, (_, time_text) in self._entries.items())
+        self._tiers = {}
+        for key in self._all:
+            self._tiers.setdefault(self._entries[key[1]][0], []).append(key)
+        self._changed = {}  # 上次整理后变化的账号 -> 列表中的旧值 (等级, 时间)，新账号为 None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, name, tier, time_text):
+        """账号的备注等级或可用时间变化（新账号直接加入）"""
+        old = self._entries.get(name)
+        if old == (tier, time_text):
+            return
+        self._changed.setdefault(name, old)
+        self._entries[name] = (tier, time_text)
+
+    def remove(self, name):
+        old = self._entries.pop(name, None)
+        if old is not None:
+            self._changed.setdefault(name, old)
+
+    def _flush(self):
+        """把记下的变化整理进排好序的列表"""
+        if not self._changed:
+            return
+        changed, self._changed = self._changed, {}
+        removed, added = {}, {}  # 等级 -> 要删除 / 加入的 (时间, 账号名)
+        for name, old in changed.items():
+            new = self._entries.get(name)
+            if new == old:
+                continue
+            if old is not None:
+                removed.setdefault(old[0], []).append((old[1], name))
+            if new is not None:
+                added.setdefault(new[0], []).append((new[1], name))
+        all_removed = [key for keys in removed.values() for key in keys]
+        all_added = [key for keys in added.values() for key in keys]
+        self._all = self._apply(self._all, all_removed, all_added)
+        for tier in set(removed) | set(added):
+            self._tiers[tier] = self._apply(self._tiers.get(tier, []), removed.get(tier, ()), added.get(tier, ()))
+
+    @staticmethod
+    def _apply(keys, removed, added):
+        if len(removed) + len(added) <= SMALL_BATCH:
+            for key in removed:
+                del keys[bisect.bisect_left(keys, key)]
+            for key in added:
+                bisect.insort(keys, key)
+            return keys
+        if (len(removed) + len(added)) * 8 > len(keys):
+            # 变化占了列表的大部分：按账号名过滤掉旧值后整体重排，两段有序数据的排序接近一次归并
+            names = {name for _, name in removed}
+            kept = [key for key in keys if key[1] not in names] if names else list(keys)
+            kept.extend(added)
+            kept.sort()
+            return kept
+        # 在原列表中二分查找出每个旧值的位置和每个新值的插入位置，再按位置顺序把原列表的片段和新值拼接起来，
+        # 比较只有 O(k log n) 次，其余都是整段复制
+        marks = [(bisect.bisect_left(keys, key), 1, key) for key in added]
+        marks += [(bisect.bisect_left(keys, key), 2, None) for key in removed]
+        marks.sort()  # 同一位置先插入新值再跳过旧值
+        merged = []
+        start = 0
+        for pos, kind, key in marks:
+            merged += keys[start:pos]
+            if kind == 1:
+                merged.append(key)
+                start = pos
+            else:
+                start = pos + 1
+        merged += keys[start:]
+        return merged
+
+    def tiers(self):
+        """出现过的备注等级（升序）"""
+        self._flush()
+        return sorted(tier for tier, keys in self._tiers.items() if keys)
+
+    def total(self, tier=None):
+        self._flush()
+        return len(self._all if tier is None else self._tiers.get(tier, ()))
+
+    def count_until(self, time_text, tier=None, inclusive=True):
+        """可用时间不晚于（inclusive=False 时早于）time_text 的账号数；tier 为 None 时不分等级"""
+        self._flush()
+        keys = self._all if tier is None else self._tiers.get(tier, ())
+        # (time_text,) 排在同一时间的所有条目之前，(time_text + "\0",) 排在它们之后
+        return bisect.bisect_left(keys, (time_text + "\0",) if inclusive else (time_text,))
+
+    def names(self, start=0, end=None):
+        """按可用时间排序后第 start 到 end 个账号名，配合 count_until 取出某个时间之前或之后可用的账号"""
+        self._flush()
+        return [name for _, name in self._all[start:end]]
+
+    def histogram(self, edges, tier=None):
+        """edges 为升序的时间文本，返回每段 (edges[i], edges[i+1]] 内解除冷却的账号数"""
+        counts = [self.count_until(edge, tier) for edge in edges]
+        return [after - before for before, after in zip(counts, counts[1:])]
@@ -1,31 +1,86 @@
+import functools
+import json
 import locale
-import urllib.request
-import pypinyin
-from pypinyin import Style
+import sys
+import threading
+import time
 
+@functools.lru_cache(maxsize=None)
 def get_system_language():
+    # 只解析一次，所有模块共用同一结果
     lang, _ = locale.getlocale()
-    print(f"Language: {lang}")
+    print(f"Language: {lang}", file=sys.stderr)
     if lang:
-        if lang.startswith('Chinese'):
+        if lang.startswith('Chinese') or lang.startswith('zh'):
             return 'Chinese'
-        else:
-            return 'English'
+    # 无法识别的区域设置（如 Linux 下的 C locale）默认使用英文
+    return 'English'
 
 github_url = "https://raw.githubusercontent.com/ImLTHQ/SteamAccountManager/main/version"
-def check_for_update(root, title, lang, version):
+UPDATE_CACHE_FILE = "update_check.json"
+UPDATE_CACHE_SECONDS = 24 * 3600
+
+
+def _read_update_cache(cache_file):
+    """返回 (是否命中缓存, 远程版本号)；超过一天的缓存视为未命中"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if 0 <= time.time() - cache['checked_at'] < UPDATE_CACHE_SECONDS:
+            return True, cache.get('remote_version')
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return False, None
+
+
+def get_remote_version(cache_file=UPDATE_CACHE_FILE, timeout=3):
+    """获取远程版本号，一天内复用磁盘缓存；离线时返回 None（同样缓存一天）"""
+    hit, remote_version = _read_update_cache(cache_file)
+    if hit:
+        return remote_version
+    # urllib.request 会连带导入 ssl、http 等模块，只在后台检查时导入
+    import urllib.request
     try:
-        with urllib.request.urlopen(github_url, timeout=3) as response:
+        with urllib.request.urlopen(github_url, timeout=timeout) as response:
             remote_version = response.read().decode('utf-8-sig').strip()
-            if remote_version != version:
-                if lang['new_version'] not in title:
-                    root.title(title + lang['new_version'])
     except Exception:
+        remote_version = None
+    try:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'checked_at': time.time(), 'remote_version': remote_version}, f)
+    except OSError:
         pass
+    return remote_version
+
+
+def check_for_update(root, title, lang, version, cache_file=UPDATE_CACHE_FILE):
+    """在后台线程检查更新，结果通过 root.after 轮询交回界面线程，不阻塞启动"""
+    result = {}
+
+    def worker():
+        result['remote_version'] = get_remote_version(cache_file)
+
+    def poll():
+        if thread.is_alive():
+            root.after(200, poll)
+            return
+        remote_version = result.get('remote_version')
+        if remote_version and remote_version != version:
+            current_title = root.title() or title
+            if lang['new_version'] not in current_title:
+                root.title(current_title + lang['new_version'])
+
+    thread = threading.Thread(target=worker, name="update-check", daemon=True)
+    thread.start()
+    root.after(200, poll)
+    return thread
 
 def get_pinyin_initial_abbr(text):
     if not text:
         return ""
+    # pypinyin 及其词典较大，只在第一次需要拼音时导入
+    import pypinyin
+    from pypinyin import Style
     # 处理每个字符的拼音首字母
     initials = []
     for char in text:
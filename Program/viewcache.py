@@ -0,0 +1,59 @@
+"""上次首屏内容的缓存，用于启动时立即绘制
+
+缓存保存在数据文件旁（accounts_data.view.json），记录首屏行、列宽、排序和筛选状态，
+以及写入缓存时数据文件的修改时间和大小；两者任一不一致时缓存作废。
+只缓存 columns 中的列，密码和其它信息的明文列不写入缓存，由加载后的真实数据填入。
+"""
+import json
+import os
+
+from store import file_signature
+
+CACHE_VERSION = 1
+CACHE_ROWS = 100  # 只缓存首屏附近的行
+
+
+def cache_path(data_file):
+    return os.path.splitext(data_file)[0] + ".view.json"
+
+
+def load_snapshot(data_file, columns):
+    """返回有效的缓存内容；数据文件已变化或缓存损坏时删除缓存并返回 None"""
+    path = cache_path(data_file)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        discard(data_file)
+        return None
+    if (not isinstance(snapshot, dict)
+            or snapshot.get('version') != CACHE_VERSION
+            or snapshot.get('columns') != list(columns)
+            or snapshot.get('data_signature') != file_signature(data_file)):
+        discard(data_file)
+        return None
+    return snapshot
+
+
+def save_snapshot(data_file, columns, rows, column_widths, sorting_state, sort_column, filters):
+    snapshot = {
+        'version': CACHE_VERSION,
+        'columns': list(columns),
+        'data_signature': file_signature(data_file),
+        'rows': [[list(values), list(tags)] for values, tags in rows[:CACHE_ROWS]],
+        'column_widths': column_widths,
+        'sorting_state': sorting_state,
+        'sort_column': sort_column,
+        'filters': filters,
+    }
+    with open(cache_path(data_file), 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+
+
+def discard(data_file):
+    try:
+        os.remove(cache_path(data_file))
+    except OSError:
+        pass
@@ -0,0 +1,208 @@
+"""账号池（工作区）：把账号分到多个文件中，每个文件只在打开时加载、单独保存
+
+默认账号池就是原来的 accounts_data.json，其它账号池保存在 workspaces/<名称>.json。
+workspaces/.index/<名称>.json 记录每个账号池中的账号名和建立索引时文件的修改时间与大小，
+合起来就是 账号 -> 账号池 的全局索引，用来在不加载其它账号池的情况下保证账号在所有账号池中唯一。
+文件在外部被修改时只重新扫描该文件；保存一个账号池时只重写它自己的索引，耗时与这个账号池的大小成正比。
+"""
+import json
+import os
+
+from loginlog import LOG_NAME, LoginLog
+from store import AccountStore, file_signature, read_entries
+
+DEFAULT_SHARD = "accounts_data"
+WORKSPACE_DIR = "workspaces"
+INDEX_DIR = ".index"  # 每个账号池一个索引文件
+ACTIVE_NAME = "active.txt"  # 上次打开的账号池
+INDEX_VERSION = 1
+
+
+class Workspace:
+    def __init__(self, directory=WORKSPACE_DIR, default_file="accounts_data.json", lang=None):
+        self.directory = directory
+        self.default_file = default_file
+        self.lang = lang
+        self._stores = {}      # 已创建的账号池 -> AccountStore（未必已加载）
+        self._owners = None         # 账号 -> 账号池，第一次需要时才从各账号池的索引建立
+        self._shard_accounts = {}   # 账号池 -> 其中的账号名集合
+        # 所有账号池共用的登录记录（账号在账号池之间唯一），放在默认数据文件旁边
+        self.login_log = LoginLog(os.path.join(os.path.dirname(default_file), LOG_NAME))
+        self.active = self._read_active()
+
+    def _read_active(self):
+        try:
+            with open(os.path.join(self.directory, ACTIVE_NAME), 'r', encoding='utf-8') as f:
+                name = f.read().strip()
+        except OSError:
+            return DEFAULT_SHARD
+        return name if name and os.path.exists(self.shard_path(name)) else DEFAULT_SHARD
+
+    # ---------- 账号池列表 ----------
+
+    def index_path(self, name):
+        return os.path.join(self.directory, INDEX_DIR, name + ".json")
+
+    def shard_path(self, name):
+        if name == DEFAULT_SHARD:
+            return self.default_file
+        return os.path.join(self.directory, name + ".json")
+
+    def shard_names(self):
+        names = [DEFAULT_SHARD]
+        try:
+            files = sorted(os.listdir(self.directory))
+        except OSError:
+            return names
+        for filename in files:
+            name, ext = os.path.splitext(filename)
+            # 跳过首屏缓存（<名称>.view.json）
+            if ext == ".json" and not name.endswith(".view") and name != DEFAULT_SHARD:
+                names.append(name)
+        return names
+
+    def create_shard(self, name):
+        """新建空账号池，名称非法或已存在时抛出 ValueError"""
+        name = name.strip()
+        if not name or name in self.shard_names() \
+                or os.sep in name or (os.altsep and os.altsep in name) or name.endswith(".view"):
+            raise ValueError(f"invalid workspace name: {name!r}")
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.shard_path(name), 'w', encoding='utf-8') as f:
+            json.dump([], f)
+        return name
+
+    # ---------- 加载与保存 ----------
+
+    def store(self, name):
+        """返回账号池的 AccountStore，不加载数据；账号池不存在时抛出 ValueError"""
+        store = self._stores.get(name)
+        if store is None:
+            if name not in self.shard_names():
+                raise ValueError(f"unknown pool: {name!r} (pools: {', '.join(self.shard_names())})")
+            store = AccountStore(self.shard_path(name), self.lang)
+            store.is_taken = lambda account, name=name: self.owner(account, exclude=name) is not None
+            store.after_save = lambda name=name: self._update_index(name)
+            store.login_log = self.login_log
+            self._stores[name] = store
+        return store
+
+    def open(self, name):
+        """切换到账号池，第一次打开时才从文件加载"""
+        store = self.store(name)
+        if not store.loaded:
+            store.load()
+        if name != self.active:
+            self.active = name
+            if os.path.isdir(self.directory):
+                with open(os.path.join(self.directory, ACTIVE_NAME), 'w', encoding='utf-8') as f:
+                    f.write(name)
+        return store
+
+    def _update_index(self, name):
+        """账号池保存后只更新和重写它自己的索引"""
+        store = self._stores[name]
+        if not os.path.isdir(self.directory):
+            return  # 只有默认账号池，不需要索引
+        self._ensure_index()
+        self._set_shard_accounts(name, [acc['account'] for acc in store.original_data])
+        self._write_shard_index(name)
+
+    def find(self, account):
+        """在所有账号池中查找账号，只加载索引指向的那个账号池；返回 (账号池, 账号对象) 或 None"""
+        name = self.owner(account)
+        if name is None:
+            return None
+        store = self.store(name)
+        if not store.loaded:
+            store.load()
+        acc = store.get(account)
+        return (name, acc) if acc is not None else None
+
+    # ---------- 全局索引 ----------
+
+    def owner(self, account, exclude=None):
+        """返回账号所在的账号池（不含 exclude）；已加载的账号池以内存中的数据为准"""
+        for name, store in self._stores.items():
+            if name != exclude and store.get(account) is not None:
+                return name
+        if not os.path.isdir(self.directory):
+            # 只有默认账号池，不需要索引，直接在其中查找
+            if exclude == DEFAULT_SHARD:
+                return None
+            store = self.store(DEFAULT_SHARD)
+            if not store.loaded:
+                store.load()
+            return DEFAULT_SHARD if store.get(account) is not None else None
+        self._ensure_index()
+        name = self._owners.get(account)
+        if name is None or name == exclude or (name in self._stores and self._stores[name].loaded):
+            return None
+        return name
+
+    def _ensure_index(self):
+        if self._owners is not None:
+            return
+        self._owners, self._shard_accounts = {}, {}
+        names = self.shard_names()
+        for name in names:
+            accounts = self._read_shard_index(name)
+            if accounts is None:
+                # 没有索引或账号池在建立索引后被修改过：只重新扫描这个文件
+                self._set_shard_accounts(name, self._accounts_of(name))
+                self._write_shard_index(name)
+            else:
+                self._set_shard_accounts(name, accounts)
+        # 已删除的账号池的索引
+        try:
+            files = os.listdir(os.path.join(self.directory, INDEX_DIR))
+        except OSError:
+            files = []
+        for filename in files:
+            if os.path.splitext(filename)[0] not in names:
+                try:
+                    os.remove(os.path.join(self.directory, INDEX_DIR, filename))
+                except OSError:
+                    pass
+
+    def _accounts_of(self, name):
+        """账号池中的账号名；已加载的直接取内存中的数据，否则只读取文件中的账号名"""
+        store = self._stores.get(name)
+        if store is not None and store.loaded:
+            return [acc['account'] for acc in store.original_data]
+        try:
+            _, entries = read_entries(self.shard_path(name))
+        except (OSError, ValueError):
+            return []
+        return [entry['account'] for entry in entries if isinstance(entry, dict) and 'account' in entry]
+
+    def _set_shard_accounts(self, name, accounts):
+        """更新一个账号池在全局索引中的账号，只比较这个账号池前后的差异"""
+        old = self._shard_accounts.get(name, set())
+        new = set(accounts)
+        for account in old - new:
+            if self._owners.get(account) == name:
+                del self._owners[account]
+        for account in new - old:
+            # 已被其它账号池占用的账号保留原来的归属
+            self._owners.setdefault(account, name)
+        self._shard_accounts[name] = new
+
+    def _read_shard_index(self, name):
+        """读取账号池的索引；不存在、已损坏或账号池文件已变化时返回 None"""
+        try:
+            with open(self.index_path(name), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(data, dict) or data.get('version') != INDEX_VERSION
+                or data.get('signature') != file_signature(self.shard_path(name))):
+            return None
+        return data.get('accounts', [])
+
+    def _write_shard_index(self, name):
+        path = self.index_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'signature': file_signature(self.shard_path(name)),
+                       'accounts': list(self._shard_accounts[name])}, f, ensure_ascii=False)
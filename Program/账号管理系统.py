@@ -1,14 +1,32 @@
+import time
+_launch_time = time.perf_counter()  # 用于统计启动到首次绘制的耗时
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import datetime
-import json
-import subprocess
-import winreg
 import os
+import queue
+import threading
+
+try:
+    import winreg
+except ImportError:  # 非 Windows 平台没有注册表
+    winreg = None
 
-from dialogs import DaysHoursDialog, DateTimeDialog, AddAccountDialog, CustomRemarkDialog
 from language import LANGUAGES
-from utils import get_system_language, check_for_update, get_pinyin_initial_abbr
+import store as store_module
+from store import AccountStore
+from workspace import Workspace
+import exporter
+import login
+import longop
+import loginlog
+import profiler
+import recorder
+import viewcache
+from query import QueryError
+from history import History
+from utils import get_system_language, check_for_update
 
 version = "2.1.1"
 
@@ -17,17 +35,43 @@ lang = LANGUAGES[current_lang]
 
 class AccountManagerApp:
     # 添加"序号"列作为第一列
-    COLUMNS = ("index", "select", "account", "password", "status", "available_time", "remarks", "shortcut", "others")
+    # 登录统计列放在最后
+    COLUMNS = ("index", "select", "account", "password", "status", "available_time", "remarks", "shortcut", "others") \
+        + loginlog.COLUMNS
     COLUMN_WIDTHS = {
         "index": 25, "select": 50, "account": 100, "password": 100, "status": 70,
-        "available_time": 120, "remarks": 100, "shortcut": 100, "others": 150
+        "available_time": 120, "remarks": 100, "shortcut": 100, "others": 150,
+        "last_login": 120, "logins_7d": 60, "logins_30d": 60, "avg_gap": 80
     }
     COLUMN_ANCHORS = {
         "index": tk.CENTER, "select": tk.CENTER, "status": tk.CENTER, "available_time": tk.CENTER,
-        "remarks": tk.CENTER, "shortcut": tk.CENTER, "others": tk.CENTER
+        "remarks": tk.CENTER, "shortcut": tk.CENTER, "others": tk.CENTER,
+        "last_login": tk.CENTER, "logins_7d": tk.CENTER, "logins_30d": tk.CENTER, "avg_gap": tk.CENTER
     }
-    REMARKS_TO_JSON = {"": 0, "一级": 1, "二级": 2, "Level 1": 1, "Level 2": 2}
-    REMARKS_FROM_JSON = {0: "", 1: lang['remarks_options'][1], 2: lang['remarks_options'][2]}
+    # 密码和其它信息同时保存打码和明文两列，"显示隐藏"只切换 displaycolumns，不重建行
+    CLEAR_COLUMNS = {"password": "password_clear", "others": "others_clear"}
+    TREE_COLUMNS = COLUMNS + tuple(CLEAR_COLUMNS.values())
+    MASK = "******"  # 固定长度，所有行共用同一个字符串
+    REMARKS_TO_JSON = AccountStore.REMARKS_TO_JSON
+    # 登录下一个可用账号后可选的冷却 (语言键, 小时, 天)
+    NEXT_LOGIN_COOLDOWNS = (
+        ('next_cooldown_none', 0, 0),
+        ('shortcut_20h', 20, 0),
+        ('shortcut_3d', 0, 3),
+        ('shortcut_7d', 0, 7),
+        ('shortcut_14d', 0, 14),
+        ('shortcut_31d', 0, 31),
+        ('shortcut_45d', 0, 45),
+        ('shortcut_181d', 0, 181),
+    )
+    # 登录流水线的结束阶段 -> 登录记录中的结果
+    LOGIN_OUTCOMES = {
+        login.PHASE_DONE: loginlog.OUTCOME_OK,
+        login.PHASE_FAILED: loginlog.OUTCOME_FAILED,
+        login.PHASE_CANCELLED: loginlog.OUTCOME_CANCELLED,
+    }
+    WATCH_INTERVAL_MS = 2000  # 检查数据文件外部修改的间隔
+    SYNC_INTERVAL_MS = 2000  # 与同步服务交换修改的间隔
     # 排序箭头常量
     SORT_ASC = " ↑"  # 升序箭头
     SORT_DESC = " ↓" # 降序箭头
@@ -36,27 +80,147 @@ class AccountManagerApp:
         self.root = root_window
         self.root.title(lang['app_title'].format(version=version))
         self.root.geometry("1200x600")
-        self.accounts_data = []
-        self.original_data = []  # 保存原始数据用于恢复未排序状态
-        self.data_file = "accounts_data.json"
+        # 账号分属多个账号池，启动时只加载上次打开的那个
+        self.workspace = Workspace(lang=lang)
+        # 账号数据由 AccountStore 统一管理，界面只负责展示
+        self.store = self.workspace.store(self.workspace.active)
+        self.data_file = self.store.data_file
+        self._tree_items = {}  # tree_id -> 账号对象
+        self._groups = {}  # 分组行 -> (备注, 账号列表, 第一个账号的序号)
+        self._open_groups = set()  # 展开的分组（按备注记录，重绘后保持展开）
+        self._displayed_accounts = []  # 当前筛选结果（包括收起的分组中的账号）
+        self._histories = {}  # 数据文件 -> 该账号池的撤销记录
+        self._context_menu = None
+        self._profile_menu = None
         self._drag_start_item = None
         self._last_selected_items_in_drag = set()
         self._selection_mode_toggle = None
         self.remarks_sort_reverse = False
         self.sorting_state = {}  # 存放各列排序状态：None=未排序, False=升序, True=降序
         self.show_hidden_var = tk.BooleanVar(value=False)
+        self._query_error = False  # 状态栏是否正显示查询格式错误
         self.setup_ui()
         self._configure_treeview_style()
-        self.load_data()
-        self.steam_path = self.get_steam_install_path()
-
-        if self.steam_path:
-            print(f"Steam安装路径: {self.steam_path}")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        if self._paint_view_snapshot():
+            # 先显示上次的首屏缓存，窗口绘制出来后再加载真实数据替换
+            self.root.after(10, self.load_data)
         else:
-            print("未检测到Steam安装路径")
+            self.load_data()
+        self.root.after(self.WATCH_INTERVAL_MS, self._watch_data_file)
+        # Steam路径在第一次登录时才检测
+        self._steam_path = None
+        self._steam_path_checked = False
+        # 登录流水线在后台线程执行，状态经队列交回界面线程
+        self._login_status_queue = queue.Queue()
+        self._login_poll_id = None
+        self._cooldown_after_login = {}  # 登录任务 -> (账号对象, 小时, 天)
+        self.login_worker = login.LoginWorker(
+            on_status=lambda phase, job, detail=None: self._login_status_queue.put((phase, job, detail))
+        )
+        # 可选的多机同步：设置 SAM_SYNC_URL 时启用，只同步启动时打开的账号池
+        self.sync_client = None
+        self._sync_queue = queue.Queue()
+        self._sync_signature = None
+        if os.environ.get("SAM_SYNC_URL"):
+            import sync
+            self.sync_client = sync.SyncClient(self.store, os.environ["SAM_SYNC_URL"], os.environ.get(sync.TOKEN_ENV, ""))
+            self._sync_round()
+
+    @property
+    def steam_path(self):
+        if not self._steam_path_checked:
+            self._steam_path = self.get_steam_install_path()
+            self._steam_path_checked = True
+            if self._steam_path:
+                print(f"Steam安装路径: {self._steam_path}")
+            else:
+                print("未检测到Steam安装路径")
+        return self._steam_path
+
+    def _paint_view_snapshot(self):
+        """用上次退出时缓存的首屏内容立即绘制，缓存无效时返回 False"""
+        snapshot = viewcache.load_snapshot(self.data_file, self.COLUMNS)
+        if snapshot is None:
+            return False
+        filters = snapshot.get('filters', {})
+        self.show_available_only_var.set(filters.get('show_available', False))
+        self.show_remarked_only_var.set(filters.get('show_remarked', False))
+        self.show_hidden_var.set(filters.get('show_hidden', False))
+        self._apply_hidden_columns()
+        self.search_var.set(filters.get('search', ""))
+        for col_id, width in snapshot.get('column_widths', {}).items():
+            if col_id in self.COLUMNS:
+                self.tree.column(self._visible_column(col_id), width=width)
+        self.sorting_state = {
+            col_id: state for col_id, state in snapshot.get('sorting_state', {}).items() if col_id in self.COLUMNS
+        }
+        sort_column = snapshot.get('sort_column')
+        if sort_column in self.COLUMNS:
+            arrow = self.SORT_DESC if self.sorting_state.get(sort_column) else self.SORT_ASC
+            self._set_heading(sort_column, lang['columns'][sort_column] + arrow)
+        # 缓存行不对应账号对象，真实数据加载前点击这些行不会有任何操作；明文列不缓存，加载后才填入
+        clear_values = ("",) * len(self.CLEAR_COLUMNS)
+        for values, tags in snapshot.get('rows', []):
+            self.tree.insert("", tk.END, values=tuple(values) + clear_values, tags=tags)
+        return True
+
+    def save_view_snapshot(self):
+        sort_column, _ = self._active_sort_column()
+        rows = [
+            (self.tree.item(item_id, 'values')[:len(self.COLUMNS)], self.tree.item(item_id, 'tags'))
+            for item_id in self._visible_account_items()[:viewcache.CACHE_ROWS]
+        ]
+        viewcache.save_snapshot(
+            self.data_file, self.COLUMNS, rows,
+            column_widths={col_id: self.tree.column(self._visible_column(col_id), 'width') for col_id in self.COLUMNS},
+            sorting_state=self.sorting_state,
+            sort_column=sort_column,
+            filters={
+                'show_available': self.show_available_only_var.get(),
+                'show_remarked': self.show_remarked_only_var.get(),
+                'show_hidden': self.show_hidden_var.get(),
+                'search': self.search_var.get(),
+            },
+        )
+
+    def _active_sort_column(self):
+        """返回 (当前排序列, 是否降序)，根据表头箭头判断；未排序时返回 (None, False)"""
+        for col_id in self.COLUMNS:
+            header_text = self.tree.heading(col_id, "text")
+            if header_text.endswith(self.SORT_ASC):
+                return col_id, False
+            if header_text.endswith(self.SORT_DESC):
+                return col_id, True
+        return None, False
+
+    def on_close(self):
+        try:
+            self.save_view_snapshot()
+        except OSError as e:
+            print(f"保存首屏缓存失败: {e}")
+        # 未完成的操作回滚（导出不留下写了一半的文件），已开始的保存写完
+        self.runner.close()
+        self.root.destroy()
+
+    def report_first_paint(self):
+        """在第一次空闲时（窗口已绘制）输出启动耗时"""
+        elapsed_ms = (time.perf_counter() - _launch_time) * 1000
+        profiler.record("startup.first_paint", _launch_time, time.perf_counter(), rows=len(self._tree_items))
+        print(f"启动到首次绘制耗时: {elapsed_ms:.0f} ms")
+
+    @property
+    def accounts_data(self):
+        return self.store.accounts_data
+
+    @property
+    def original_data(self):
+        return self.store.original_data
 
     def get_steam_install_path(self):
         """从Windows注册表获取Steam安装路径"""
+        if winreg is None:
+            return None
         possible_paths = [
             # Steam客户端通常的注册表路径
             (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Valve\Steam", "InstallPath"),
@@ -87,7 +251,7 @@ class AccountManagerApp:
               foreground=[('selected', 'black')])
         self.tree.tag_configure(lang['status_available'], background="#e0e0e0", foreground="black")
         self.tree.tag_configure(lang['status_unavailable'], background="salmon")
-        self.tree.tag_configure('blank', background='#f0f0f0')
+        self.tree.tag_configure('group', background='#f0f0f0')
 
     def setup_ui(self):
         top_frame = ttk.Frame(self.root, padding="10")
@@ -96,9 +260,21 @@ class AccountManagerApp:
             (lang['add_accounts'], self.add_account_dialog),
             (lang['export_selected'], self.export_txt),
             (lang['refresh'], self.refresh_treeview),
+            (lang['forecast'], self.show_forecast),
         ]
         for text, command in buttons_data:
             ttk.Button(top_frame, text=text, command=command).pack(side=tk.LEFT, padx=5)
+        # 登录下一个可用账号，以及登录后自动设置的冷却
+        ttk.Button(top_frame, text=lang['login_next'], command=self.login_next_available).pack(side=tk.LEFT, padx=5)
+        ttk.Label(top_frame, text=lang['next_cooldown']).pack(side=tk.LEFT)
+        self.next_cooldown_var = tk.StringVar(value=lang['next_cooldown_none'])
+        ttk.Combobox(
+            top_frame, textvariable=self.next_cooldown_var, state="readonly", width=10,
+            values=[lang[key] for key, _, _ in self.NEXT_LOGIN_COOLDOWNS]
+        ).pack(side=tk.LEFT, padx=5)
+        self.root.bind("<Control-l>", self.login_next_available)
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-y>", self.redo)
         # 在 top_frame 的右侧添加搜索框
         search_box_frame = ttk.Frame(top_frame)
         search_box_frame.pack(side=tk.RIGHT, padx=5)
@@ -106,19 +282,30 @@ class AccountManagerApp:
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(search_box_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side=tk.LEFT, padx=5)
-        search_entry.bind("<KeyRelease>", lambda event: self.filter_treeview())
+        search_entry.bind("<KeyRelease>", self.on_search_key)
         
         search_frame = ttk.Frame(self.root, padding="10")
         search_frame.pack(fill=tk.X)
         self.show_available_only_var = tk.BooleanVar()
-        ttk.Checkbutton(search_frame, text=lang['show_available_only'], variable=self.show_available_only_var, command=self.filter_treeview).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(search_frame, text=lang['show_available_only'], variable=self.show_available_only_var, command=lambda: self.on_filter_toggle('show_available_only')).pack(side=tk.LEFT, padx=5)
         
         # 只显示已备注
         self.show_remarked_only_var = tk.BooleanVar()
-        ttk.Checkbutton(search_frame, text=lang['show_remarked_only'], variable=self.show_remarked_only_var, command=self.filter_treeview).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(search_frame, text=lang['show_remarked_only'], variable=self.show_remarked_only_var, command=lambda: self.on_filter_toggle('show_remarked_only')).pack(side=tk.LEFT, padx=5)
         
+        # 账号池切换
+        ttk.Label(search_frame, text=lang['workspace']).pack(side=tk.LEFT, padx=(15, 0))
+        self.workspace_var = tk.StringVar(value=self.workspace.active)
+        self.workspace_combo = ttk.Combobox(
+            search_frame, textvariable=self.workspace_var, state="readonly", width=14,
+            values=self.workspace.shard_names()
+        )
+        self.workspace_combo.pack(side=tk.LEFT, padx=5)
+        self.workspace_combo.bind("<<ComboboxSelected>>", lambda event: self.switch_workspace(self.workspace_var.get()))
+        ttk.Button(search_frame, text=lang['new_workspace'], command=self.new_workspace).pack(side=tk.LEFT, padx=5)
+
         # 添加显示隐藏复选框
-        ttk.Checkbutton(search_frame, text=lang['show_hidden'], variable=self.show_hidden_var, command=self.filter_treeview).pack(side=tk.LEFT, padx=5)
+        ttk.Checkbutton(search_frame, text=lang['show_hidden'], variable=self.show_hidden_var, command=lambda: self.on_filter_toggle('show_hidden')).pack(side=tk.LEFT, padx=5)
         
         # 删除按钮先不显示
         self.delete_btn = ttk.Button(search_frame, text=lang['delete_selected'], command=self.delete_selected)
@@ -139,7 +326,7 @@ class AccountManagerApp:
         
         tree_frame = ttk.Frame(self.root, padding="10")
         tree_frame.pack(expand=True, fill=tk.BOTH)
-        self.tree = ttk.Treeview(tree_frame, columns=self.COLUMNS, show="headings")
+        self.tree = ttk.Treeview(tree_frame, columns=self.TREE_COLUMNS, displaycolumns=self.COLUMNS, show="headings")
         for col_id in self.COLUMNS:
             self.tree.heading(col_id, text=lang['columns'][col_id])
             self.tree.column(col_id, width=self.COLUMN_WIDTHS[col_id], anchor=self.COLUMN_ANCHORS.get(col_id, tk.W))
@@ -151,6 +338,15 @@ class AccountManagerApp:
         self.tree.heading("others", text=lang['columns']["others"], command=lambda: self.sort_by_column("others"))
         # 添加可用时间列的排序功能
         self.tree.heading("available_time", text=lang['columns']["available_time"], command=lambda: self.sort_by_column("available_time"))
+        for col_id in loginlog.COLUMNS:
+            self.tree.heading(col_id, text=lang['columns'][col_id], command=lambda c=col_id: self.sort_by_column(c))
+        # 树形列只在按备注分组时显示，用来显示分组名称
+        self.tree.column("#0", width=200, stretch=False)
+        # 明文列与打码列使用相同的表头和宽度
+        self.tree.heading("password_clear", text=lang['columns']["password"])
+        self.tree.heading("others_clear", text=lang['columns']["others"], command=lambda: self.sort_by_column("others"))
+        for col_id, clear_id in self.CLEAR_COLUMNS.items():
+            self.tree.column(clear_id, width=self.COLUMN_WIDTHS[col_id], anchor=self.COLUMN_ANCHORS.get(col_id, tk.W))
         self.tree.pack(expand=True, fill=tk.BOTH, side=tk.LEFT)
         scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscroll=scrollbar.set)
@@ -160,17 +356,140 @@ class AccountManagerApp:
         self.tree.bind("<ButtonRelease-1>", self.on_tree_button_release)
         self.tree.bind("<Button-3>", self.on_tree_right_click)
         self.tree.bind("<Double-1>", self.on_tree_double_click)
+        self.tree.bind("<<TreeviewOpen>>", self.on_group_open)
+        self.tree.bind("<<TreeviewClose>>", self.on_group_close)
+        # 长操作（加载、保存、导入、删除、排序、导出）的进度条，较慢时显示在表格下方
+        self._tree_frame = tree_frame
+        self.progress_frame = ttk.Frame(self.root, padding=(10, 0))
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode="determinate", length=300)
+        self.progress_bar.pack(side=tk.LEFT, padx=5)
+        self.progress_var = tk.StringVar(value="")
+        ttk.Label(self.progress_frame, textvariable=self.progress_var, font=("Arial", 10)).pack(side=tk.LEFT, padx=5)
+        self.progress_cancel_btn = ttk.Button(self.progress_frame, text=lang['cancel'], command=self.cancel_operation)
+        self.progress_cancel_btn.pack(side=tk.LEFT, padx=5)
+        self.runner = longop.Runner(self.root, self)
         # 添加Github信息标签
         github_label = ttk.Label(self.root, text=lang['github_label'], font=("Arial", 10))
         github_label.pack(side=tk.RIGHT)
+        # 状态栏
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(self.root, textvariable=self.status_var, font=("Arial", 10)).pack(side=tk.LEFT, padx=10)
+        # 可用数量（点击打开可用预测）
+        self.counter_var = tk.StringVar(value="")
+        self._counter_key = None
+        counter_label = ttk.Label(self.root, textvariable=self.counter_var, font=("Arial", 10), cursor="hand2")
+        counter_label.pack(side=tk.LEFT, padx=10)
+        counter_label.bind("<Button-1>", self.show_forecast)
+        # 性能读数（仅在记录耗时时显示）
+        self.profile_label = ttk.Label(self.root, text="", font=("Arial", 10))
+        self.profile_enabled_var = tk.BooleanVar(value=profiler.is_enabled())
+        self._toggle_profile_readout()
+        profiler.add_listener(self._on_profile_span)
+        # 隐藏的性能分析菜单
+        self.root.bind("<Control-Shift-P>", self.show_profile_menu)
+
+    def _visible_column(self, col_id):
+        """返回当前显示的列：显示隐藏时密码和其它信息显示明文列"""
+        if self.show_hidden_var.get():
+            return self.CLEAR_COLUMNS.get(col_id, col_id)
+        return col_id
+
+    def _set_heading(self, col_id, text):
+        self.tree.heading(col_id, text=text)
+        if col_id in self.CLEAR_COLUMNS:
+            self.tree.heading(self.CLEAR_COLUMNS[col_id], text=text)
+
+    def _apply_hidden_columns(self):
+        """切换显示的列，不重建任何行；新显示的列沿用原来那一列的宽度"""
+        for col_id, clear_id in self.CLEAR_COLUMNS.items():
+            shown, hidden = (clear_id, col_id) if self.show_hidden_var.get() else (col_id, clear_id)
+            self.tree.column(shown, width=self.tree.column(hidden, 'width'))
+        self.tree["displaycolumns"] = tuple(self._visible_column(col_id) for col_id in self.COLUMNS)
+
+    def show_profile_menu(self, event=None):
+        menu = self._profile_menu
+        if menu is None:
+            menu = self._profile_menu = tk.Menu(self.root, tearoff=0)
+        else:
+            menu.delete(0, tk.END)
+        menu.add_checkbutton(
+            label=lang['profile_enable'],
+            variable=self.profile_enabled_var,
+            command=self._toggle_profile_readout
+        )
+        menu.add_command(label=lang['profile_export'], command=self.export_profile_trace)
+        menu.add_command(label=lang['profile_clear'], command=profiler.clear)
+        menu.add_command(label=lang['login_latencies'], command=self.show_login_latencies)
+        x = event.x_root if event else self.root.winfo_pointerx()
+        y = event.y_root if event else self.root.winfo_pointery()
+        try:
+            menu.tk_popup(x, y)
+        finally:
+            menu.grab_release()
 
+    def _toggle_profile_readout(self):
+        profiler.set_enabled(self.profile_enabled_var.get())
+        if profiler.is_enabled():
+            self.profile_label.pack(side=tk.LEFT, padx=10)
+        else:
+            self.profile_label.pack_forget()
+
+    def _on_profile_span(self, name, duration_ms):
+        if name == "AccountManagerApp.populate_treeview":
+            self.profile_label.config(text=lang['profile_readout'].format(ms=duration_ms, rows=len(self._tree_items)))
+
+    def show_login_latencies(self):
+        """显示最近几次切换账号各阶段的耗时（毫秒）"""
+        lines = []
+        for account, timings in reversed(self.login_worker.recent_latencies):
+            phases = ", ".join(f"{phase} {seconds * 1000:.0f}" for phase, seconds in timings.items())
+            lines.append(f"{account}: {sum(timings.values()) * 1000:.0f} ms ({phases})")
+        messagebox.showinfo(lang['login_latencies'], "\n".join(lines) or lang['login_latencies_empty'], parent=self.root)
+
+    def export_profile_trace(self):
+        file_path = filedialog.asksaveasfilename(
+            title=lang['profile_export'],
+            defaultextension=".json",
+            filetypes=[("Chrome Trace", "*.json"), ("All Files", "*.*")],
+            parent=self.root
+        )
+        if not file_path: return
+        try:
+            count = profiler.export_chrome_trace(file_path)
+            messagebox.showinfo(lang['profiling'], lang['profile_exported'].format(count=count, path=file_path), parent=self.root)
+        except Exception as e:
+            messagebox.showerror(lang['export_error'], lang['export_failed'].format(error=e), parent=self.root)
+
+    def on_search_key(self, event=None):
+        recorder.log(recorder.SEARCH, text=self.search_var.get())
+        self.filter_treeview()
+
+    def on_filter_toggle(self, name):
+        """“只显示可用”“只显示已备注”“显示隐藏”复选框"""
+        recorder.log(recorder.TOGGLE, name=name, value=getattr(self, name + '_var').get())
+        if name == 'show_hidden':
+            self._apply_hidden_columns()
+        else:
+            self.filter_treeview()
+
+    def _record_pointer(self, action, item_id, col=None, state=0):
+        """录制鼠标操作：行记录为当前显示的第几个账号行（空白处为 None）"""
+        if not recorder.is_enabled():
+            return
+        items = self._visible_account_items()
+        row = items.index(item_id) if item_id in self._tree_items and item_id in items else None
+        recorder.log(action, row=row, column=col, state=state)
+
+    @profiler.traced()
     def sort_by_column(self, column):
+        recorder.log(recorder.SORT, column=column)
+        previous_state = dict(self.sorting_state)  # 取消排序时恢复
         # 当排序的列不是"remarks"时，清除备注列的排序状态
         if column != "remarks":
             if "remarks" in self.sorting_state:
                 del self.sorting_state["remarks"]
                 # 同时清除备注列表头的箭头
-                self.tree.heading("remarks", text=lang['columns']["remarks"])
+                self._set_heading("remarks", lang['columns']["remarks"])
         
         # 获取当前排序状态
         current_state = self.sorting_state.get(column, None)
@@ -181,7 +500,7 @@ class AccountManagerApp:
             current_text = self.tree.heading(col_id, "text")
             # 如果当前文本包含箭头，则移除
             if current_text.endswith(self.SORT_ASC) or current_text.endswith(self.SORT_DESC):
-                self.tree.heading(col_id, text=original_text)
+                self._set_heading(col_id, original_text)
         
         # 状态循环：None(未排序) → False(升序) → True(降序) → None(未排序)
         if current_state is None:
@@ -189,60 +508,38 @@ class AccountManagerApp:
             new_state = False
             arrow = self.SORT_ASC
             self.sorting_state[column] = new_state
-            self.tree.heading(column, text=lang['columns'][column] + arrow)
-            self._sort_data(column, new_state)
+            self._set_heading(column, lang['columns'][column] + arrow)
+            self._sort_data(column, new_state, previous_state)
         elif current_state is False:
             # 从升序切换到降序
             new_state = True
             arrow = self.SORT_DESC
             self.sorting_state[column] = new_state
-            self.tree.heading(column, text=lang['columns'][column] + arrow)
-            self._sort_data(column, new_state)
+            self._set_heading(column, lang['columns'][column] + arrow)
+            self._sort_data(column, new_state, previous_state)
         else:
             # 从降序切换到未排序（恢复原始顺序）
             self.sorting_state[column] = None
-            # 恢复原始数据顺序
-            self.accounts_data = [acc.copy() for acc in self.original_data]
+            self.store.reset_sorting()
             self.filter_treeview()
 
-    def _sort_data(self, column, reverse):
-        # 实际执行排序的方法
-        if column == "remarks":
-            # 只按拼音首字母排序
-            def key_func(acc):
-                remark = acc.get("remarks", "")
-                # 直接返回拼音首字母排序
-                return get_pinyin_initial_abbr(remark)
-        elif column == "shortcut":
-            # 根据可用时间排序
-            def key_func(acc):
-                try:
-                    dt = datetime.datetime.strptime(acc.get("available_time", ""), "%Y-%m-%d %H:%M")
-                except Exception:
-                    dt = datetime.datetime.min
-                return dt
-        elif column == "account":
-            key_func = lambda acc: acc.get("account", "").lower()
-        elif column == "status":
-            # 可用排在前面
-            def key_func(acc):
-                status = acc.get("status", "")
-                return 0 if status == lang['status_available'] else 1
-        elif column == "available_time":
-            # 按可用时间排序
-            def key_func(acc):
-                try:
-                    # 将时间字符串转换为datetime对象进行比较
-                    dt = datetime.datetime.strptime(acc.get("available_time", ""), "%Y-%m-%d %H:%M")
-                except Exception:
-                    # 转换失败的时间视为最小时间
-                    dt = datetime.datetime.min
-                return dt
-        else:
-            key_func = lambda acc: acc.get(column)
-        
-        self.accounts_data.sort(key=key_func, reverse=reverse)
-        self.filter_treeview()
+    @profiler.traced()
+    def _sort_data(self, column, reverse, previous_state=None):
+        # 实际执行排序的方法；账号很多时分块进行，取消时保持原来的顺序
+        self.runner.run(
+            lang['sorting'], self.store.sort_steps(column, reverse),
+            on_done=lambda _: self.filter_treeview(),
+            on_cancel=lambda: self._restore_sorting(previous_state),
+            supersedes=(longop.DISPLAY,)
+        )
+
+    def _restore_sorting(self, state):
+        """取消排序后恢复原来的排序状态和表头箭头"""
+        self.sorting_state = state or {}
+        arrows = {False: self.SORT_ASC, True: self.SORT_DESC}
+        for col_id in self.COLUMNS:
+            self._set_heading(col_id, lang['columns'][col_id] + arrows.get(self.sorting_state.get(col_id), ""))
+        self._operation_cancelled(lang['sorting'])
 
     def reset_sorting(self):
         # 重置所有排序状态
@@ -251,35 +548,31 @@ class AccountManagerApp:
             original_text = lang['columns'][col_id]
             current_text = self.tree.heading(col_id, "text")
             if current_text.endswith(self.SORT_ASC) or current_text.endswith(self.SORT_DESC):
-                self.tree.heading(col_id, text=original_text)
+                self._set_heading(col_id, original_text)
         
         # 重置排序状态
         self.sorting_state = {}
         # 恢复原始数据顺序
-        self.accounts_data = [acc.copy() for acc in self.original_data]
+        self.store.reset_sorting()
 
     def get_account_by_tree_id(self, tree_item_id):
-        # 忽略空白行
-        if not tree_item_id:
-            return None
-        # 检查当前行是否为空白行（通过values判断）
-        values = self.tree.item(tree_item_id, 'values')
-        if all(v == "" for v in values):
-            return None
-        # 原有逻辑
-        return next((acc for acc in self.accounts_data if acc.get('tree_id') == tree_item_id), None)
+        # 分组行和占位行不对应账号
+        return self._tree_items.get(tree_item_id)
 
-    def _set_account_selection_state(self, account_obj, state):
+    def _set_account_selection_state(self, account_obj, state, refresh=True):
+        """refresh=False 时不刷新批量备注控件，逐个修改多个账号后由调用方刷新一次"""
         if account_obj.get('selected_state', False) != state:
             account_obj['selected_state'] = state
-            if account_obj.get('tree_id'):
+            # 被筛选掉或在收起的分组中的账号没有对应的行
+            if self._tree_items.get(account_obj.get('tree_id')) is account_obj:
                 if state:
                     self.tree.selection_add(account_obj['tree_id'])
                 else:
                     self.tree.selection_remove(account_obj['tree_id'])
                 self.update_row_checkbox_only(account_obj['tree_id'], account_obj)
         # 选中状态变化时，更新批量备注控件显示
-        self.update_batch_remarks_visibility()
+        if refresh:
+            self.update_batch_remarks_visibility()
 
     def update_row_checkbox_only(self, tree_item_id, account_obj):
         select_char = "☑" if account_obj.get('selected_state', False) else "☐"
@@ -288,24 +581,21 @@ class AccountManagerApp:
         current_values[1] = select_char
         self.tree.item(tree_item_id, values=current_values)
 
+    @profiler.traced()
     def on_tree_button_press(self, event):
         item_id = self.tree.identify_row(event.y)
         col = self.tree.identify_column(event.x)
-        
-        # 忽略空白行交互
-        if item_id:
-            values = self.tree.item(item_id, 'values')
-            if all(v == "" for v in values):
-                return  # 空白行不响应点击
-        
+        if item_id and item_id not in self._tree_items:
+            return  # 分组行只用于展开和收起
+        self._record_pointer(recorder.PRESS, item_id, col, event.state)
+
         # 重置拖拽相关状态
         self._drag_start_item = None
         self._last_selected_items_in_drag = set()
         self._selection_mode_toggle = None
         if not item_id:
             if not (event.state & 0x0004 or event.state & 0x0008):
-                for acc in self.accounts_data:
-                    self._set_account_selection_state(acc, False)
+                self._run_selection(lang['deselecting'], self.store.selected_accounts(), False)
             return
         # 使用列索引判断第二列（“选择”列，序号列是第一列）
         if col == "#2":
@@ -325,6 +615,7 @@ class AccountManagerApp:
         if header_text in (lang['columns']['account'], lang['columns']['password'], lang['columns']['others']):
             self.root.after(150, lambda: self._handle_single_click_copy(item_id, header_text))
 
+    @profiler.traced()
     def _handle_single_click_copy(self, item_id, column_header_text):
         if self._drag_start_item: return
         account_obj = self.get_account_by_tree_id(item_id)
@@ -340,23 +631,13 @@ class AccountManagerApp:
         self.root.clipboard_append(content_to_copy)
         self.root.update()
 
+    @profiler.traced()
     def on_tree_drag_motion(self, event):
         if not self._drag_start_item: return
         current_item = self.tree.identify_row(event.y)
-        if not current_item: return
-        
-        # 忽略空白行
-        values = self.tree.item(current_item, 'values')
-        if all(v == "" for v in values):
-            return
-            
-        all_visible_items = []
-        for item in self.tree.get_children():
-            # 过滤空白行
-            item_values = self.tree.item(item, 'values')
-            if not all(v == "" for v in item_values):
-                all_visible_items.append(item)
-                
+        if current_item not in self._tree_items: return
+        self._record_pointer(recorder.DRAG, current_item)
+        all_visible_items = self._visible_account_items()
         if not all_visible_items: return
         try:
             start_index = all_visible_items.index(self._drag_start_item)
@@ -369,18 +650,23 @@ class AccountManagerApp:
         for prev_item_id in items_to_deselect_from_prev_drag:
             acc = self.get_account_by_tree_id(prev_item_id)
             if acc:
-                self._set_account_selection_state(acc, not self._selection_mode_toggle)
+                self._set_account_selection_state(acc, not self._selection_mode_toggle, refresh=False)
         for item_id in items_in_current_drag_range:
             acc = self.get_account_by_tree_id(item_id)
             if acc:
-                self._set_account_selection_state(acc, self._selection_mode_toggle)
+                self._set_account_selection_state(acc, self._selection_mode_toggle, refresh=False)
         self._last_selected_items_in_drag = items_in_current_drag_range
+        self.update_batch_remarks_visibility()
 
+    @profiler.traced()
     def on_tree_button_release(self, event):
+        if self._drag_start_item:
+            recorder.log(recorder.RELEASE)
         self._drag_start_item = None
         self._last_selected_items_in_drag = set()
         self._selection_mode_toggle = None
 
+    @profiler.traced()
     def on_tree_double_click(self, event):
         item_id = self.tree.identify_row(event.y)
         column_id_str = self.tree.identify_column(event.x)
@@ -388,32 +674,20 @@ class AccountManagerApp:
         # 移除箭头后再比较
         if column_header_text.endswith(self.SORT_ASC) or column_header_text.endswith(self.SORT_DESC):
             column_header_text = column_header_text[:-2]
-        if not item_id: return
-        
-        # 忽略空白行
-        values = self.tree.item(item_id, 'values')
-        if all(v == "" for v in values):
-            return
-            
         account_obj = self.get_account_by_tree_id(item_id)
         if not account_obj: return
         if column_header_text == lang['columns']['shortcut']:
             pass
 
+    @profiler.traced()
     def on_tree_right_click(self, event):
         region = self.tree.identify_region(event.x, event.y)
         if region != "cell": return
         column_id_str = self.tree.identify_column(event.x)
         item_id = self.tree.identify_row(event.y)
-        if not item_id: return
-        
-        # 忽略空白行
-        values = self.tree.item(item_id, 'values')
-        if all(v == "" for v in values):
-            return
-            
         account_obj = self.get_account_by_tree_id(item_id)
         if not account_obj: return
+        self._record_pointer(recorder.RIGHT_CLICK, item_id, column_id_str, event.state)
         column_header_text = self.tree.heading(column_id_str)['text']
         
         # 正确移除排序箭头（只在有箭头时处理）
@@ -424,12 +698,11 @@ class AccountManagerApp:
         
         # 处理选择状态
         if column_header_text not in (lang['columns']['remarks'], lang['columns']['shortcut'], lang['columns']['available_time']) and not (event.state & 0x0004 or event.state & 0x0008):
-            for acc in self.accounts_data:
-                self._set_account_selection_state(acc, False)
-            self._set_account_selection_state(account_obj, True)
+            self._run_selection(lang['deselecting'], self.store.selected_accounts(), False,
+                                on_done=lambda: self._set_account_selection_state(account_obj, True, refresh=False))
         
-        # 创建右键菜单
-        menu = tk.Menu(self.root, tearoff=0)
+        # 复用同一个右键菜单，避免每次右键都新建一个 Menu 控件
+        menu = self._get_context_menu()
 
         if column_header_text == lang['columns']['account']:
             menu.add_command(
@@ -450,50 +723,154 @@ class AccountManagerApp:
         finally:
             menu.grab_release()
 
-    def login_account(self, account_obj):
-        """使用指定账号和密码启动Steam"""
-
-        try:
-            subprocess.run(
-                ["taskkill", "/F", "/IM", "cs2.exe"],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            print("cs2 进程已成功关闭")
-        except subprocess.CalledProcessError as e:
-            print(f"{e.stderr}")
-
-        try:
-            subprocess.run(
-                ["taskkill", "/F", "/IM", "steam.exe"],
-                check=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            print("Steam 进程已成功关闭")
-        except subprocess.CalledProcessError as e:
-            print(f"{e.stderr}")
+    def _get_context_menu(self):
+        if self._context_menu is None:
+            self._context_menu = tk.Menu(self.root, tearoff=0)
+            if recorder.is_enabled():
+                recorder.wrap_menu(self._context_menu)
+        else:
+            self._context_menu.delete(0, tk.END)
+        return self._context_menu
 
-        # 使用检测到的路径，如果未检测到则使用默认路径
+    @profiler.traced()
+    def login_account(self, account_obj):
+        """使用指定账号和密码启动Steam（结束旧进程和启动都在后台线程进行）"""
+        # 使用检测到的路径
         steam_path = self.steam_path
+        if not steam_path:
+            messagebox.showerror(lang['login_account'], lang['steam_not_found'], parent=self.root)
+            return None
         # 确保路径指向steam.exe
         if not steam_path.endswith("steam.exe"):
             steam_path = os.path.join(steam_path, "steam.exe")
-        
-        account = account_obj['account']
-        password = account_obj['password']
 
+        job = login.LoginJob(account_obj['account'], account_obj['password'], steam_path)
+        self.login_worker.submit(job)
+        self._poll_login_status()
+        return job
+
+    def login_next_available(self, event=None):
+        """登录优先级最高的可用账号，并按设置在启动后应用冷却"""
+        # 已提交但还没应用冷却的账号不再选中，避免连续按下时重复登录同一个
+        account_obj = self.store.next_available(exclude={job.account for job in self._cooldown_after_login})
+        if account_obj is None:
+            self.set_status(lang['no_available_account'])
+            return
+        job = self.login_account(account_obj)
+        if job is None:
+            return
+        selected = self.next_cooldown_var.get()
+        for key, hours, days in self.NEXT_LOGIN_COOLDOWNS:
+            if lang[key] == selected and (hours or days):
+                self._cooldown_after_login[job] = (account_obj, hours, days)
+
+    def _poll_login_status(self):
+        """把工作线程报告的登录状态显示到状态栏，工作线程空闲且没有新消息时停止轮询"""
+        if self._login_poll_id is not None:
+            self.root.after_cancel(self._login_poll_id)
+            self._login_poll_id = None
+        while True:
+            try:
+                phase, job, detail = self._login_status_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.set_status(lang['login_status_' + phase].format(account=job.account, detail=detail))
+            if phase in self.LOGIN_OUTCOMES:
+                self._record_login(job, self.LOGIN_OUTCOMES[phase])
+            if phase in (login.PHASE_DONE, login.PHASE_FAILED, login.PHASE_CANCELLED) and job in self._cooldown_after_login:
+                account_obj, hours, days = self._cooldown_after_login.pop(job)
+                if phase == login.PHASE_DONE:
+                    self.apply_shortcut(account_obj, "delta", hours=hours, days=days)
+        if self.login_worker.is_busy() or not self._login_status_queue.empty():
+            self._login_poll_id = self.root.after(100, self._poll_login_status)
+
+    def _record_login(self, job, outcome):
+        """把登录结果追加到登录记录，并刷新该账号的统计列"""
         try:
-            subprocess.Popen([steam_path, "-login", account, password ,"-RememberPassword"],
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-        except Exception as e:
-            print(f"{e.stderr}")
+            self.workspace.login_log.append(job.account, outcome, job.total_seconds())
+        except OSError as e:
+            print(f"写入登录记录失败: {e}")
+            return
+        acc = self.store.get(job.account)
+        if acc is not None and self._tree_items.get(acc.get('tree_id')) is acc:
+            self.update_row_in_treeview(acc['tree_id'], acc)
+
+    # ---------- 长操作的进度 ----------
+
+    def show_operation(self, op):
+        self.progress_frame.pack(side=tk.BOTTOM, fill=tk.X, before=self._tree_frame)
+        if op.modal:
+            try:
+                # 操作完成前界面的其它部分不响应点击和按键，账号数据不会同时被修改
+                self.progress_frame.grab_set()
+            except tk.TclError:
+                pass  # 窗口还没有显示
+
+    def update_operation(self, op):
+        total = max(op.total, op.done)
+        self.progress_bar.configure(maximum=total or 1, value=op.done)
+        text = lang['progress_text'].format(label=op.label, done=op.done, total=total)
+        rate = op.rate()
+        if rate:
+            text += lang['progress_rate'].format(rate=rate)
+        eta = op.eta()
+        if eta is not None:
+            text += lang['progress_eta'].format(eta=self._format_eta(eta))
+        if op.cancel_requested():
+            text += lang['progress_cancelling']
+        self.progress_var.set(text)
+        cancellable = not op.committed and not op.cancel_requested()
+        self.progress_cancel_btn.configure(state=tk.NORMAL if cancellable else tk.DISABLED)
+
+    def hide_operation(self):
+        self.progress_frame.grab_release()
+        self.progress_frame.pack_forget()
+
+    def cancel_operation(self):
+        self.runner.cancel()
+
+    @staticmethod
+    def _format_eta(seconds):
+        seconds = int(seconds + 0.5)
+        if seconds < 60:
+            return lang['eta_seconds'].format(seconds=seconds)
+        return lang['eta_minutes'].format(minutes=seconds // 60, seconds=seconds % 60)
+
+    def _operation_cancelled(self, label):
+        """取消后数据已回滚，按当前数据重新显示"""
+        self.set_status(lang['operation_cancelled'].format(label=label))
+        self.filter_treeview()
+
+    def _operation_failed(self, title, message):
+        messagebox.showerror(title, message, parent=self.root)
+        self.filter_treeview()
+
+    def _recorded_steps(self, label, steps):
+        """在 recording() 中执行 steps，出错或取消时按记录回滚；返回 (结果, Delta)"""
+        try:
+            with self.store.recording(label) as delta:
+                result = yield from steps
+        except Exception:  # 包括取消
+            self.store.apply_delta(delta, undo=True)
+            raise
+        return result, delta
+
+    def _change_steps(self, label, steps):
+        """修改账号的操作：出错或取消时回滚；完成后记入撤销历史并保存，返回 (结果, 保存时合并进来的修改)"""
+        result, delta = yield from self._recorded_steps(label, steps)
+        self.history.push(delta)
+        # 之后开始保存，不能再取消
+        yield longop.COMMIT
+        merged = (yield from self._save_steps(self.store)) if result else None
+        return result, merged
+
+    def _show_merged(self, merged):
+        if merged:
+            # 其它实例在此期间保存过，合并进来的修改也要显示
+            self._show_store_changes(*merged)
+
+    def set_status(self, text):
+        self.status_var.set(text)
 
     # 新增：辅助方法，复制内容到剪贴板
     def copy_to_clipboard(self, content):
@@ -517,11 +894,14 @@ class AccountManagerApp:
             # 如果解析失败，使用当前时间
             current_time = datetime.datetime.now()
         
-        # 显示日期时间对话框
+        # 显示日期时间对话框（对话框模块在第一次使用时才导入）
+        from dialogs import DateTimeDialog
         dlg = DateTimeDialog(self.root, lang['modify_available_time'], current_time)
         if dlg.result:
             # 更新可用时间
-            self._update_account_status_and_time(account_obj, dlg.result)
+            with self.store.recording(lang['modify_available_time']) as delta:
+                self._update_account_status_and_time(account_obj, dlg.result)
+            self.history.push(delta)
             self.filter_treeview()
             self.save_data()
 
@@ -567,6 +947,7 @@ class AccountManagerApp:
 
     def _custom_shortcut(self, account_obj):
         # 使用自定义对话框输入天数和小时
+        from dialogs import DaysHoursDialog
         dlg = DaysHoursDialog(self.root, title=lang['custom_days_hours'])
         if dlg.result is None:
             return
@@ -597,205 +978,190 @@ class AccountManagerApp:
         )
 
     def _custom_remarks(self, account_obj):
+        from dialogs import CustomRemarkDialog
         dlg = CustomRemarkDialog(self.root, title=lang['custom_remark'])
         if dlg.result:
             self.set_remarks(account_obj, dlg.result)
 
+    @profiler.traced()
     def set_remarks(self, account_obj, remark_text):
-        account_obj['remarks'] = remark_text
-        # 更新原始数据中的备注信息
-        for orig_acc in self.original_data:
-            if orig_acc['account'] == account_obj['account']:  # 只比较账号
-                orig_acc['remarks'] = remark_text
-                break
+        with self.store.recording(lang['columns']['remarks']) as delta:
+            self.store.set_remarks(account_obj, remark_text)
+        self.history.push(delta)
         self.filter_treeview()
         self.save_data()
 
     def _update_account_status_and_time(self, account_obj, new_available_time_dt=None):
-        if new_available_time_dt is None:
-            try:
-                available_dt = datetime.datetime.strptime(account_obj['available_time'], "%Y-%m-%d %H:%M")
-            except (ValueError, TypeError):
-                available_dt = datetime.datetime.min
-        else:
-            available_dt = new_available_time_dt
-        account_obj['available_time'] = available_dt.strftime("%Y-%m-%d %H:%M")
-        account_obj['status'] = lang['status_available'] if available_dt <= datetime.datetime.now() else lang['status_unavailable']
-        
-        # 更新原始数据中的时间和状态
-        for orig_acc in self.original_data:
-            if orig_acc['account'] == account_obj['account']:  # 只比较账号
-                orig_acc['available_time'] = account_obj['available_time']
-                orig_acc['status'] = account_obj['status']
-                break
+        self.store.update_status(account_obj, new_available_time_dt)
 
+    @profiler.traced()
     def apply_shortcut(self, account_obj, action_type, hours=0, days=0):
-        now = datetime.datetime.now()
-        new_available_time_dt = None
-        if action_type == "reset":
-            new_available_time_dt = now
-        elif action_type == "delta":
-            new_available_time_dt = now + datetime.timedelta(days=days, hours=hours)
-        if new_available_time_dt:
-            self._update_account_status_and_time(account_obj, new_available_time_dt)
+        with self.store.recording(lang['columns']['shortcut']) as delta:
+            changed = self.store.apply_cooldown(account_obj, action_type, hours=hours, days=days)
+        self.history.push(delta)
+        if changed:
             # 快捷操作后保持当前排序状态
             self.filter_treeview()
             self.save_data()
 
-    def update_row_in_treeview(self, tree_item_id, account_obj):
-        select_char = "☑" if account_obj.get('selected_state', False) else "☐"
-        self._update_account_status_and_time(account_obj)
-        status_tag = account_obj['status']
-        account_obj.setdefault('remarks', '')
-        display_shortcut = ""
-        try:
-            available_dt = datetime.datetime.strptime(account_obj['available_time'], "%Y-%m-%d %H:%M")
-            now = datetime.datetime.now()
-            if available_dt > now:
-                time_left = available_dt - now
-                days = time_left.days
-                seconds_in_hour = 3600
-                hours = time_left.seconds // seconds_in_hour
-                
-                # 根据语言和数量选择正确的单复数形式
-                day_unit = lang['day'] if days == 1 else lang['days']
-                hour_unit = lang['hour'] if hours == 1 else lang['hours']
-                
-                if days > 0:
-                    if hours > 0:
-                        display_shortcut = f"{days} {day_unit} {hours} {hour_unit}"
-                    else:
-                        display_shortcut = f"{days} {day_unit}"
-                elif hours > 0:
-                    display_shortcut = f"{hours} {hour_unit}"
-                else:
-                    display_shortcut = lang['less_than_one_hour']
-        except (ValueError, TypeError):
-            display_shortcut = ""
-            
-        password = account_obj['password']
-        others = account_obj.get('others', '')
+    def _row_values(self, acc_data, index):
+        """返回账号在Treeview中一行的显示内容（会先刷新状态），打码列和明文列都会填入"""
+        self.store.refresh_status(acc_data)
+        select_char = "☑" if acc_data.get('selected_state', False) else "☐"
+        acc_data.setdefault('remarks', '')
+        display_shortcut = self.store.format_cooldown(acc_data)
 
-        if not self.show_hidden_var.get():
-            password = '*' * len(password)
-            others = '*' * len(others)
-            
-        # 找到当前项的索引
-        index = 1  # 默认序号为1
-        visible_items = []
-        for item in self.tree.get_children():
-            item_values = self.tree.item(item, 'values')
-            if not all(v == "" for v in item_values):  # 排除空白行
-                visible_items.append(item)
-        
-        for i, item in enumerate(visible_items):
-            if item == tree_item_id:
-                index = i + 1  # 序号从1开始
-                break
-                
-        self.tree.item(tree_item_id, values=(
+        others = acc_data.get('others', '')
+        return (
             index,  # 序号
             select_char,
-            account_obj['account'],
-            password,
-            account_obj['status'],
-            account_obj['available_time'],
-            account_obj['remarks'],
+            acc_data['account'],
+            self.MASK,
+            acc_data['status'],
+            acc_data['available_time'],
+            acc_data['remarks'],
             display_shortcut,
+            self.MASK if others else "",
+            *self._login_values(acc_data['account']),
+            acc_data['password'],
             others
-        ), tags=(status_tag,))
+        )
+
+    def _login_values(self, account):
+        """登录统计列：上次登录、7 天和 30 天登录次数、平均间隔"""
+        last, week, month, gap = self.workspace.login_log.values(account)
+        if last is None:
+            return "", "", "", ""
+        if gap is None:
+            gap_text = ""
+        elif gap >= 86400:
+            gap_text = f"{gap / 86400:.1f} {lang['days']}"
+        else:
+            gap_text = f"{gap / 3600:.1f} {lang['hours']}"
+        return store_module.format_time(datetime.datetime.fromtimestamp(last)), week, month, gap_text
+
+    def update_row_in_treeview(self, tree_item_id, account_obj):
+        # 序号沿用该行当前显示的序号，不必遍历整个列表
+        index = self.tree.set(tree_item_id, "index") or 1
+        values = self._row_values(account_obj, index)
+        self.tree.item(tree_item_id, values=values, tags=(account_obj['status'],))
 
+    @profiler.traced()
     def populate_treeview(self, data_to_display=None):
-        # 清空现有内容
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
         source_data = data_to_display if data_to_display is not None else self.accounts_data
+        self._displayed_accounts = source_data
+        # 新的内容取代还没显示完的
+        self.runner.discard(longop.DISPLAY)
+
+        # 按备注排序时显示为按备注分组的树，只有展开的分组才插入账号行
+        if self.sorting_state.get("remarks", None) is not None:
+            self._clear_tree()
+            self.tree.configure(show="tree headings")
+            self._populate_groups(source_data)
+            return
+        # 账号很多时分块插入，先显示前面的行，窗口保持响应；其它操作进行中时等它完成后再清空和插入
+        self.runner.run(lang['displaying'], self._display_steps(source_data),
+                        cancellable=False, modal=False, key=longop.DISPLAY)
+
+    def _clear_tree(self):
+        with profiler.span("populate_treeview.clear"):
+            self.tree.delete(*self.tree.get_children())
+        self._tree_items = {}
+        self._groups = {}
+
+    def _display_steps(self, source_data):
+        self._clear_tree()
+        self.tree.configure(show="headings")
+        total = len(source_data)
+        for start in range(0, total, longop.CHUNK):
+            # 先生成每行的显示内容，再统一插入Treeview，便于分别统计两部分耗时
+            with profiler.span("populate_treeview.build_rows"):
+                rows = [
+                    (acc_data, self._row_values(acc_data, index))
+                    for index, acc_data in enumerate(source_data[start:start + longop.CHUNK], start + 1)
+                ]
+            with profiler.span("populate_treeview.insert", rows=len(rows)):
+                self._insert_rows("", rows)
+            yield start + len(rows), total
+
+    def _insert_rows(self, parent, rows):
+        """插入账号行并登记 tree_id，恢复选中状态"""
         items_to_reselect_in_ui = []
-        
-        # 检查是否仅对"备注"列进行排序
-        is_sorting_by_remarks = self.sorting_state.get("remarks", None) is not None
-        
-        # 生成包含空白行的展示数据（仅在按备注排序时）
-        display_data = []
-        if is_sorting_by_remarks:
-            prev_remark = None
-            for acc_data in source_data:
-                # 对比当前备注与上一条，不同则插入空白行
-                current_remark = acc_data.get('remarks', '')
-                if prev_remark is not None and current_remark != prev_remark:
-                    display_data.append({'is_blank': True})
-                display_data.append(acc_data)
-                prev_remark = current_remark
-        else:
-            # 未按备注排序或未排序，直接使用原始数据
-            display_data = source_data
-        
-        # 填充Treeview
-        real_index = 1  # 实际数据序号（跳过空白行）
-        for item_data in display_data:
-            if is_sorting_by_remarks and item_data.get('is_blank', False):
-                # 仅在按备注排序时插入空白行
-                self.tree.insert("", tk.END, values=("", "", "", "", "", "", "", ""), tags=('blank',))
-                continue
-            
-            # 处理实际数据行
-            acc_data = item_data
-            self._update_account_status_and_time(acc_data)
-            select_char = "☑" if acc_data.get('selected_state', False) else "☐"
-            status_tag = acc_data['status']
-            acc_data.setdefault('remarks', '')
-            display_shortcut = ""
-            
-            password = acc_data['password']
-            others = acc_data.get('others', '')
-
-            if not self.show_hidden_var.get():
-                password = '*' * len(password)
-                others = '*' * len(others)
-            
-            try:
-                available_dt = datetime.datetime.strptime(acc_data['available_time'], "%Y-%m-%d %H:%M")
-                now = datetime.datetime.now()
-                if available_dt > now:
-                    time_left = available_dt - now
-                    days = time_left.days
-                    seconds_in_hour = 3600
-                    hours = time_left.seconds // seconds_in_hour
-                    
-                    day_unit = lang['day'] if days == 1 else lang['days']
-                    hour_unit = lang['hour'] if hours == 1 else lang['hours']
-                    
-                    if days > 0:
-                        display_shortcut = f"{days} {day_unit} {hours} {hour_unit}" if hours > 0 else f"{days} {day_unit}"
-                    elif hours > 0:
-                        display_shortcut = f"{hours} {hour_unit}"
-                    else:
-                        display_shortcut = lang['less_than_one_hour']
-            except (ValueError, TypeError):
-                display_shortcut = ""
-            
-            # 插入实际数据行（使用连续序号）
-            tree_item_id = self.tree.insert("", tk.END, values=(
-                real_index,  # 序号保持连续（跳过空白行）
-                select_char,
-                acc_data['account'],
-                password,
-                acc_data['status'],
-                acc_data['available_time'],
-                acc_data['remarks'],
-                display_shortcut,
-                others
-            ), tags=(status_tag,))
-            
+        for acc_data, values in rows:
+            tree_item_id = self.tree.insert(parent, tk.END, values=values, tags=(acc_data['status'],))
             acc_data['tree_id'] = tree_item_id
+            self._tree_items[tree_item_id] = acc_data
             if acc_data.get('selected_state', False):
                 items_to_reselect_in_ui.append(tree_item_id)
-            
-            real_index += 1  # 只对实际数据行递增序号
-        
-        # 恢复选中状态
-        self.tree.selection_set(*items_to_reselect_in_ui)
+        if items_to_reselect_in_ui:
+            self.tree.selection_add(*items_to_reselect_in_ui)
+
+    @profiler.traced()
+    def _populate_groups(self, source_data):
+        """每种备注一个分组行，显示可用数和总数；分组下先放一个占位行，使其可以展开"""
+        grouped = {}
+        for acc_data in source_data:
+            grouped.setdefault(acc_data.get('remarks', ''), []).append(acc_data)
+        available = lang['status_available']
+        start = 1
+        for remark, accounts in grouped.items():
+            text = lang['group_label'].format(
+                remark=remark or lang['no_remarks'],
+                available=sum(1 for acc in accounts if acc.get('status') == available),
+                total=len(accounts),
+            )
+            group_id = self.tree.insert("", tk.END, text=text, open=False, tags=('group',))
+            self._groups[group_id] = (remark, accounts, start)
+            start += len(accounts)
+            if remark in self._open_groups:
+                self.tree.item(group_id, open=True)
+                self._fill_group(group_id)
+            else:
+                self.tree.insert(group_id, tk.END, tags=('group',))
+
+    def _fill_group(self, group_id):
+        remark, accounts, start = self._groups[group_id]
+        self.tree.delete(*self.tree.get_children(group_id))
+        with profiler.span("populate_treeview.group", rows=len(accounts)):
+            self._insert_rows(group_id, [
+                (acc_data, self._row_values(acc_data, index)) for index, acc_data in enumerate(accounts, start)
+            ])
+
+    def on_group_open(self, event=None):
+        group_id = self.tree.focus()
+        if group_id not in self._groups:
+            return
+        self._record_group(group_id, True)
+        self._open_groups.add(self._groups[group_id][0])
+        self._fill_group(group_id)
+
+    def on_group_close(self, event=None):
+        """收起分组时删除其中的账号行，只保留占位行"""
+        group_id = self.tree.focus()
+        if group_id not in self._groups:
+            return
+        self._record_group(group_id, False)
+        self._open_groups.discard(self._groups[group_id][0])
+        children = self.tree.get_children(group_id)
+        for item in children:
+            self._tree_items.pop(item, None)
+        self.tree.delete(*children)
+        self.tree.insert(group_id, tk.END, tags=('group',))
+
+    def _record_group(self, group_id, is_open):
+        if recorder.is_enabled():
+            recorder.log(recorder.GROUP, index=list(self._groups).index(group_id), open=is_open)
+
+    def _visible_account_items(self):
+        """按显示顺序返回账号行（收起的分组中的账号不在其中）"""
+        items = []
+        for item in self.tree.get_children():
+            if item in self._groups:
+                if self.tree.item(item, 'open'):
+                    items.extend(child for child in self.tree.get_children(item) if child in self._tree_items)
+            else:
+                items.append(item)
+        return items
 
     def update_batch_remarks_visibility(self):
         selected_accounts = [acc for acc in self.accounts_data if acc.get('selected_state', False)]
@@ -812,29 +1178,190 @@ class AccountManagerApp:
         header_text = f"{lang['columns']['select']}:{count}" if count > 0 else lang['columns']['select']
         self.tree.heading("select", text=header_text)
 
+    @profiler.traced()
     def filter_treeview(self):
+        filtered_data = self._filtered_accounts()
+        if filtered_data is None:
+            # 查询还没输入完整，保留当前显示的内容
+            return
+        self.populate_treeview(filtered_data)
+        self.update_batch_remarks_visibility()
+        self.update_availability_counter()
+
+    def update_availability_counter(self):
+        """状态栏的可用数量：现在可用的（一级、二级分别多少）和 24 小时内解除冷却的，数据和分钟数不变时不重算"""
+        now = datetime.datetime.now()
+        now_text = store_module.format_time(now)
+        key = (id(self.store), self.store.revision, now_text)
+        if key == self._counter_key:
+            return
+        self._counter_key = key
+        index = self.store.time_index()
+        available = index.count_until(now_text)
+        tiers = lang['forecast_separator'].join(
+            f"{self.store.tier_name(tier)} {index.count_until(now_text, tier)}" for tier in (0, 1))
+        soon = index.count_until(store_module.format_time(now + datetime.timedelta(hours=24))) - available
+        self.counter_var.set(lang['availability_counter'].format(
+            available=available, total=len(index), tiers=tiers, soon=soon))
+
+    def show_forecast(self, event=None):
+        from dialogs import ForecastDialog
+        ForecastDialog(self.root, self.store)
+
+    def _filtered_accounts(self):
+        """按筛选条件和搜索框中的查询返回账号；查询格式不正确时在状态栏提示并返回 None"""
         show_available = self.show_available_only_var.get()
         show_remarked = getattr(self, "show_remarked_only_var", None)
         show_remarked = show_remarked.get() if show_remarked else False
-        search_text = self.search_var.get().strip().lower() if hasattr(self, "search_var") else ""
-        filtered_data = []
-        for acc in self.accounts_data:
-            self._update_account_status_and_time(acc)
-            match_status = (not show_available or (show_available and acc['status'] == lang['status_available']))
-            match_remark = (not show_remarked or (show_remarked and acc.get('remarks', '').strip()))
-        
-            # 修改搜索匹配逻辑：同时检查账号、密码和备注
-            if search_text:
-                account_match = search_text in acc.get('account', '').lower()
-                remark_match = search_text in acc.get('remarks', '').lower()
-                match_search = account_match or remark_match
+        search_text = self.search_var.get() if hasattr(self, "search_var") else ""
+        try:
+            filtered_data = self.store.filter(show_available, show_remarked, search_text)
+        except QueryError as e:
+            self.set_status(lang['query_invalid'].format(error=e))
+            self._query_error = True
+            return None
+        if self._query_error:
+            self._query_error = False
+            self.set_status("")
+        return filtered_data
+
+    def _watch_data_file(self):
+        """定时检查数据文件是否被其它程序修改，有修改时只应用变化的记录"""
+        try:
+            # 长操作进行中时不应用外部修改，下次检查时再应用
+            if not self.runner.busy and self.store.has_external_changes():
+                self.apply_external_changes()
+            # 时间推移后可用数量会变化
+            self.update_availability_counter()
+        finally:
+            self.root.after(self.WATCH_INTERVAL_MS, self._watch_data_file)
+
+    @profiler.traced()
+    def apply_external_changes(self):
+        self.runner.run(
+            lang['applying_external'], self._recorded_steps(lang['applying_external'], self.store.reload_steps()),
+            on_done=lambda result: self._show_store_changes(*result[0]),
+            on_cancel=lambda: self._operation_cancelled(lang['applying_external']),
+            # 文件可能正被写入一半，已应用的部分回滚，下次检查时再试
+            on_error=lambda e: print(f"读取外部修改失败: {e}")
+        )
+
+    def _show_store_changes(self, added, removed, changed):
+        """把从文件读到或合并进来的修改显示到Treeview"""
+        if not (added or removed or changed):
+            return
+        print(f"检测到外部修改: 新增 {len(added)}，删除 {len(removed)}，修改 {len(changed)}")
+        # 保持当前排序（新增和修改的记录按排序插入到正确位置）
+        sort_column, reverse = self._active_sort_column()
+        if sort_column:
+            self.store.sort(sort_column, reverse)
+        top = self.tree.yview()[0]
+        if self.sorting_state.get("remarks") is not None or self.runner.pending(longop.DISPLAY):
+            # 按备注分组显示时直接重绘（分组行很少，展开的分组保持展开）；
+            # 表格还没分块显示完时也重绘，新的刷新取代它，不在显示了一半的表格上逐行调整
+            self.filter_treeview()
+        else:
+            self._sync_treeview(changed)
+            self.update_batch_remarks_visibility()
+        self.tree.yview_moveto(top)
+
+    def _sync_treeview(self, changed):
+        """按当前筛选结果调整Treeview：删除、插入、移动和更新有变化的行，其余行保持不动（选中状态也保留）"""
+        filtered_data = self._filtered_accounts()
+        if filtered_data is None:
+            filtered_data = self.store.filter(self.show_available_only_var.get(), self.show_remarked_only_var.get())
+        self._displayed_accounts = filtered_data
+        changed_ids = {id(acc) for acc in changed}
+        targets = []
+        for acc in filtered_data:
+            item = acc.get('tree_id')
+            targets.append(item if self._tree_items.get(item) is acc else None)
+        keep = set(targets)
+        current = []
+        old_position = {}
+        for position, item in enumerate(self.tree.get_children()):
+            if item in keep:
+                current.append(item)
+                old_position[item] = position
             else:
-                match_search = True  # 无搜索内容时全部匹配
-            
-            if match_status and match_remark and match_search:
-                filtered_data.append(acc)
-        self.populate_treeview(filtered_data)
-        self.update_batch_remarks_visibility()
+                self.tree.delete(item)
+                self._tree_items.pop(item, None)
+        placed = set()
+        pointer = 0
+        for position, (acc, item) in enumerate(zip(filtered_data, targets)):
+            if item is None:
+                values = self._row_values(acc, position + 1)
+                item = self.tree.insert("", position, values=values, tags=(acc['status'],))
+                acc['tree_id'] = item
+                self._tree_items[item] = acc
+                continue
+            while pointer < len(current) and current[pointer] in placed:
+                pointer += 1
+            if pointer < len(current) and current[pointer] == item:
+                pointer += 1
+            else:
+                self.tree.move(item, "", position)
+            placed.add(item)
+            if id(acc) in changed_ids:
+                values = self._row_values(acc, position + 1)
+                self.tree.item(item, values=values, tags=(acc['status'],))
+            elif old_position[item] != position:
+                self.tree.set(item, "index", position + 1)
+
+    def _sync_round(self):
+        """一轮同步：界面线程生成本地修改，后台线程收发，结果回到界面线程应用"""
+        client = self.sync_client
+        if not client.initialized:
+            # 首次同步先取压缩的全量快照
+            request = client.fetch_snapshot
+        else:
+            changes = {}
+            signature = store_module.file_signature(client.store.data_file)
+            if signature != self._sync_signature:
+                # 只在账号池保存过之后才逐条比较本地修改
+                changes = client.local_changes()
+                self._sync_signature = signature
+            request = lambda: client.transfer(changes)
+
+        def worker():
+            try:
+                self._sync_queue.put((True, request()))
+            except Exception as e:
+                self._sync_queue.put((False, e))
+
+        threading.Thread(target=worker, name="sync-worker", daemon=True).start()
+        self.root.after(100, self._poll_sync)
+
+    def _poll_sync(self):
+        if self.runner.busy:
+            # 长操作完成后再应用收到的修改
+            self.root.after(100, self._poll_sync)
+            return
+        try:
+            ok, result = self._sync_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._poll_sync)
+            return
+        client = self.sync_client
+        if not ok:
+            self.set_status(lang['sync_failed'].format(error=result))
+        else:
+            added, removed, changed = client.apply(result)
+            if added or removed or changed:
+                if client.store is self.store:
+                    self._show_store_changes(added, removed, changed)
+                # 与其它保存一样分块进行，保存完成后再开始下一轮同步
+                self.runner.run(lang['saving'], self._save_steps(client.store),
+                                on_done=lambda merged: self._after_sync_save(client, merged),
+                                cancellable=False, key=longop.SAVE)
+                return
+        self.root.after(self.SYNC_INTERVAL_MS, self._sync_round)
+
+    def _after_sync_save(self, client, merged):
+        self._sync_signature = store_module.file_signature(client.store.data_file)
+        if client.store is self.store:
+            self._show_merged(merged)
+        self.root.after(self.SYNC_INTERVAL_MS, self._sync_round)
 
     def sort_by_remarks(self):
         self.remarks_sort_reverse = not getattr(self, "remarks_sort_reverse", False)
@@ -847,27 +1374,13 @@ class AccountManagerApp:
             key=lambda acc: remarks_order.get(acc.get("remarks", ""), 0),
             reverse=self.remarks_sort_reverse
         )
+        self.store.order_revision += 1
         self.filter_treeview()
 
     def _add_new_account_entry(self, account, password, others=""):
-        password = password.strip() # 去除首尾空格
-    
-        # 只检查账号是否已存在，不考虑密码
-        if not any(acc['account'] == account for acc in self.accounts_data):
-            default_available_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-            new_acc = {
-                'account': account,
-                'password': password,
-                'available_time': default_available_time,
-                'remarks': '',
-                'selected_state': False,
-                'others': others
-            }
-            self.accounts_data.append(new_acc)
-            self.original_data.append(new_acc.copy())  # 添加到原始数据
-            return True
-        return False
+        return self.store.add_account(account, password, others)
 
+    @profiler.traced()
     def import_txt(self):
         filepath = filedialog.askopenfilename(
             title=lang['import_txt'],
@@ -875,120 +1388,247 @@ class AccountManagerApp:
             parent=self.root
         )
         if not filepath: return
-        try:
-            new_accounts_count = 0
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if "----" in line:
-                        # 最多分割两次，获取账号、密码和其它信息
-                        parts = line.split("----", 2)
-                        account = parts[0].strip()
-                        password = parts[1].strip() if len(parts) > 1 else ""
-                        others = parts[2].strip() if len(parts) > 2 else ""  # 新增others处理
-                        if account and password:
-                            if self._add_new_account_entry(account, password, others):  # 传入others
-                                new_accounts_count += 1
-            if new_accounts_count > 0:
-                messagebox.showinfo(lang['import_success'], lang['imported_new_accounts'].format(count=new_accounts_count), parent=self.root)
-                self.filter_treeview()
-                self.save_data()
-            else:
-                messagebox.showinfo(lang['import_txt'], lang['import_no_new'], parent=self.root)
-                self.filter_treeview()
-        except Exception as e:
-            messagebox.showerror(lang['import_error'], lang['import_failed'].format(error=e), parent=self.root)
+        self.runner.run(
+            lang['import_txt'], self._import_steps(filepath),
+            on_done=self._after_import,
+            on_cancel=lambda: self._operation_cancelled(lang['import_txt']),
+            on_error=lambda e: self._operation_failed(lang['import_error'], lang['import_failed'].format(error=e)),
+            supersedes=(longop.DISPLAY,)
+        )
 
+    def _import_steps(self, filepath):
+        """读取文件（较大时在后台线程中），再分块导入并保存"""
+        small = os.path.getsize(filepath) < longop.THREAD_MIN_BYTES
+        lines = yield longop.in_thread(store_module.read_lines, filepath, inline=small)
+        return (yield from self._change_steps(lang['import_txt'], self.store.import_steps(lines)))
+
+    def _after_import(self, result):
+        new_accounts_count, merged = result
+        if new_accounts_count > 0:
+            messagebox.showinfo(lang['import_success'], lang['imported_new_accounts'].format(count=new_accounts_count), parent=self.root)
+        else:
+            messagebox.showinfo(lang['import_txt'], lang['import_no_new'], parent=self.root)
+        self.filter_treeview()
+        self._show_merged(merged)
+
+    @profiler.traced()
     def add_account_dialog(self):
+        from dialogs import AddAccountDialog
         dialog = AddAccountDialog(self.root, lang['add_accounts'], self.import_txt)
         if hasattr(dialog, 'new_accounts_data') and dialog.new_accounts_data:
-            if dialog.new_accounts_data:
-                new_accounts_count = 0
-                for acc_info in dialog.new_accounts_data:
-                    # 接收账号、密码和其它信息
-                    account, password, others = acc_info if len(acc_info) > 2 else (*acc_info, "")
-                    if self._add_new_account_entry(account, password, others):  # 传入others
-                        new_accounts_count += 1
-                if new_accounts_count > 0:
-                    messagebox.showinfo(lang['add_success'], lang['added_new_accounts'].format(count=new_accounts_count), parent=self.root)
-                    self.save_data()
-                elif dialog.new_accounts_data:
-                    messagebox.showinfo(lang['manual_add'], lang['add_no_new'], parent=self.root)
-                self.filter_treeview()
+            self.runner.run(
+                lang['add_accounts'],
+                self._change_steps(lang['add_accounts'], self._add_steps(dialog.new_accounts_data)),
+                on_done=self._after_add,
+                on_cancel=lambda: self._operation_cancelled(lang['add_accounts']),
+                supersedes=(longop.DISPLAY,)
+            )
 
-    def save_data(self):
-        data_to_save = []
-        for acc in self.original_data:  # 保存原始数据
-            acc_copy = acc.copy()
-            acc_copy.pop('tree_id', None)
-            acc_copy.pop('selected_state', None)
-            acc_copy.pop('status', None)
-            # 判断备注内容
-            if acc_copy['remarks'] in self.REMARKS_TO_JSON:
-                acc_copy['remarks'] = self.REMARKS_TO_JSON[acc_copy['remarks']]
+    def _add_steps(self, new_accounts_data):
+        new_accounts_count = 0
+        total = len(new_accounts_data)
+        for start in range(0, total, longop.CHUNK):
+            for acc_info in new_accounts_data[start:start + longop.CHUNK]:
+                # 接收账号、密码和其它信息
+                account, password, others = acc_info if len(acc_info) > 2 else (*acc_info, "")
+                if self._add_new_account_entry(account, password, others):  # 传入others
+                    new_accounts_count += 1
+            yield min(start + longop.CHUNK, total), total
+        return new_accounts_count
+
+    def _after_add(self, result):
+        new_accounts_count, merged = result
+        if new_accounts_count > 0:
+            messagebox.showinfo(lang['add_success'], lang['added_new_accounts'].format(count=new_accounts_count), parent=self.root)
+        else:
+            messagebox.showinfo(lang['manual_add'], lang['add_no_new'], parent=self.root)
+        self.filter_treeview()
+        self._show_merged(merged)
+
+    def switch_workspace(self, name):
+        """切换账号池：当前账号池的首屏缓存先保存，新的账号池第一次打开时才加载"""
+        if name == self.workspace.active:
+            return
+        try:
+            self.save_view_snapshot()
+        except OSError as e:
+            print(f"保存首屏缓存失败: {e}")
+        try:
+            store = self.workspace.open(name)
+        except Exception as e:
+            messagebox.showerror(lang['load_error'], lang['load_failed'].format(error=e), parent=self.root)
+            self.workspace_var.set(self.workspace.active)
+            return
+        self.store = store
+        self.data_file = store.data_file
+        self._prepare_search_index()
+        self.reset_sorting()
+        self.filter_treeview()
+
+    def new_workspace(self):
+        from dialogs import WorkspaceNameDialog
+        dlg = WorkspaceNameDialog(self.root, title=lang['new_workspace'])
+        if not dlg.result:
+            return
+        try:
+            name = self.workspace.create_shard(dlg.result)
+        except (OSError, ValueError):
+            messagebox.showerror(lang['new_workspace'], lang['workspace_invalid'].format(name=dlg.result), parent=self.root)
+            return
+        self.workspace_combo['values'] = self.workspace.shard_names()
+        self.workspace_var.set(name)
+        self.switch_workspace(name)
+
+    @property
+    def history(self):
+        return self._histories.setdefault(self.store.data_file, History())
+
+    @profiler.traced()
+    def undo(self, event=None):
+        """撤销最近一次操作：分块整体恢复后只重绘和保存一次"""
+        recorder.log(recorder.UNDO)
+        self._run_history_step(undo=True)
+
+    @profiler.traced()
+    def redo(self, event=None):
+        recorder.log(recorder.REDO)
+        self._run_history_step(undo=False)
+
+    def _run_history_step(self, undo):
+        if not (self.history.can_undo() if undo else self.history.can_redo()):
+            self.set_status(lang['nothing_to_undo'] if undo else lang['nothing_to_redo'])
+            return
+        label = lang['undoing'] if undo else lang['redoing']
+        self.runner.run(
+            label, self._history_steps(undo),
+            on_done=lambda result: self._after_history_step(result, undo),
+            on_cancel=lambda: self._operation_cancelled(label),
+            supersedes=(longop.DISPLAY,)
+        )
+
+    def _history_steps(self, undo):
+        """开始执行时才从栈中取出操作（连续撤销排队时依次取出），出错或取消时按应用期间的记录回滚并放回原来的栈"""
+        delta = self.history.undo() if undo else self.history.redo()
+        if delta is None:
+            return None
+        try:
+            yield from self._recorded_steps(delta.label, self.store.apply_delta_steps(delta, undo))
+        except Exception:  # 包括取消
+            if undo:
+                self.history.redo()
             else:
-                acc_copy['remarks'] = acc_copy['remarks']  # 其它内容直接存字符串
-            data_to_save.append(acc_copy)
+                self.history.undo()
+            raise
+        # 之后排序和保存，不能再取消
+        yield longop.COMMIT
+        sort_column, reverse = self._active_sort_column()
+        if sort_column:
+            yield from self.store.sort_steps(sort_column, reverse)
+        merged = yield from self._save_steps(self.store)
+        return delta, merged
+
+    def _after_history_step(self, result, undo):
+        if result is None:
+            self.set_status(lang['nothing_to_undo'] if undo else lang['nothing_to_redo'])
+            return
+        delta, merged = result
+        self.filter_treeview()
+        self._show_merged(merged)
+        status = lang['undone'] if undo else lang['redone']
+        self.set_status(status.format(action=delta.label, count=len(delta)))
+
+    @profiler.traced()
+    def save_data(self):
+        # 账号很多时分块保存并显示进度；保存不能取消，排队中的保存只保留最新的一次
+        self.runner.run(lang['saving'], self._save_steps(self.store), on_done=self._show_merged,
+                        cancellable=False, key=longop.SAVE, supersedes=(longop.SAVE,))
+
+    def _save_steps(self, store):
+        """保存账号池（见 AccountStore.save_steps），失败时提示并返回 None"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=4)
+            return (yield from store.save_steps())
         except Exception as e:
             messagebox.showerror(lang['save_failed'], lang['save_error'].format(error=e), parent=self.root)
+            return None
 
+    @profiler.traced()
     def load_data(self):
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                loaded_entries = json.load(f)
-                self.accounts_data = []
-                self.original_data = []  # 重置原始数据
-                for entry in loaded_entries:
-                    entry.setdefault('selected_state', False)
-                    entry.setdefault('available_time', datetime.datetime.now().strftime("%Y-%m-%d %H:%M"))
-                    entry.setdefault('others', '')
-                    # 兼容数字和字符串
-                    if isinstance(entry.get('remarks', ""), int):
-                        entry['remarks'] = self.REMARKS_FROM_JSON.get(entry.get('remarks', 0), '')
-                    else:
-                        entry['remarks'] = entry.get('remarks', '')
-                    entry.pop('id', None)
-                    entry.pop('shortcut', None)
-                    entry.pop('delay_days', None)
-                    entry.pop('delay_hours', None)
-                    entry.pop('status', None)
-                    self.accounts_data.append(entry.copy())
-                    self.original_data.append(entry.copy())  # 同时添加到原始数据
-        except FileNotFoundError:
-            self.accounts_data = []
-            self.original_data = []
-        except Exception as e:
-            messagebox.showerror(lang['load_error'], lang['load_failed'].format(error=e), parent=self.root)
-            self.accounts_data = []
-            self.original_data = []
+        self.runner.run(
+            lang['loading'], self._load_steps(),
+            on_done=lambda _: self._after_load(),
+            on_cancel=lambda: self._operation_cancelled(lang['loading']),
+            on_error=self._load_failed,
+            supersedes=(longop.DISPLAY,)
+        )
+
+    def _load_steps(self):
+        yield from self.store.load_steps()
+        # 保持表头显示的排序（例如从首屏缓存恢复的排序）
+        sort_column, reverse = self._active_sort_column()
+        if sort_column:
+            yield from self.store.sort_steps(sort_column, reverse)
+
+    def _load_failed(self, error):
+        messagebox.showerror(lang['load_error'], lang['load_failed'].format(error=error), parent=self.root)
+        self.store.clear()
+        self._after_load()
+
+    def _after_load(self):
+        self._prepare_search_index()
         self.filter_treeview()
 
+    def _prepare_search_index(self):
+        """在后台线程中预先建好账号的三字母组索引，账号很多时第一次搜索不必等待"""
+        index = self.store.search_index()
+        threading.Thread(target=index.prepare, args=(self.store,), name="search-index", daemon=True).start()
+
+    @profiler.traced()
     def refresh_treeview(self):
         # 刷新时重置排序状态
         self.reset_sorting()
         self.load_data()
-        self.filter_treeview()
 
+    @profiler.traced()
     def select_all_toggle(self):
-        visible_items = []
-        for item in self.tree.get_children():
-            item_values = self.tree.item(item, 'values')
-            if not all(v == "" for v in item_values):  # 排除空白行
-                visible_items.append(item)
-                
-        visible_accounts = [self.get_account_by_tree_id(item_id) for item_id in visible_items if self.get_account_by_tree_id(item_id)]
+        # 筛选出的全部账号，包括收起的分组中的
+        visible_accounts = self._displayed_accounts
         if not visible_accounts: return
         
+        recorder.log(recorder.SELECT_ALL)
         all_currently_selected = all(acc.get('selected_state', False) for acc in visible_accounts)
-        new_state = not all_currently_selected
-        for acc_obj in visible_accounts:
-            self._set_account_selection_state(acc_obj, new_state)
-        # 选中状态变化时，更新批量备注控件显示
-        self.update_batch_remarks_visibility()
+        self._run_selection(lang['select_all_toggle'], visible_accounts, not all_currently_selected)
+
+    def _run_selection(self, label, accounts, state, on_done=None):
+        """分块修改一批账号的选中状态，完成后（先调用 on_done）只刷新一次批量备注控件"""
+        def done(_=None):
+            if on_done is not None:
+                on_done()
+            # 选中状态变化时，更新批量备注控件显示
+            self.update_batch_remarks_visibility()
+
+        if not accounts:
+            done()
+            return
+        self.runner.run(label, self._selection_steps(accounts, state), on_done=done,
+                        on_cancel=lambda: self._operation_cancelled(label))
 
+    def _selection_steps(self, accounts, state):
+        """选中状态不记入撤销历史，取消时把已修改的账号恢复原状"""
+        changed = []
+        total = len(accounts)
+        try:
+            for start in range(0, total, longop.CHUNK):
+                for acc in accounts[start:start + longop.CHUNK]:
+                    if acc.get('selected_state', False) != state:
+                        self._set_account_selection_state(acc, state, refresh=False)
+                        changed.append(acc)
+                yield min(start + longop.CHUNK, total), total
+        except longop.Cancelled:
+            for acc in changed:
+                self._set_account_selection_state(acc, not state, refresh=False)
+            raise
+
+    @profiler.traced()
     def delete_selected(self):
         selected_accounts_to_delete = [
             acc['account'] for acc in self.accounts_data if acc.get('selected_state', False)
@@ -997,25 +1637,25 @@ class AccountManagerApp:
             messagebox.showinfo(lang['delete_no_selected'], lang['delete_no_accounts'], parent=self.root)
             return
         if messagebox.askyesno(lang['confirm_delete'], lang['confirm_delete_msg'].format(count=len(selected_accounts_to_delete)), parent=self.root):
-            # 从当前数据和原始数据中都删除
-            self.accounts_data = [
-                acc for acc in self.accounts_data
-                if acc['account'] not in selected_accounts_to_delete
-            ]
-            self.original_data = [
-                acc for acc in self.original_data
-                if acc['account'] not in selected_accounts_to_delete
-            ]
-            self.filter_treeview()
-            self.save_data()
-            messagebox.showinfo(lang['delete_success'], lang['deleted_accounts'].format(count=len(selected_accounts_to_delete)), parent=self.root)
+            # 从当前数据和原始数据中都删除（可以撤销，删除过程中取消时恢复）
+            self.runner.run(
+                lang['delete_selected'],
+                self._change_steps(lang['delete_selected'], self.store.delete_steps(selected_accounts_to_delete)),
+                on_done=self._after_delete,
+                on_cancel=lambda: self._operation_cancelled(lang['delete_selected']),
+                supersedes=(longop.DISPLAY,)
+            )
+
+    def _after_delete(self, result):
+        count, merged = result
+        self.filter_treeview()
+        self._show_merged(merged)
+        messagebox.showinfo(lang['delete_success'], lang['deleted_accounts'].format(count=count), parent=self.root)
 
+    @profiler.traced()
     def export_txt(self):
         # 检查是否有选中的账号（使用数据中的selected_state）
-        selected_accounts = [
-            acc for acc in self.accounts_data 
-            if acc.get('selected_state', False)
-        ]
+        selected_accounts = self.store.selected_accounts()
     
         if not selected_accounts:
             messagebox.showinfo(lang['export_no_selected'], lang['export_no_accounts'])
@@ -1028,46 +1668,34 @@ class AccountManagerApp:
 
         if not export_method: return
 
-        # 收集选中账号的原始数据（使用真实密码）
-        export_data = []
-        for acc in selected_accounts:
-            # 有其它信息则导出三部分，否则只导出账号密码
-            if acc.get('others'):
-                export_data.append(f"{acc['account']}----{acc['password']}----{acc['others']}")
-            else:
-                export_data.append(f"{acc['account']}----{acc['password']}")
-
-        # 根据选择的导出方式执行操作
-        if export_method == "txt":
-            # TXT文件导出逻辑
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".txt",
-                filetypes=[(lang['txt_file'], "*.txt"), ("All Files", "*.*")]
-            )
-            if not file_path: return
-
-            try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write("\n".join(export_data))
-                messagebox.showinfo(
-                    lang['export_success'],
-                    lang['exported_accounts'].format(count=len(export_data), path=file_path)
-                )
-            except Exception as e:
-                messagebox.showerror(
-                    lang['export_error'],
-                    lang['export_failed'].format(error=str(e))
+        fmt, fields = dialog.format, dialog.fields
+
+        text = None
+        if export_method == "clipboard":
+            # 内容太大时剪贴板会很慢，提示改为导出文件
+            text = exporter.text_within(selected_accounts, fmt, fields, exporter.CLIPBOARD_LIMIT)
+            if text is None:
+                answer = messagebox.askyesnocancel(
+                    lang['export_selected'],
+                    lang['clipboard_too_large'].format(count=len(selected_accounts)),
+                    parent=self.root
                 )
+                if answer is None: return
+                if answer: export_method = "file"
+                else: text = "".join(exporter.iter_chunks(selected_accounts, fmt, fields))
+
+        if export_method == "file":
+            self._export_file(selected_accounts, fmt, fields)
 
         elif export_method == "clipboard":
             # 剪贴板导出逻辑
             try:
                 self.root.clipboard_clear()
-                self.root.clipboard_append("\n".join(export_data))
+                self.root.clipboard_append(text)
                 self.root.update()  # 确保剪贴板内容被更新
                 messagebox.showinfo(
                     lang['export_success'],
-                    lang['exported_accounts'].format(count=len(export_data), path=lang['clipboard'])
+                    lang['exported_accounts'].format(count=len(selected_accounts), path=lang['clipboard'])
                 )
             except Exception as e:
                 messagebox.showerror(
@@ -1075,11 +1703,34 @@ class AccountManagerApp:
                     lang['export_failed'].format(error=str(e))
                 )
 
+    def _export_file(self, accounts, fmt, fields):
+        """在后台线程中分块写入文件，显示进度，可以取消"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension="." + fmt,
+            filetypes=[(fmt.upper(), "*." + fmt), ("All Files", "*.*")]
+        )
+        if not file_path: return
+        self.runner.run(
+            lang['export_selected'], self._export_steps(file_path, list(accounts), fmt, fields),
+            on_done=lambda count: messagebox.showinfo(
+                lang['export_success'], lang['exported_accounts'].format(count=count, path=file_path)),
+            on_cancel=lambda: self.set_status(lang['operation_cancelled'].format(label=lang['export_selected'])),
+            on_error=lambda e: messagebox.showerror(lang['export_error'], lang['export_failed'].format(error=str(e)))
+        )
 
+    @staticmethod
+    def _export_steps(file_path, accounts, fmt, fields):
+        yield 0, len(accounts)
+        # 取消时 write_file 只删除它的临时文件，被覆盖的原文件保持不变
+        count = yield longop.in_thread(exporter.write_file, file_path, accounts, fmt, fields,
+                                       inline=len(accounts) <= exporter.CHUNK_SIZE, progress=True, cancellable=True)
+        if count is None:
+            raise longop.Cancelled()
+        return count
+
+    @profiler.traced()
     def batch_set_remarks(self):
-        selected_accounts = [
-            acc for acc in self.accounts_data if acc.get('selected_state', False)
-        ]
+        selected_accounts = self.store.selected_accounts()
         if not selected_accounts:
             return
             
@@ -1087,14 +1738,34 @@ class AccountManagerApp:
         if remark_text == lang['remarks_options'][0]:
             remark_text = ""
             
-        for acc in selected_accounts:
-            self.set_remarks(acc, remark_text)
-        
+        # 分块修改后只刷新和保存一次，撤销时也是一次操作，中途取消时恢复
+        self.runner.run(
+            lang['batch_remark'],
+            self._change_steps(lang['batch_remark'], self._remark_steps(selected_accounts, remark_text)),
+            on_done=lambda result: self._after_batch_remarks(result, remark_text),
+            on_cancel=lambda: self._operation_cancelled(lang['batch_remark']),
+            supersedes=(longop.DISPLAY,)
+        )
+
+    def _remark_steps(self, accounts, remark_text):
+        total = len(accounts)
+        for start in range(0, total, longop.CHUNK):
+            for acc in accounts[start:start + longop.CHUNK]:
+                self.store.set_remarks(acc, remark_text)
+            yield min(start + longop.CHUNK, total), total
+        return total
+
+    def _after_batch_remarks(self, result, remark_text):
+        count, merged = result
+        self.filter_treeview()
+        self._show_merged(merged)
         self.batch_remarks_var.set("")
-        messagebox.showinfo(lang['batch_remark_success'], lang['batch_remark_msg'].format(count=len(selected_accounts), remark=remark_text), parent=self.root)
+        messagebox.showinfo(lang['batch_remark_success'], lang['batch_remark_msg'].format(count=count, remark=remark_text), parent=self.root)
 
 if __name__ == '__main__':
     root = tk.Tk()
     app = AccountManagerApp(root)
+    # 更新检查在后台线程进行，不阻塞界面
     check_for_update(root, root.title(), lang, version)
+    root.after_idle(app.report_first_paint)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""加载、保存、导入、筛选、排序和渲染的基准测试
+
+每个操作先计时若干次（不开启 tracemalloc），再单独运行一次测量峰值内存。
+依赖 Tk 的步骤默认在 tkstub 上运行；有显示器（或虚拟显示器，如 xvfb-run）时可用 --tk real。
+结果保存为 JSON，可用 --compare 对比两次运行。
+
+示例：
+    python bench.py --sizes 1000 10000 100000
+    xvfb-run python bench.py --tk real --sizes 10000
+    python bench.py --compare results/old.json results/new.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROGRAM_DIR = os.path.join(os.path.dirname(BENCH_DIR), "Program")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+DEFAULT_SIZES = (1000, 10000, 100000)
+SORT_COLUMNS = ("account", "status", "available_time", "remarks")
+
+
+def load_app_module(tk_mode="stub"):
+    """导入主程序模块；stub 模式下先安装 tkinter 桩"""
+    if PROGRAM_DIR not in sys.path:
+        sys.path.insert(0, PROGRAM_DIR)
+    if BENCH_DIR not in sys.path:
+        sys.path.insert(0, BENCH_DIR)
+    import tkstub
+    if tk_mode == "stub":
+        tkstub.install()
+    import importlib
+    app_module = importlib.import_module("账号管理系统")
+    if tk_mode != "stub":
+        # 真实界面下不能弹出模态对话框，改为脚本化的返回值
+        app_module.messagebox = _ScriptedDialogs
+        app_module.filedialog = _ScriptedDialogs
+    return app_module
+
+
+class _ScriptedDialogs:
+    """真实 Tk 模式下替代 messagebox / filedialog 的脚本化对话框"""
+
+    @staticmethod
+    def _answer(kind):
+        import tkstub
+        return tkstub.responses.get(kind, True if kind.startswith('ask') else "ok")
+
+    showinfo = showwarning = showerror = staticmethod(lambda *a, **k: "ok")
+    askyesno = askokcancel = staticmethod(lambda *a, **k: True)
+    askyesnocancel = staticmethod(lambda *a, **k: True)
+    askopenfilename = staticmethod(lambda **k: _ScriptedDialogs._answer('askopenfilename'))
+    asksaveasfilename = staticmethod(lambda **k: _ScriptedDialogs._answer('asksaveasfilename'))
+
+
+def create_app(app_module, workdir):
+    """在 workdir 中（accounts_data.json 所在目录）创建界面实例"""
+    os.chdir(workdir)
+    root = app_module.tk.Tk()
+    if hasattr(root, "withdraw"):
+        root.withdraw()
+    app = app_module.AccountManagerApp(root)
+    return root, app
+
+
+def measure(func, setup=None, repeat=3):
+    """返回 (每次耗时列表, 峰值内存字节数)；setup 不计入耗时"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    return timings, peak
+
+
+def bench_size(app_module, size, repeat, seed):
+    import generate_data
+    import tkstub
+
+    results = []
+
+    def record(operation, func, setup=None):
+        timings, peak = measure(func, setup, repeat)
+        entry = {
+            'operation': operation, 'size': size,
+            'min_s': min(timings), 'median_s': statistics.median(timings),
+            'peak_kb': round(peak / 1024, 1),
+        }
+        results.append(entry)
+        print(f"{size:>9} {operation:<28} {entry['median_s'] * 1000:>10.1f} ms {entry['peak_kb']:>12.1f} KB", flush=True)
+
+    with tempfile.TemporaryDirectory(prefix="sam-bench-") as workdir:
+        data_path = os.path.join(workdir, "accounts_data.json")
+        txt_path = os.path.join(workdir, "import.txt")
+        generate_data.write_accounts(data_path, size, seed)
+        generate_data.write_import_txt(txt_path, size, seed, existing_ratio=0.5, existing_count=size)
+        with open(data_path, 'rb') as f:
+            pristine = f.read()
+
+        def restore_file():
+            with open(data_path, 'wb') as f:
+                f.write(pristine)
+
+        root, app = create_app(app_module, workdir)
+        app.runner.wait()
+        store = app.store
+
+        def completed(func):
+            """界面操作较慢时分片执行（见 longop），计时包括执行完所有分片"""
+            def run_to_end():
+                func()
+                app.runner.wait()
+            return run_to_end
+
+        record("load_data", completed(app.load_data))
+        record("save_data", completed(app.save_data))
+        restore_file()
+
+        def reload_store():
+            restore_file()
+            store.load()
+            app.reset_sorting()
+
+        # 两种模式下的文件对话框都从 tkstub.responses 读取返回值
+        tkstub.responses['askopenfilename'] = txt_path
+        record("import_txt", completed(app.import_txt), setup=reload_store)
+        reload_store()
+
+        record("filter_treeview", completed(app.filter_treeview))
+        app.search_var.set("ab")
+        record("filter_treeview:search", completed(app.filter_treeview))
+        app.search_var.set("")
+        app.show_available_only_var.set(True)
+        record("filter_treeview:available", completed(app.filter_treeview))
+        app.show_available_only_var.set(False)
+
+        def toggle_hidden():
+            app.show_hidden_var.set(not app.show_hidden_var.get())
+            app._apply_hidden_columns()
+        record("toggle_hidden", toggle_hidden)
+
+        for column in SORT_COLUMNS:
+            record(f"sort:{column}", lambda c=column: store.sort(c, False), setup=store.reset_sorting)
+        store.reset_sorting()
+
+        filtered = store.filter()
+        record("populate_treeview", completed(lambda: app.populate_treeview(filtered)))
+        app.sorting_state["remarks"] = False
+        store.sort("remarks", False)
+        record("populate_treeview:grouped", completed(lambda: app.populate_treeview(store.filter())))
+        app.reset_sorting()
+        root.destroy()
+        os.chdir(BENCH_DIR)
+    return results
+
+
+def run(args):
+    app_module = load_app_module(args.tk)
+    results = []
+    print(f"{'size':>9} {'operation':<28} {'median':>13} {'peak memory':>15}")
+    for size in args.sizes:
+        results.extend(bench_size(app_module, size, args.repeat, args.seed))
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'tk': args.tk,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}")
+    return 0
+
+
+def compare(old_path, new_path, threshold):
+    """对比两次结果，新结果的中位耗时超过旧结果 threshold 倍时返回 1"""
+    with open(old_path, encoding='utf-8') as f:
+        old = {(r['operation'], r['size']): r for r in json.load(f)['results']}
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['results']
+    regressions = 0
+    print(f"{'size':>9} {'operation':<28} {'old ms':>10} {'new ms':>10} {'ratio':>7} {'old KB':>10} {'new KB':>10}")
+    for entry in new:
+        before = old.get((entry['operation'], entry['size']))
+        if before is None:
+            continue
+        ratio = entry['median_s'] / before['median_s'] if before['median_s'] else float('inf')
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{entry['size']:>9} {entry['operation']:<28} {before['median_s'] * 1000:>10.1f} "
+              f"{entry['median_s'] * 1000:>10.1f} {ratio:>7.2f} {before['peak_kb']:>10.1f} {entry['peak_kb']:>10.1f}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="account manager benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tk", choices=("stub", "real"), default="stub",
+                        help="run Tk steps against the stub or a real (virtual) display")
+    parser.add_argument("-o", "--output", help="result JSON path (default: results/bench-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=1.25, help="regression ratio for --compare")
+    args = parser.parse_args(argv)
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
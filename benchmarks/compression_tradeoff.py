@@ -0,0 +1,111 @@
+"""数据文件压缩方法和级别的取舍：文件大小与 AccountStore 保存、加载耗时及加载峰值内存
+
+每种设置先把生成的数据保存一次得到文件大小，再分别计时若干次保存和加载（取中位数），
+最后单独加载一次测量峰值内存。文件在共享文件夹上时，传输时间大致与文件大小成正比，
+可用 --bandwidth-mbps 估算加上传输后的总耗时。
+
+示例：
+    python compression_tradeoff.py --size 100000
+    python compression_tradeoff.py --size 20000 --settings none gzip:1 gzip:6 lzma:1 --bandwidth-mbps 100
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import bench
+import generate_data
+
+if bench.PROGRAM_DIR not in sys.path:
+    sys.path.insert(0, bench.PROGRAM_DIR)
+
+DEFAULT_SETTINGS = ("none", "gzip:1", "gzip:6", "gzip:9", "zlib:1", "zlib:6", "zlib:9", "lzma:0", "lzma:1", "lzma:6")
+
+
+def _median_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def measure_setting(store_class, source, workdir, setting, repeat):
+    import compression
+
+    data_file = os.path.join(workdir, f"accounts-{setting.replace(':', '-')}.json")
+    compression.configure(setting)
+    store = store_class(data_file)
+    store.original_data = source.original_data
+    store.accounts_data = source.accounts_data
+    store.save()
+    size = os.path.getsize(data_file)
+    save_s = _median_time(store.save, repeat)
+
+    reader = store_class(data_file)
+    load_s = _median_time(reader.load, repeat)
+    reader.clear()
+    tracemalloc.start()
+    reader.load()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    compression.configure(None)
+    os.remove(data_file)
+    return {
+        'setting': setting, 'size': len(source), 'bytes': size,
+        'save_s': save_s, 'load_s': load_s, 'load_peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(args):
+    from store import AccountStore
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="sam-compress-") as workdir:
+        source_file = os.path.join(workdir, "accounts_data.json")
+        generate_data.write_accounts(source_file, args.size, args.seed)
+        source = AccountStore(source_file)
+        source.load()
+        plain = None
+        header = f"{'setting':<9} {'size KB':>10} {'ratio':>6} {'save ms':>9} {'load ms':>9} {'load peak KB':>13}"
+        if args.bandwidth_mbps:
+            header += f" {'load+transfer ms':>17}"
+        print(f"{args.size} accounts")
+        print(header)
+        for setting in args.settings:
+            entry = measure_setting(AccountStore, source, workdir, setting, args.repeat)
+            plain = plain or entry['bytes']
+            line = (f"{setting:<9} {entry['bytes'] / 1024:>10.1f} {entry['bytes'] / plain:>6.2f} "
+                    f"{entry['save_s'] * 1000:>9.1f} {entry['load_s'] * 1000:>9.1f} {entry['load_peak_kb']:>13.1f}")
+            if args.bandwidth_mbps:
+                transfer_s = entry['bytes'] * 8 / (args.bandwidth_mbps * 1e6)
+                entry['load_transfer_s'] = entry['load_s'] + transfer_s
+                line += f" {entry['load_transfer_s'] * 1000:>17.1f}"
+            print(line, flush=True)
+            results.append(entry)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'size': args.size, 'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"results written to {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="data file size vs load/save time for each compression setting")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--settings", nargs="+", default=list(DEFAULT_SETTINGS), help="method[:level] values")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bandwidth-mbps", type=float, default=0,
+                        help="also estimate load time including transfer over a share of this bandwidth")
+    parser.add_argument("-o", "--output", help="result JSON path")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
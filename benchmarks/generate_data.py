@@ -0,0 +1,109 @@
+"""生成用于基准测试的 accounts_data.json 和导入用 TXT
+
+备注、冷却和其它信息的分布参考实际使用情况：大部分账号没有备注，少量为一级/二级或自定义中文备注；
+约一半账号处于冷却中，冷却时长取自界面上的快捷选项。
+
+示例：
+    python generate_data.py 100000 -o accounts_data.json
+    python generate_data.py 100000 --txt import.txt --existing-ratio 0.5
+"""
+import argparse
+import datetime
+import json
+import random
+import string
+import sys
+
+# (备注, 权重)；整数为文件中固定备注的编码，字符串为自定义备注
+REMARK_WEIGHTS = [
+    (0, 60), (1, 15), (2, 10),
+    ("优先使用", 4), ("已封禁", 3), ("七天冷却", 3), ("新号", 3), ("Prime", 2),
+]
+COOLDOWN_HOURS = [20, 3 * 24, 7 * 24, 14 * 24, 31 * 24, 45 * 24, 181 * 24]
+OTHERS_SAMPLES = [
+    "", "", "", "", "", "", "",
+    "prime", "steamguard",
+    "{user}@example.com----{secret}",
+]
+
+
+def _random_text(rng, alphabet, low, high):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+
+def account_names(count, seed=0, offset=0):
+    """生成 count 个不重复的账号名"""
+    rng = random.Random(seed)
+    prefix_alphabet = string.ascii_lowercase
+    for i in range(offset, offset + count):
+        # 随机前缀 + 序号保证唯一，同时让账号前缀搜索有意义
+        yield f"{_random_text(rng, prefix_alphabet, 3, 7)}{i:07d}"
+
+
+def generate_accounts(count, seed=0, now=None):
+    """生成 count 条与 accounts_data.json 中格式相同的记录"""
+    rng = random.Random(seed)
+    now = now or datetime.datetime.now()
+    remarks, weights = zip(*REMARK_WEIGHTS)
+    entries = []
+    for account in account_names(count, seed):
+        if rng.random() < 0.5:
+            # 已可用：冷却在过去 0~30 天内结束
+            available = now - datetime.timedelta(minutes=rng.randint(0, 30 * 24 * 60))
+        else:
+            cooldown = datetime.timedelta(hours=rng.choice(COOLDOWN_HOURS))
+            elapsed = cooldown * rng.random()
+            available = now + cooldown - elapsed
+        others = rng.choice(OTHERS_SAMPLES).format(
+            user=account, secret=_random_text(rng, string.ascii_letters + string.digits, 8, 12)
+        )
+        entries.append({
+            'account': account,
+            'password': _random_text(rng, string.ascii_letters + string.digits, 8, 16),
+            'available_time': available.strftime("%Y-%m-%d %H:%M"),
+            'remarks': rng.choices(remarks, weights)[0],
+            'others': others,
+        })
+    return entries
+
+
+def write_accounts(path, count, seed=0):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(generate_accounts(count, seed), f, ensure_ascii=False, indent=4)
+
+
+def write_import_txt(path, count, seed=0, existing_ratio=0.0, existing_count=0):
+    """生成导入用TXT：existing_ratio 比例的行与已有账号重复，其余为新账号"""
+    rng = random.Random(seed + 1)
+    existing = list(account_names(existing_count, seed)) if existing_count else []
+    fresh = account_names(count, seed + 1, offset=existing_count)
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(count):
+            if existing and rng.random() < existing_ratio:
+                account = rng.choice(existing)
+            else:
+                account = next(fresh)
+            password = _random_text(rng, string.ascii_letters + string.digits, 8, 16)
+            if rng.random() < 0.3:
+                f.write(f"{account}----{password}----prime\n")
+            else:
+                f.write(f"{account}----{password}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="generate synthetic account data")
+    parser.add_argument("count", type=int)
+    parser.add_argument("-o", "--output", default="accounts_data.json")
+    parser.add_argument("--txt", help="also write an import TXT file")
+    parser.add_argument("--existing-ratio", type=float, default=0.0,
+                        help="share of TXT lines that duplicate existing accounts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    write_accounts(args.output, args.count, args.seed)
+    if args.txt:
+        write_import_txt(args.txt, args.count, args.seed, args.existing_ratio, args.count)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
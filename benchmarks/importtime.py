@@ -0,0 +1,74 @@
+"""冷启动导入耗时检查：用 python -X importtime 统计导入主程序的总耗时
+
+取多次运行中的最小值以减少噪声；总耗时超过 --budget-ms，或启动时导入了 --forbid 中列出的
+模块（默认 pypinyin、dialogs、ssl，它们应在第一次使用时才导入）时以非零状态退出。
+
+示例：
+    python importtime.py --budget-ms 150
+    python importtime.py --module cli --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+import bench
+
+DEFAULT_FORBIDDEN = ("pypinyin", "dialogs", "ssl")
+
+
+def measure_imports(module, python=sys.executable):
+    """返回 {模块名: (自身耗时us, 累计耗时us)}，按导入顺序排列"""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=bench.PROGRAM_DIR, capture_output=True, text=True, encoding="utf-8",
+        env=dict(os.environ, PYTHONIOENCODING="utf-8"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="cold-start import time check")
+    parser.add_argument("--module", default="账号管理系统")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--forbid", nargs="*", default=list(DEFAULT_FORBIDDEN),
+                        help="modules that must not be imported at startup")
+    parser.add_argument("--top", type=int, default=10, help="show the slowest imports")
+    args = parser.parse_args(argv)
+
+    best = None
+    for _ in range(args.runs):
+        imports = measure_imports(args.module)
+        total = sum(self_us for self_us, _ in imports.values())
+        if best is None or total < best[0]:
+            best = (total, imports)
+    total_us, imports = best
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms total, {len(imports)} modules (best of {args.runs})")
+    slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"  {self_us / 1000:>8.1f} ms self {cumulative_us / 1000:>8.1f} ms cumulative  {name}")
+
+    status = 0
+    top_level = {name.split(".")[0] for name in imports}
+    for name in args.forbid:
+        if name in top_level:
+            print(f"FAIL: {name} is imported at startup")
+            status = 1
+    if total_us / 1000 > args.budget_ms:
+        print(f"FAIL: import time {total_us / 1000:.1f} ms exceeds budget {args.budget_ms} ms")
+        status = 1
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""按子系统统计内存占用，并对比脚本化操作前后的两次 tracemalloc 快照
+
+在 tkstub 上创建界面并加载合成数据，先预热一轮操作，然后在若干轮操作前后各取一次快照。
+每条内存分配按调用栈中最内层能识别的代码归入子系统：菜单、Treeview 行、搜索/排序缓存、账号数据，
+其余记为 other。增长超过 --max-growth-kb 时以非零状态退出，可用作回归检查。
+
+示例：
+    python memreport.py --size 20000 --iterations 20
+    python memreport.py --max-growth-kb 512
+"""
+import argparse
+import inspect
+import os
+import sys
+import tempfile
+import tracemalloc
+import types
+
+import bench
+
+NFRAMES = 12
+
+
+def subsystem_specs(app_module):
+    """(子系统, 代码对象列表)；按顺序匹配，函数级条目应排在模块级条目之前"""
+    import store
+    import tkstub
+    app_cls = app_module.AccountManagerApp
+    return [
+        ("menus", [
+            tkstub.Menu, app_cls.on_tree_right_click, app_cls._get_context_menu, app_cls.show_profile_menu,
+            app_cls._add_remarks_menu_items, app_cls._add_shortcut_menu_items, app_cls._add_available_time_menu_items,
+        ]),
+        ("treeview items", [
+            tkstub.Treeview, app_cls.populate_treeview, app_cls.update_row_in_treeview,
+            app_cls.update_row_checkbox_only,
+        ]),
+        ("search/sort caches", [
+            store.AccountStore.filter, store.AccountStore.sort_key, store.AccountStore.sort,
+            app_cls.filter_treeview, app_cls._sort_data, app_cls.sort_by_column,
+        ]),
+        ("account store", [store]),
+    ]
+
+
+def _code_ranges(obj):
+    """返回对象（函数、类或模块）对应的 (文件名, 起始行, 结束行) 列表"""
+    obj = inspect.unwrap(obj) if callable(obj) and not isinstance(obj, type) else obj
+    if isinstance(obj, types.ModuleType):
+        return [(os.path.abspath(obj.__file__), 0, sys.maxsize)]
+    if isinstance(obj, type):
+        ranges = []
+        for member in vars(obj).values():
+            if inspect.isfunction(member):
+                ranges.extend(_code_ranges(member))
+        return ranges
+    code = obj.__code__
+    lines = [line for _, _, line in code.co_lines() if line is not None]
+    return [(os.path.abspath(code.co_filename), min(lines), max(lines))]
+
+
+class Classifier:
+    def __init__(self, specs):
+        self.rules = []
+        for name, objects in specs:
+            for obj in objects:
+                for filename, first, last in _code_ranges(obj):
+                    self.rules.append((name, filename, first, last))
+        self._cache = {}
+
+    def classify_frame(self, filename, lineno):
+        key = (filename, lineno)
+        if key not in self._cache:
+            path = os.path.abspath(filename)
+            self._cache[key] = next(
+                (name for name, rule_file, first, last in self.rules
+                 if rule_file == path and first <= lineno <= last),
+                None
+            )
+        return self._cache[key]
+
+    def classify(self, traceback):
+        # tracemalloc 的 traceback 从最早一层排到最近一层，这里从最内层开始匹配
+        for frame in reversed(traceback):
+            name = self.classify_frame(frame.filename, frame.lineno)
+            if name:
+                return name
+        return "other"
+
+
+def group_by_subsystem(classifier, statistics, attr):
+    totals = {}
+    top = {}
+    for stat in statistics:
+        name = classifier.classify(stat.traceback)
+        totals[name] = totals.get(name, 0) + getattr(stat, attr)
+        top.setdefault(name, []).append(stat)
+    return totals, top
+
+
+def scripted_workload(app, rounds=1):
+    """模拟一段典型操作：搜索、筛选、各列排序、右键菜单、冷却、备注和刷新
+
+    较慢的操作分片执行（见 longop），每次都用 runner.wait() 执行完，与逐个操作等它完成的用户一致。
+    """
+    event = types.SimpleNamespace(x=0, y=0, x_root=0, y_root=0, state=0)
+    for _ in range(rounds):
+        for text in ("a", "ab", "abc", ""):
+            app.search_var.set(text)
+            app.filter_treeview()
+            app.runner.wait()
+        app.show_available_only_var.set(True)
+        app.filter_treeview()
+        app.runner.wait()
+        app.show_available_only_var.set(False)
+        for column in ("account", "available_time", "remarks"):
+            for _ in range(3):
+                app.sort_by_column(column)
+                app.runner.wait()
+        children = app.tree.get_children()
+        if children:
+            app.tree.pointer_row = children[0]
+            for column_id in ("#3", "#7", "#8", "#6"):
+                app.tree.pointer_column = column_id
+                app.on_tree_right_click(event)
+            account_obj = app.get_account_by_tree_id(children[0])
+            if account_obj:
+                app.apply_shortcut(account_obj, "delta", days=3)
+                app.set_remarks(account_obj, account_obj.get('remarks', ''))
+                app.runner.wait()
+        app.refresh_treeview()
+        app.runner.wait()
+
+
+def run(args):
+    import generate_data
+
+    app_module = bench.load_app_module("stub")
+    classifier = Classifier(subsystem_specs(app_module))
+    with tempfile.TemporaryDirectory(prefix="sam-mem-") as workdir:
+        generate_data.write_accounts(os.path.join(workdir, "accounts_data.json"), args.size, args.seed)
+        tracemalloc.start(NFRAMES)
+        root, app = bench.create_app(app_module, workdir)
+        scripted_workload(app)  # 预热：首次运行产生的一次性分配不计入增长
+        before = tracemalloc.take_snapshot()
+        scripted_workload(app, args.iterations)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        os.chdir(bench.BENCH_DIR)
+
+    live, _ = group_by_subsystem(classifier, after.statistics('traceback'), 'size')
+    growth, top = group_by_subsystem(classifier, after.compare_to(before, 'traceback'), 'size_diff')
+    names = [name for name, _ in subsystem_specs(app_module)] + ["other"]
+    print(f"{args.size} accounts, {args.iterations} workload rounds")
+    print(f"{'subsystem':<22} {'live KB':>12} {'growth KB':>12}")
+    for name in names:
+        print(f"{name:<22} {live.get(name, 0) / 1024:>12.1f} {growth.get(name, 0) / 1024:>+12.1f}")
+    total_growth = sum(growth.values())
+    print(f"{'total':<22} {sum(live.values()) / 1024:>12.1f} {total_growth / 1024:>+12.1f}")
+
+    if args.top:
+        for name in names:
+            stats = sorted(top.get(name, ()), key=lambda stat: stat.size_diff, reverse=True)[:args.top]
+            stats = [stat for stat in stats if stat.size_diff > 0]
+            if not stats:
+                continue
+            print(f"\n[{name}] largest growth")
+            for stat in stats:
+                frame = stat.traceback[-1]
+                print(f"  {stat.size_diff / 1024:>+10.1f} KB {stat.count_diff:>+7} blocks  {frame.filename}:{frame.lineno}")
+
+    if args.max_growth_kb is not None and total_growth / 1024 > args.max_growth_kb:
+        print(f"memory growth {total_growth / 1024:.1f} KB exceeds budget {args.max_growth_kb} KB")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="per-subsystem memory report")
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=3, help="largest growth sites per subsystem")
+    parser.add_argument("--max-growth-kb", type=float, help="fail when total growth exceeds this budget")
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,309 @@
+"""回放录制的界面操作，统计每类操作的延迟分位数，作为端到端的性能回归测试
+
+录制：设置环境变量 SAM_RECORD=session.jsonl 后正常使用界面（见 Program/recorder.py）。
+回放时在生成的测试数据上创建界面，按顺序调用与真实事件相同的处理函数，每个操作的耗时包括
+之后排队的回调（tkstub）或一次 update（真实 Tk）。没有录制文件时可用 --synthetic 生成一段典型会话。
+真实 Tk 模式下可加 --xvfb 在虚拟显示器中运行（需要 pip install xvfbwrapper）。
+
+示例：
+    python replay.py session.jsonl --size 100000
+    python replay.py --synthetic --size 20000 --repeat 3 -o results/replay.json
+    python replay.py --synthetic --tk real --xvfb --size 10000
+    python replay.py --compare results/old.json results/new.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import types
+
+import bench
+import generate_data
+
+if bench.PROGRAM_DIR not in sys.path:
+    sys.path.insert(0, bench.PROGRAM_DIR)
+
+import recorder
+
+# 选择列在显示列中的编号（序号列是 #1）
+SELECT_COLUMN = "#2"
+# tkstub 中每个操作之后执行的回调的最长延迟：包括单击复制（150ms），不包括定时检查数据文件之类的轮询
+SETTLE_DELAY_MS = 150
+
+
+def percentile(values, q):
+    """最近秩法的分位数，values 需已排序"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(q / 100 * len(values) + 0.5)) - 1))
+    return values[rank]
+
+
+def synthetic_session(lang):
+    """一段典型会话：逐字输入搜索、各列排序、点击和拖动选择、右键菜单、全选、撤销和分组"""
+    session = []
+
+    def add(action, **args):
+        session.append(dict(args, action=action))
+
+    for text in ("a", "ab", "abc", "ab", "a", ""):
+        add(recorder.SEARCH, text=text)
+    for query in ("status:available", "cooldown<1d", "account:ab", "-status:available", ""):
+        add(recorder.SEARCH, text=query)
+    for name in ("show_available_only", "show_remarked_only", "show_hidden"):
+        add(recorder.TOGGLE, name=name, value=True)
+        add(recorder.TOGGLE, name=name, value=False)
+    for column in ("account", "status", "available_time", "account"):
+        add(recorder.SORT, column=column)
+    for row in (0, 5, 50):
+        add(recorder.PRESS, row=row, column=SELECT_COLUMN, state=0)
+        add(recorder.RELEASE)
+    add(recorder.PRESS, row=10, column=SELECT_COLUMN, state=0)
+    for row in range(12, 400, 8):
+        add(recorder.DRAG, row=row, column=None, state=0)
+    add(recorder.RELEASE)
+    add(recorder.PRESS, row=None, column="#3", state=0)
+    add(recorder.SELECT_ALL)
+    add(recorder.SELECT_ALL)
+    add(recorder.RIGHT_CLICK, row=3, column="#7", state=0)
+    add(recorder.MENU, label=lang['remarks_options'][2])
+    add(recorder.RIGHT_CLICK, row=4, column="#8", state=0)
+    add(recorder.MENU, label=lang['shortcut_3d'])
+    add(recorder.UNDO)
+    add(recorder.UNDO)
+    add(recorder.REDO)
+    add(recorder.SORT, column="remarks")
+    add(recorder.GROUP, index=1, open=True)
+    add(recorder.GROUP, index=1, open=False)
+    add(recorder.SORT, column="account")
+    return session
+
+
+class Replayer:
+    """把录制的操作交给界面实例的处理函数"""
+
+    def __init__(self, app, root, tk_mode):
+        self.app = app
+        self.root = root
+        self.tk_mode = tk_mode
+        self._pointer = ("", "#1")
+        tree = app.tree
+        # 用录制的目标行代替鼠标坐标命中测试
+        tree.identify_row = lambda y: self._pointer[0]
+        tree.identify_column = lambda x: self._pointer[1]
+        tree.identify_region = lambda x, y: "cell" if self._pointer[0] else "nothing"
+        self.handlers = {
+            recorder.SEARCH: self.search,
+            recorder.TOGGLE: self.toggle,
+            recorder.SORT: lambda step: app.sort_by_column(step['column']),
+            recorder.PRESS: lambda step: self.pointer(step, app.on_tree_button_press),
+            recorder.DRAG: lambda step: self.pointer(step, app.on_tree_drag_motion),
+            recorder.RELEASE: lambda step: app.on_tree_button_release(self._event(0)),
+            recorder.RIGHT_CLICK: lambda step: self.pointer(step, app.on_tree_right_click),
+            recorder.MENU: self.menu,
+            recorder.GROUP: self.group,
+            recorder.SELECT_ALL: lambda step: app.select_all_toggle(),
+            recorder.UNDO: lambda step: app.undo(),
+            recorder.REDO: lambda step: app.redo(),
+        }
+
+    @staticmethod
+    def _event(state):
+        return types.SimpleNamespace(x=0, y=0, x_root=0, y_root=0, state=state or 0)
+
+    def search(self, step):
+        self.app.search_var.set(step['text'])
+        self.app.on_search_key()
+
+    def toggle(self, step):
+        getattr(self.app, step['name'] + '_var').set(step['value'])
+        self.app.on_filter_toggle(step['name'])
+
+    def pointer(self, step, handler):
+        row = step.get('row')
+        item = ""
+        if row is not None:
+            items = self.app._visible_account_items()
+            if items:
+                item = items[min(row, len(items) - 1)]
+        self._pointer = (item, step.get('column') or "#1")
+        handler(self._event(step.get('state')))
+
+    def menu(self, step):
+        menu = self.app._context_menu
+        if menu is None:
+            return
+        if hasattr(menu, 'entries'):  # tkstub
+            menu.invoke(step['label'])
+            return
+        # 真实 Tk 中按文字匹配菜单项，避免“3天”之类的文字被当作序号
+        for index in range((menu.index("end") or 0) + 1):
+            if menu.type(index) == "command" and menu.entrycget(index, "label") == step['label']:
+                menu.invoke(index)
+                return
+
+    def group(self, step):
+        groups = list(self.app._groups)
+        if not groups:
+            return
+        group_id = groups[min(step['index'], len(groups) - 1)]
+        self.app.tree.focus(group_id)
+        self.app.tree.item(group_id, open=step['open'])
+        if step['open']:
+            self.app.on_group_open()
+        else:
+            self.app.on_group_close()
+
+    def settle(self):
+        """执行操作引发的后续回调（tkstub）或处理一次界面更新（真实 Tk）"""
+        if self.tk_mode == "stub":
+            import tkstub
+            tkstub.run_pending(max_delay_ms=SETTLE_DELAY_MS)
+        else:
+            self.root.update()
+
+    def run(self, session, latencies):
+        """回放一遍会话，把每个操作的耗时（秒）追加到 latencies[操作名]，返回跳过的操作数"""
+        skipped = 0
+        for step in session:
+            handler = self.handlers.get(step['action'])
+            if handler is None:
+                skipped += 1
+                continue
+            start = time.perf_counter()
+            handler(step)
+            self.settle()
+            latencies.setdefault(step['action'], []).append(time.perf_counter() - start)
+        return skipped
+
+
+def replay(app_module, session, size, seed, repeat, tk_mode):
+    import tkstub
+
+    latencies = {}
+    skipped = 0
+    with tempfile.TemporaryDirectory(prefix="sam-replay-") as workdir:
+        generate_data.write_accounts(os.path.join(workdir, "accounts_data.json"), size, seed)
+        root, app = bench.create_app(app_module, workdir)
+        # 回放中不弹出对话框、不启动 Steam
+        tkstub.responses['askyesno'] = True
+        app.login_account = lambda account_obj: None
+        player = Replayer(app, root, tk_mode)
+        player.settle()
+        for _ in range(repeat):
+            skipped += player.run(session, latencies)
+        root.destroy()
+        os.chdir(bench.BENCH_DIR)
+    results = []
+    for action, values in latencies.items():
+        values.sort()
+        results.append({
+            'action': action, 'size': size, 'count': len(values),
+            'p50_ms': percentile(values, 50) * 1000, 'p90_ms': percentile(values, 90) * 1000,
+            'p99_ms': percentile(values, 99) * 1000, 'max_ms': values[-1] * 1000,
+            'total_ms': sum(values) * 1000,
+        })
+    results.sort(key=lambda r: -r['total_ms'])
+    return results, skipped
+
+
+def print_results(results):
+    print(f"{'size':>9} {'action':<13} {'count':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} {'total ms':>10}")
+    for r in results:
+        print(f"{r['size']:>9} {r['action']:<13} {r['count']:>6} {r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} {r['total_ms']:>10.1f}")
+
+
+def compare(old_path, new_path, threshold):
+    """对比两次回放结果的 p90，新结果超过旧结果 threshold 倍时返回 1"""
+    with open(old_path, encoding='utf-8') as f:
+        old = {(r['action'], r['size']): r for r in json.load(f)['results']}
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['results']
+    regressions = 0
+    print(f"{'size':>9} {'action':<13} {'old p90':>9} {'new p90':>9} {'ratio':>7}")
+    for entry in new:
+        before = old.get((entry['action'], entry['size']))
+        if before is None:
+            continue
+        ratio = entry['p90_ms'] / before['p90_ms'] if before['p90_ms'] else float('inf')
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{entry['size']:>9} {entry['action']:<13} {before['p90_ms']:>9.2f} {entry['p90_ms']:>9.2f} {ratio:>7.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def run(args):
+    display = None
+    if args.xvfb:
+        try:
+            from xvfbwrapper import Xvfb
+        except ImportError:
+            print("--xvfb needs xvfbwrapper (pip install xvfbwrapper)", file=sys.stderr)
+            return 2
+        display = Xvfb()
+        display.start()
+    try:
+        app_module = bench.load_app_module(args.tk)
+        if args.session:
+            session = recorder.read_session(args.session)
+        else:
+            session = synthetic_session(app_module.lang)
+        all_results = []
+        for size in args.sizes:
+            results, skipped = replay(app_module, session, size, args.seed, args.repeat, args.tk)
+            print_results(results)
+            if skipped:
+                print(f"{skipped} unknown actions skipped")
+            all_results.extend(results)
+    finally:
+        if display is not None:
+            display.stop()
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'tk': args.tk,
+            'session': args.session or "synthetic",
+            'actions': len(session),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': all_results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"results written to {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="replay recorded UI sessions and report per-action latency")
+    parser.add_argument("session", nargs="?", help="session file recorded with SAM_RECORD")
+    parser.add_argument("--synthetic", action="store_true", help="replay a built-in typical session")
+    parser.add_argument("--sizes", "--size", type=int, nargs="+", default=[10000])
+    parser.add_argument("--repeat", type=int, default=1, help="replay the session this many times")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tk", choices=("stub", "real"), default="stub")
+    parser.add_argument("--xvfb", action="store_true", help="run under a virtual X display (with --tk real)")
+    parser.add_argument("-o", "--output", help="result JSON path")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p90 regression ratio for --compare")
+    args = parser.parse_args(argv)
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.threshold)
+    if not args.session and not args.synthetic:
+        parser.error("give a session file or --synthetic")
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""多实例并发保存压力测试：多个进程同时修改同一个数据文件，检查彼此的修改都没有丢失
+
+每个进程只加载一次数据，然后反复修改分给自己的账号（轮流设置冷却和备注）并保存，
+最后一轮还会各自新增一个账号、删除一个自己的账号。全部结束后重新加载文件，
+检查每个账号的最终状态与最后一次修改一致、文件版本号等于保存总次数。
+
+示例：
+    python stress_concurrent.py --workers 6 --rounds 40
+"""
+import argparse
+import datetime
+import multiprocessing
+import os
+import sys
+import tempfile
+
+import bench
+import generate_data
+
+if bench.PROGRAM_DIR not in sys.path:
+    sys.path.insert(0, bench.PROGRAM_DIR)
+
+
+def worker(data_file, worker_id, workers, rounds):
+    from store import AccountStore, format_time
+
+    store = AccountStore(data_file)
+    store.load()
+    mine = [acc for i, acc in enumerate(store.original_data) if i % workers == worker_id]
+    expected = {}
+    for round_no in range(rounds):
+        acc = mine[round_no % len(mine)]
+        if round_no % 2:
+            store.set_remarks(acc, f"w{worker_id}-r{round_no}")
+            expected[acc['account']] = ('remarks', acc['remarks'])
+        else:
+            available = datetime.datetime(2030, 1, 1) + datetime.timedelta(hours=worker_id * 1000 + round_no)
+            store.update_status(acc, available)
+            expected[acc['account']] = ('available_time', format_time(available))
+        if round_no == rounds - 1:
+            store.add_account(f"new-w{worker_id}", "password")
+            expected[f"new-w{worker_id}"] = ('password', "password")
+            victim = mine[-1]['account']
+            store.delete_accounts([victim])
+            expected[victim] = None
+        store.save()
+    return expected
+
+
+def run(args):
+    with tempfile.TemporaryDirectory(prefix="sam-stress-") as workdir:
+        data_file = os.path.join(workdir, "accounts_data.json")
+        generate_data.write_accounts(data_file, args.size, args.seed)
+        with multiprocessing.Pool(args.workers) as pool:
+            results = pool.starmap(worker, [(data_file, i, args.workers, args.rounds) for i in range(args.workers)])
+
+        from store import AccountStore, read_entries
+        store = AccountStore(data_file)
+        store.load()
+        version, _ = read_entries(data_file)
+        failures = []
+        for expected in results:
+            for account, field in expected.items():
+                acc = store.get(account)
+                if field is None:
+                    if acc is not None:
+                        failures.append(f"{account}: should have been deleted")
+                elif acc is None:
+                    failures.append(f"{account}: missing")
+                elif acc.get(field[0]) != field[1]:
+                    failures.append(f"{account}: {field[0]} is {acc.get(field[0])!r}, expected {field[1]!r}")
+        # 每个进程新增一个、删除一个账号
+        if len(store) != args.size:
+            failures.append(f"{len(store)} accounts, expected {args.size}")
+        if version != args.workers * args.rounds:
+            failures.append(f"version {version}, expected {args.workers * args.rounds}")
+
+    print(f"{args.workers} processes x {args.rounds} saves, {args.size} accounts: "
+          f"{len(failures)} lost or wrong updates")
+    for failure in failures[:20]:
+        print("  " + failure)
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="concurrent multi-process save stress test")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=25)
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
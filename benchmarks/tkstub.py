@@ -0,0 +1,484 @@
+"""无界面环境下替代 tkinter 的最小实现，用于基准测试和回放
+
+install() 会把 tkinter、tkinter.ttk、filedialog、messagebox、simpledialog 替换为本模块中的桩对象，
+必须在导入 账号管理系统 之前调用。Treeview 桩会真实保存行数据，因此 populate_treeview 等
+方法的 Python 侧开销与真实界面一致（不包含 Tcl 端的绘制开销）。
+"""
+import itertools
+import sys
+import time
+import types
+
+X, Y, BOTH = "x", "y", "both"
+LEFT, RIGHT, TOP, BOTTOM = "left", "right", "top", "bottom"
+END, CENTER, W, E, N, S = "end", "center", "w", "e", "n", "s"
+VERTICAL, HORIZONTAL = "vertical", "horizontal"
+HIDDEN, NORMAL, DISABLED = "hidden", "normal", "disabled"
+
+
+class _Variable:
+    _default = None
+
+    def __init__(self, master=None, value=None, name=None):
+        self._value = self._default if value is None else value
+        self._traces = []
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+        for callback in list(self._traces):
+            callback()
+
+    def trace_add(self, mode, callback):
+        self._traces.append(lambda: callback("", "", mode))
+
+
+class StringVar(_Variable):
+    _default = ""
+
+
+class BooleanVar(_Variable):
+    _default = False
+
+
+class IntVar(_Variable):
+    _default = 0
+
+
+class DoubleVar(_Variable):
+    _default = 0.0
+
+
+class Widget:
+    """接受任意参数、忽略布局调用的通用控件"""
+    _after_ids = itertools.count(1)
+
+    def __init__(self, master=None, *args, **kwargs):
+        self.master = master
+        self._options = dict(kwargs)
+        self._bindings = {}
+
+    def __getitem__(self, key):
+        return self._options.get(key)
+
+    def __setitem__(self, key, value):
+        self._options[key] = value
+
+    def configure(self, **kwargs):
+        self._options.update(kwargs)
+
+    config = configure
+
+    def cget(self, key):
+        return self._options.get(key)
+
+    def bind(self, sequence=None, func=None, add=None):
+        self._bindings[sequence] = func
+
+    def bind_all(self, sequence=None, func=None, add=None):
+        self._bindings[sequence] = func
+
+    def event_generate(self, sequence, **kwargs):
+        func = self._bindings.get(sequence)
+        if func:
+            return func(types.SimpleNamespace(widget=self, **kwargs))
+
+    def _noop(self, *args, **kwargs):
+        return None
+
+    pack = pack_forget = set = grid = grid_remove = place = focus_set = destroy = _noop
+    update = update_idletasks = grab_set = grab_release = lift = _noop
+
+    def winfo_exists(self):
+        return True
+
+    def winfo_ismapped(self):
+        return True
+
+    def after(self, ms, func=None, *args):
+        # 桩环境没有事件循环，回调交由调用方通过 run_pending() 执行
+        after_id = f"after#{next(self._after_ids)}"
+        if func is not None:
+            _pending.append((after_id, func, args, ms))
+        return after_id
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        _pending[:] = [entry for entry in _pending if entry[0] != after_id]
+
+
+_pending = []
+POLL_YIELD_MS = 50  # 延迟不短于此的回调多是轮询后台线程，执行前让出 1ms，后台线程才能推进
+
+
+def run_pending(limit=10000, max_delay_ms=None):
+    """执行排队的 after 回调（包括回调过程中新加入的），返回执行的数量
+
+    给出 max_delay_ms 时，延迟更长的回调（如定时检查数据文件）留在队列中不执行。
+    回调不等待 after 的延迟时间，轮询类的回调（见 POLL_YIELD_MS）除外。
+    """
+    count = 0
+    deferred = []
+    while _pending and count < limit:
+        entry = _pending.pop(0)
+        if max_delay_ms is not None and entry[3] > max_delay_ms:
+            deferred.append(entry)
+            continue
+        if entry[3] >= POLL_YIELD_MS:
+            time.sleep(0.001)
+        entry[1](*entry[2])
+        count += 1
+    _pending[:0] = deferred
+    return count
+
+
+class Tk(Widget):
+    def __init__(self, *args, **kwargs):
+        super().__init__(None)
+        self._title = ""
+        self.clipboard = ""
+
+    def title(self, text=None):
+        if text is None:
+            return self._title
+        self._title = text
+
+    def geometry(self, spec=None):
+        return spec
+
+    def clipboard_clear(self):
+        self.clipboard = ""
+
+    def clipboard_append(self, text):
+        self.clipboard += text
+
+    def mainloop(self, n=0):
+        run_pending()
+
+    def withdraw(self):
+        pass
+
+    def protocol(self, name, func=None):
+        self._bindings[name] = func
+
+
+Toplevel = Tk
+
+
+class Menu(Widget):
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.entries = []
+
+    def add_command(self, label=None, command=None, **kwargs):
+        self.entries.append((label, command))
+
+    def add_separator(self):
+        self.entries.append((None, None))
+
+    def add_cascade(self, label=None, menu=None, **kwargs):
+        self.entries.append((label, menu))
+
+    def add_checkbutton(self, label=None, command=None, **kwargs):
+        self.entries.append((label, command))
+
+    def delete(self, first, last=None):
+        self.entries = []
+
+    def tk_popup(self, x, y, entry=""):
+        pass
+
+    def invoke(self, label):
+        for entry_label, command in self.entries:
+            if entry_label == label and callable(command):
+                return command()
+        raise KeyError(label)
+
+
+class Text(Widget):
+    def __init__(self, master=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._text = ""
+
+    def get(self, start, end=None):
+        return self._text + "\n"
+
+    def insert(self, index, text, *tags):
+        self._text += text
+
+    def delete(self, start, end=None):
+        self._text = ""
+
+
+class Treeview(Widget):
+    """保存行、表头和选中状态的 Treeview 桩"""
+
+    def __init__(self, master=None, columns=(), show=None, **kwargs):
+        super().__init__(master, columns=columns, show=show, **kwargs)
+        self._columns = tuple(columns)
+        self._items = {}
+        self._children = {"": {}}  # 用有序字典保存子节点，删除为 O(1)
+        self._headings = {}
+        self._selection = {}
+        self._ids = itertools.count(1)
+        # 由调用方设置，模拟鼠标位置下的行、列和区域
+        self.pointer_row = ""
+        self.pointer_column = "#1"
+        self.pointer_region = "cell"
+
+    def insert(self, parent, index, iid=None, **kw):
+        if iid is None:
+            iid = f"I{next(self._ids):03X}"
+        self._items[iid] = {
+            'values': tuple(kw.get('values', ())), 'tags': tuple(kw.get('tags', ())),
+            'text': kw.get('text', ""), 'open': kw.get('open', False), 'parent': parent,
+        }
+        self._children.setdefault(iid, {})
+        self._place(iid, parent, index)
+        return iid
+
+    def _place(self, iid, parent, index):
+        siblings = self._children.setdefault(parent, {})
+        if index == END or index >= len(siblings):
+            siblings[iid] = None
+        else:
+            order = list(siblings)
+            order.insert(index, iid)
+            self._children[parent] = dict.fromkeys(order)
+
+    def delete(self, *items):
+        for iid in items:
+            if iid not in self._items:
+                continue
+            for child in list(self._children.get(iid, ())):
+                self.delete(child)
+            parent = self._items.pop(iid)['parent']
+            self._children.pop(iid, None)
+            self._children.get(parent, {}).pop(iid, None)
+            self._selection.pop(iid, None)
+
+    def get_children(self, item=""):
+        return tuple(self._children.get(item, ()))
+
+    def set_children(self, item, *children):
+        for iid in self.get_children(item):
+            self._items[iid]['parent'] = None
+        self._children[item] = dict.fromkeys(children)
+        for iid in children:
+            self._items[iid]['parent'] = item
+
+    def exists(self, item):
+        return item in self._items
+
+    def parent(self, item):
+        return self._items[item]['parent']
+
+    def index(self, item):
+        return list(self._children[self._items[item]['parent']]).index(item)
+
+    def move(self, item, parent, index):
+        self._children[self._items[item]['parent']].pop(item, None)
+        self._items[item]['parent'] = parent
+        self._place(item, parent, index)
+
+    def detach(self, *items):
+        for iid in items:
+            self._children[self._items[iid]['parent']].pop(iid, None)
+
+    def item(self, item, option=None, **kw):
+        data = self._items[item]
+        if kw:
+            for key, value in kw.items():
+                data[key] = tuple(value) if key in ('values', 'tags') else value
+            return None
+        if option is not None:
+            return data[option]
+        return dict(data)
+
+    def set(self, item, column=None, value=None):
+        data = self._items[item]
+        if column is None:
+            return dict(zip(self._columns, data['values']))
+        index = self._columns.index(column)
+        if value is None:
+            return data['values'][index]
+        values = list(data['values'])
+        values[index] = value
+        data['values'] = tuple(values)
+
+    def _column_id(self, column):
+        """把 "#n" 形式的列号按 displaycolumns 换成列名（"#0" 是树形列）"""
+        if isinstance(column, str) and column[:1] == "#" and column[1:].isdigit() and column != "#0":
+            display = self._options.get('displaycolumns') or self._columns
+            if display in ("#all", ("#all",)):
+                display = self._columns
+            return display[int(column[1:]) - 1]
+        return column
+
+    def heading(self, column, option=None, **kw):
+        column = self._column_id(column)
+        heading = self._headings.setdefault(column, {'text': "", 'command': None})
+        if kw:
+            heading.update(kw)
+            return None
+        if option is not None:
+            return heading.get(option)
+        return dict(heading)
+
+    def column(self, column, option=None, **kw):
+        column = self._column_id(column)
+        options = self._options.setdefault(('column', column), {'width': 100})
+        if kw:
+            options.update(kw)
+            return None
+        if option is not None:
+            return options.get(option)
+        return dict(options)
+
+    def tag_configure(self, tagname, **kw):
+        pass
+
+    def selection(self):
+        return tuple(self._selection)
+
+    def selection_set(self, *items):
+        if len(items) == 1 and isinstance(items[0], (list, tuple)):
+            items = items[0]
+        self._selection = dict.fromkeys(items)
+
+    def selection_add(self, *items):
+        for iid in items:
+            self._selection[iid] = None
+
+    def selection_remove(self, *items):
+        for iid in items:
+            self._selection.pop(iid, None)
+
+    def identify_row(self, y):
+        return self.pointer_row
+
+    def identify_column(self, x):
+        return self.pointer_column
+
+    def identify_region(self, x, y):
+        return self.pointer_region
+
+    def see(self, item):
+        pass
+
+    def focus(self, item=None):
+        if item is None:
+            return self._options.get('focus', "")
+        self._options['focus'] = item
+
+    def yview(self, *args):
+        if args and args[0] == "moveto":
+            self._options['yview'] = float(args[1])
+            return None
+        top = self._options.get('yview', 0.0)
+        return (top, min(1.0, top + 0.1))
+
+    def yview_moveto(self, fraction):
+        self._options['yview'] = fraction
+
+
+class Entry(Widget):
+    """Entry / Combobox 桩：内容保存在 textvariable 中"""
+
+    def __init__(self, master=None, textvariable=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._var = textvariable if textvariable is not None else StringVar()
+
+    def get(self):
+        return self._var.get()
+
+    def set(self, value):
+        self._var.set(value)
+
+    def insert(self, index, text):
+        self._var.set(self._var.get() + text)
+
+    def delete(self, first, last=None):
+        self._var.set("")
+
+
+class Style:
+    def __init__(self, master=None):
+        pass
+
+    def map(self, style, **kw):
+        pass
+
+    def configure(self, style, **kw):
+        pass
+
+
+class Dialog(Widget):
+    """simpledialog.Dialog 桩：不显示窗口，结果由 dialog_results 预先给定"""
+
+    def __init__(self, parent, title=None):
+        super().__init__(parent)
+        self.result = None
+        answer = dialog_results.pop(type(self).__name__, None)
+        if callable(answer):
+            answer(self)
+        elif answer is not None:
+            self.result = answer
+
+
+# 对话框类名 -> 结果（或接收对话框实例的函数），用于脚本化回答对话框
+dialog_results = {}
+# messagebox / filedialog 的脚本化返回值
+responses = {'askyesno': True, 'askopenfilename': "", 'asksaveasfilename': ""}
+messages = []
+
+
+def _message(kind):
+    def show(title=None, message=None, **kwargs):
+        messages.append((kind, title, message))
+        return responses.get(kind, True if kind.startswith('ask') else "ok")
+    return show
+
+
+def _file_dialog(kind):
+    def ask(**kwargs):
+        return responses.get(kind, "")
+    return ask
+
+
+def install():
+    """用桩模块替换 tkinter 相关模块"""
+    tk_module = sys.modules[__name__]
+    ttk = types.ModuleType("tkinter.ttk")
+    for name in ("Frame", "Button", "Label", "Checkbutton", "Scrollbar",
+                 "Progressbar", "Radiobutton", "LabelFrame", "Separator"):
+        setattr(ttk, name, type(name, (Widget,), {}))
+    for name in ("Entry", "Combobox", "Spinbox"):
+        setattr(ttk, name, type(name, (Entry,), {}))
+    ttk.Treeview = Treeview
+    ttk.Style = Style
+
+    filedialog = types.ModuleType("tkinter.filedialog")
+    filedialog.askopenfilename = _file_dialog('askopenfilename')
+    filedialog.asksaveasfilename = _file_dialog('asksaveasfilename')
+
+    messagebox = types.ModuleType("tkinter.messagebox")
+    for kind in ("showinfo", "showwarning", "showerror", "askyesno", "askokcancel", "askyesnocancel"):
+        setattr(messagebox, kind, _message(kind))
+
+    simpledialog = types.ModuleType("tkinter.simpledialog")
+    simpledialog.Dialog = Dialog
+
+    tk_module.ttk = ttk
+    tk_module.filedialog = filedialog
+    tk_module.messagebox = messagebox
+    tk_module.simpledialog = simpledialog
+    sys.modules['tkinter'] = tk_module
+    sys.modules['tkinter.ttk'] = ttk
+    sys.modules['tkinter.filedialog'] = filedialog
+    sys.modules['tkinter.messagebox'] = messagebox
+    sys.modules['tkinter.simpledialog'] = simpledialog